@@ -6,72 +6,19 @@ This script adds actual carbon credits data to show real carbon sequestration
 import os
 import sys
 import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import random
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'python'))
+import sisinfops_db as db
+
 def get_connection_params():
     """Get connection parameters from .env.local"""
-    # Try multiple possible locations for .env.local
-    possible_paths = [
-        os.path.join(os.path.dirname(__file__), '.env.local'),  # Current directory
-        os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env.local'),  # Parent directory
-        os.path.join(os.path.dirname(__file__), '..', '.env.local'),  # Parent directory alternative
-        '/home/sangumang/Documents/sisinfops/.env.local'  # Absolute path
-    ]
-    
-    env_path = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            env_path = path
-            break
-    
-    if not env_path:
-        print("❌ .env.local not found in any of the following locations:")
-        for path in possible_paths:
-            print(f"   - {path}")
-        return None
-    
-    print(f"📄 Using .env.local from: {env_path}")
-    
-    with open(env_path, 'r') as f:
-        content = f.read()
-    
-    # Parse Supabase URL
-    supabase_url = ""
-    for line in content.split('\n'):
-        if line.startswith('NEXT_PUBLIC_SUPABASE_URL='):
-            supabase_url = line.split('=', 1)[1].strip().strip('"\'').strip()
-            break
-    
-    if not supabase_url:
-        print("❌ Could not find NEXT_PUBLIC_SUPABASE_URL in .env.local")
-        return None
-    
-    if 'supabase.co' in supabase_url:
-        import re
-        match = re.search(r'https://([a-zA-Z0-9]+)\.supabase\.co', supabase_url)
-        if match:
-            project_ref = match.group(1)
-            db_host = f"db.{project_ref}.supabase.co"
-        else:
-            print(f"❌ Could not parse Supabase URL: {supabase_url}")
-            return None
-    else:
-        print(f"❌ Not a Supabase URL: {supabase_url}")
+    try:
+        return db.get_db_params()
+    except db.ConfigError as e:
+        print(f"❌ {e}")
         return None
-    
-    # Database password
-    db_password = "4@@E-Zd%zCQ!7ZV"
-    
-    return {
-        "host": db_host,
-        "port": 5432,
-        "database": "postgres",
-        "user": "postgres",
-        "password": db_password,
-        "sslmode": "require"
-    }
 
 def get_existing_carbon_projects(conn):
     """Get existing carbon projects to link credits to"""
@@ -361,61 +308,58 @@ def main():
         sys.exit(1)
     
     try:
-        # Connect to database
-        conn = psycopg2.connect(**params)
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        
-        print(f"🔌 Connected to {params['host']}")
-        
-        # Test connection
-        cur = conn.cursor()
-        cur.execute("SELECT version()")
-        version = cur.fetchone()[0]
-        print(f"📊 PostgreSQL version: {version.split(',')[0]}")
-        cur.close()
-        
-        # Add sample carbon credits
-        print("\n📝 Adding sample carbon credits...")
-        added_count = add_sample_carbon_credits(conn)
-        
-        if added_count > 0:
-            print(f"\n✅ Added {added_count} carbon credits")
+        # Connect to database (koneksi dari pool bersama)
+        with db.connection(autocommit=True) as conn:
+            print(f"🔌 Connected to {params['host']}")
             
-            # Update project statistics
-            print("\n🔄 Updating carbon project statistics...")
-            updated_count = update_carbon_project_stats(conn)
+            # Test connection
+            cur = conn.cursor()
+            cur.execute("SELECT version()")
+            version = cur.fetchone()[0]
+            print(f"📊 PostgreSQL version: {version.split(',')[0]}")
+            cur.close()
             
-            if updated_count > 0:
-                print(f"✅ Updated {updated_count} carbon projects")
-            else:
-                print("⚠️  No projects needed updating")
+            # Add sample carbon credits
+            print("\n📝 Adding sample carbon credits...")
+            added_count = add_sample_carbon_credits(conn)
             
-            # Verify data
-            verify_data(conn)
+            if added_count > 0:
+                print(f"\n✅ Added {added_count} carbon credits")
+            
+                # Update project statistics
+                print("\n🔄 Updating carbon project statistics...")
+                updated_count = update_carbon_project_stats(conn)
+            
+                if updated_count > 0:
+                    print(f"✅ Updated {updated_count} carbon projects")
+                else:
+                    print("⚠️  No projects needed updating")
+            
+                # Verify data
+                verify_data(conn)
+            
+                print("\n" + "=" * 60)
+                print("✅ SAMPLE DATA ADDED SUCCESSFULLY!")
+                print("=" * 60)
+                print("\n📋 Next steps:")
+                print("   1. Restart frontend development server")
+                print("   2. Navigate to: http://localhost:3000/id/dashboard/investor")
+                print("   3. Check 'Carbon Sequestration' card - should show ACTUAL data")
+                print("   4. Verify data source shows 'Actual Data from Carbon Credits'")
+                print("\n🔧 Testing:")
+                print("   • Refresh investor dashboard page")
+                print("   • Check API endpoint: /api/investor/dashboard-data")
+                print("   • Look for 'database_views_actual_carbon' data source")
+                print("\n📊 Expected results:")
+                print("   • Carbon Sequestration: > 0 tons (actual data)")
+                print("   • ROI calculations: Based on actual transactions")
+                print("   • Investment attractiveness: Improved scoring")
+            
+            else:
+                print("\n⚠️  No new carbon credits were added (may already exist)")
+                verify_data(conn)
             
-            print("\n" + "=" * 60)
-            print("✅ SAMPLE DATA ADDED SUCCESSFULLY!")
-            print("=" * 60)
-            print("\n📋 Next steps:")
-            print("   1. Restart frontend development server")
-            print("   2. Navigate to: http://localhost:3000/id/dashboard/investor")
-            print("   3. Check 'Carbon Sequestration' card - should show ACTUAL data")
-            print("   4. Verify data source shows 'Actual Data from Carbon Credits'")
-            print("\n🔧 Testing:")
-            print("   • Refresh investor dashboard page")
-            print("   • Check API endpoint: /api/investor/dashboard-data")
-            print("   • Look for 'database_views_actual_carbon' data source")
-            print("\n📊 Expected results:")
-            print("   • Carbon Sequestration: > 0 tons (actual data)")
-            print("   • ROI calculations: Based on actual transactions")
-            print("   • Investment attractiveness: Improved scoring")
             
-        else:
-            print("\n⚠️  No new carbon credits were added (may already exist)")
-            verify_data(conn)
-        
-        conn.close()
-        
     except psycopg2.Error as e:
         print(f"\n❌ Database error: {e}")
         print(f"   Error details: {e.diag.message_primary if hasattr(e, 'diag') else 'No details'}")
@@ -1,82 +1,25 @@
 #!/usr/bin/env python3
 """Check which tables exist in the database"""
-import psycopg2
 import os
 import sys
 
-def get_db_connection():
-    """Create database connection"""
-    env_path = '.env.local'
-    if not os.path.exists(env_path):
-        print(f"❌ {env_path} not found")
-        return None
-    
-    # Parse .env.local
-    env_vars = {}
-    with open(env_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                key, value = line.split('=', 1)
-                env_vars[key] = value.strip().strip('"\'')
-    
-    supabase_url = env_vars.get('NEXT_PUBLIC_SUPABASE_URL')
-    
-    if not supabase_url:
-        print("❌ No Supabase URL")
-        return None
-    
-    # Extract project reference
-    import re
-    match = re.search(r'https://([a-zA-Z0-9]+)\.supabase\.co', supabase_url)
-    if not match:
-        print(f"❌ Could not parse URL: {supabase_url}")
-        return None
-    
-    project_ref = match.group(1)
-    db_password = "4@@E-Zd%zCQ!7ZV"
-    db_host = f"db.{project_ref}.supabase.co"
-    
-    params = {
-        "host": db_host,
-        "port": 5432,
-        "database": "postgres",
-        "user": "postgres",
-        "password": db_password,
-        "sslmode": "require",
-        "connect_timeout": 10
-    }
-    
-    try:
-        conn = psycopg2.connect(**params)
-        print(f"✅ Connected to {db_host}")
-        return conn
-    except Exception as e:
-        print(f"❌ Connection failed: {e}")
-        return None
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import sisinfops_db as db
 
 def main():
     print("=" * 60)
     print("🔍 CHECKING DATABASE TABLES")
     print("=" * 60)
     
-    conn = get_db_connection()
-    if not conn:
+    try:
+        schema = db.get_snapshot(refresh='--refresh' in sys.argv)
+    except Exception as e:
+        print(f"❌ Error: {e}")
         return
     
     try:
-        conn.autocommit = True
-        cursor = conn.cursor()
-        
-        # Check all tables
-        cursor.execute("""
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = 'public'
-            ORDER BY table_name
-        """)
-        
-        tables = [row[0] for row in cursor.fetchall()]
+        # Check all tables (and views) from the cached catalog snapshot
+        tables = [name.split('.', 1)[1] for name in schema.table_names('public')]
         print(f"📊 Found {len(tables)} tables:")
         for table in tables:
             print(f"   • {table}")
@@ -85,12 +28,11 @@ def main():
         print("\n🔍 Checking VVB tables:")
         vvb_tables = ['vvb_organizations', 'vvb_engagements']
         for table in vvb_tables:
-            cursor.execute("SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_schema = 'public' AND table_name = %s)", (table,))
-            exists = cursor.fetchone()[0]
+            exists = schema.has_table(table)
             print(f"   • {table}: {'✅ EXISTS' if exists else '❌ MISSING'}")
         
         # If missing, show creation SQL
-        if not all(cursor.execute("SELECT EXISTS (SELECT 1 FROM information_schema.tables WHERE table_schema = 'public' AND table_name = %s)", (table,))[0] for table in vvb_tables):
+        if not all(schema.has_table(table) for table in vvb_tables):
             print("\n📋 Creation SQL needed:")
             print("""
 -- vvb_organizations table
@@ -129,16 +71,10 @@ CREATE TABLE IF NOT EXISTS vvb_engagements (
 );
             """)
         
-        cursor.close()
-        
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
-    finally:
-        if conn:
-            conn.close()
-            print("\n🔌 Database connection closed")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -5,50 +5,12 @@ Create sample budgets for existing 12 programs
 
 import os
 import sys
-import psycopg2
 from dotenv import load_dotenv
-import re
 import uuid
 from datetime import datetime
 
-def get_db_params():
-    """Get database connection parameters"""
-    env_path = os.path.join(os.path.dirname(__file__), '.env.local')
-    if not os.path.exists(env_path):
-        print(f"❌ .env.local not found")
-        return None
-    
-    with open(env_path, 'r') as f:
-        content = f.read()
-    
-    supabase_url = ""
-    for line in content.split('\n'):
-        if line.startswith('NEXT_PUBLIC_SUPABASE_URL='):
-            supabase_url = line.split('=', 1)[1].strip().strip('"\'')
-            break
-    
-    if not supabase_url:
-        print("❌ Could not find NEXT_PUBLIC_SUPABASE_URL")
-        return None
-    
-    match = re.search(r'https://([a-zA-Z0-9]+)\.supabase\.co', supabase_url)
-    if match:
-        project_ref = match.group(1)
-        db_host = f"db.{project_ref}.supabase.co"
-    else:
-        print(f"❌ Could not parse Supabase URL")
-        return None
-    
-    db_password = "4@@E-Zd%zCQ!7ZV"
-    
-    return {
-        "host": db_host,
-        "port": 5432,
-        "database": "postgres",
-        "user": "postgres",
-        "password": db_password,
-        "sslmode": "require"
-    }
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import sisinfops_db as db
 
 def check_price_list_structure(cur):
     """Check price_list table structure"""
@@ -298,47 +260,40 @@ def main():
     print("PROGRAM BUDGET CREATION SCRIPT")
     print("=" * 80)
     
-    db_params = get_db_params()
-    if not db_params:
-        print("❌ Cannot connect to database")
-        return
-    
     try:
-        conn = psycopg2.connect(**db_params)
-        conn.autocommit = False
-        cur = conn.cursor()
-        
-        # Check price list structure
-        print("\n🔍 Checking database structure...")
-        check_price_list_structure(cur)
-        
-        # Create budgets
-        print("\n💰 Creating budgets for programs...")
-        created_budgets, created_items = create_program_budgets(cur)
-        
-        if created_budgets > 0:
-            conn.commit()
-            print(f"\n✅ Successfully created {created_budgets} budgets with {created_items} items")
+        with db.connection() as conn:
+            cur = conn.cursor()
             
-            # Verification
-            verify_budget_creation(cur)
+            # Check price list structure
+            print("\n🔍 Checking database structure...")
+            check_price_list_structure(cur)
             
-            print(f"\n📋 NEXT STEPS:")
-            print(f"  1. Restart Next.js dev server")
-            print(f"  2. Test form at http://localhost:3000/id/dashboard/programs/new")
-            print(f"  3. Check program detail pages for budget display")
-            print(f"  4. Verify API endpoints for budget management")
-        else:
-            print(f"\nℹ️  No new budgets created (may already exist)")
-            conn.rollback()
-        
-        cur.close()
-        conn.close()
+            # Create budgets
+            print("\n💰 Creating budgets for programs...")
+            created_budgets, created_items = create_program_budgets(cur)
+            
+            if created_budgets > 0:
+                conn.commit()
+                print(f"\n✅ Successfully created {created_budgets} budgets with {created_items} items")
+                
+                # Verification
+                verify_budget_creation(cur)
+                
+                print(f"\n📋 NEXT STEPS:")
+                print(f"  1. Restart Next.js dev server")
+                print(f"  2. Test form at http://localhost:3000/id/dashboard/programs/new")
+                print(f"  3. Check program detail pages for budget display")
+                print(f"  4. Verify API endpoints for budget management")
+            else:
+                print(f"\nℹ️  No new budgets created (may already exist)")
+                conn.rollback()
+            
+            cur.close()
         
+    except db.ConfigError as e:
+        print(f"❌ Cannot connect to database: {e}")
     except Exception as e:
         print(f"❌ Main error: {e}")
-        if 'conn' in locals():
-            conn.rollback()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -7,163 +7,28 @@ Tanpa interaksi user, langsung jalankan
 import os
 import sys
 import json
+import argparse
 from datetime import datetime
-import psycopg2
-from dotenv import load_dotenv
 
-# Load environment
-load_dotenv('.env.local')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import sisinfops_db as db
+from program_pipeline import DEFAULT_WORKERS, DatabasePersister, PlannedProgram, ProjectPlan, run_pipeline
 
 class ProgramPlannerAuto:
-    def __init__(self):
-        self.db_params = self.get_db_params()
+    def __init__(self, workers=DEFAULT_WORKERS, project_limit=4):
+        self.workers = workers
+        self.project_limit = project_limit
+        # Satu koneksi pool per worker
+        db.get_pool(minconn=workers, maxconn=workers)
         
-    def get_db_params(self):
-        """Get database connection parameters"""
-        env_path = os.path.join(os.path.dirname(__file__), '.env.local')
-        if not os.path.exists(env_path):
-            print(f"❌ .env.local not found")
-            return None
-        
-        with open(env_path, 'r') as f:
-            content = f.read()
-        
-        supabase_url = ""
-        for line in content.split('\n'):
-            if line.startswith('NEXT_PUBLIC_SUPABASE_URL='):
-                supabase_url = line.split('=', 1)[1].strip().strip('"\'')
-                break
-        
-        if not supabase_url:
-            print("❌ Could not find NEXT_PUBLIC_SUPABASE_URL")
-            return None
-        
-        import re
-        match = re.search(r'https://([a-zA-Z0-9]+)\.supabase\.co', supabase_url)
-        if match:
-            project_ref = match.group(1)
-            db_host = f"db.{project_ref}.supabase.co"
-        else:
-            print(f"❌ Could not parse Supabase URL")
-            return None
-        
-        db_password = "4@@E-Zd%zCQ!7ZV"
-        
-        return {
-            "host": db_host,
-            "port": 5432,
-            "database": "postgres",
-            "user": "postgres",
-            "password": db_password,
-            "sslmode": "require"
-        }
-    
     def fetch_from_db(self, query: str, params=None):
-        """Execute query and return results"""
-        if not self.db_params:
-            print("❌ Database connection not available")
-            return []
-        
+        """Execute query and return results (koneksi dari pool bersama)"""
         try:
-            conn = psycopg2.connect(**self.db_params)
-            cur = conn.cursor()
-            cur.execute(query, params or ())
-            columns = [desc[0] for desc in cur.description] if cur.description else []
-            rows = cur.fetchall()
-            cur.close()
-            conn.close()
-            
-            if columns:
-                return [dict(zip(columns, row)) for row in rows]
-            return rows
+            return db.fetch_all(query, params)
         except Exception as e:
             print(f"❌ Database error: {e}")
             return []
     
-    def execute_query(self, query: str, params=None, return_id=False):
-        """Execute INSERT/UPDATE query"""
-        if not self.db_params:
-            print("❌ Database connection not available")
-            return None
-        
-        try:
-            conn = psycopg2.connect(**self.db_params)
-            cur = conn.cursor()
-            cur.execute(query, params or ())
-            
-            result = None
-            if return_id:
-                if "RETURNING" in query.upper():
-                    result = cur.fetchone()[0]
-                else:
-                    cur.execute("SELECT LASTVAL()")
-                    result = cur.fetchone()[0]
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-            
-            return result
-        except Exception as e:
-            print(f"❌ Database error: {e}")
-            conn.rollback()
-            return None
-    
-    def create_program(self, program_data, aksi_ids=None):
-        """Create program directly in database"""
-        # Map field names from form to database columns
-        insert_data = {
-            "kode_program": program_data["kode_program"],
-            "nama_program": program_data["nama_program"],
-            "jenis_program": program_data["jenis_program"],
-            "kategori_hutan": program_data.get("kategori_hutan"),
-            "tujuan": program_data.get("tujuan"),
-            "lokasi_spesifik": program_data.get("lokasi_spesifik"),
-            "target": program_data.get("target"),
-            "risiko": program_data.get("risiko"),
-            "carbon_project_id": program_data.get("carbon_project_id"),
-            "perhutanan_sosial_id": program_data["perhutanan_sosial_id"],
-            "status": program_data.get("status", "draft"),
-            "total_budget": program_data.get("total_budget", 0),
-            "budget_status": program_data.get("budget_status", "draft"),
-            "created_at": "NOW()",
-            "updated_at": "NOW()"
-        }
-        
-        # Build INSERT query
-        columns = []
-        values = []
-        placeholders = []
-        
-        for col, val in insert_data.items():
-            if val is not None:
-                columns.append(col)
-                values.append(val)
-                placeholders.append("%s")
-        
-        query = f"""
-            INSERT INTO programs ({', '.join(columns)})
-            VALUES ({', '.join(placeholders)})
-            RETURNING id
-        """
-        
-        program_id = self.execute_query(query, values, return_id=True)
-        
-        if program_id and aksi_ids:
-            self.link_aksi_mitigasi(program_id, aksi_ids)
-        
-        return program_id
-    
-    def link_aksi_mitigasi(self, program_id, aksi_ids):
-        """Link aksi mitigasi to program"""
-        for aksi_id in aksi_ids:
-            query = """
-                INSERT INTO program_aksi_mitigasi (program_id, aksi_mitigasi_id, created_at)
-                VALUES (%s, %s, NOW())
-                ON CONFLICT (program_id, aksi_mitigasi_id) DO NOTHING
-            """
-            self.execute_query(query, (program_id, aksi_id))
-    
     def run(self):
         """Main execution - otomatis tanpa input"""
         print("=" * 80)
@@ -173,14 +38,14 @@ class ProgramPlannerAuto:
         # Get data
         print("\n📊 Mengumpulkan data yang diperlukan...")
         
-        # 1. Carbon projects (4 projects)
+        # 1. Carbon projects (default 4, --projects 0 untuk semua)
         query = """
             SELECT id, kode_project, nama_project, kabupaten, luas_total_ha
             FROM carbon_projects 
             ORDER BY kode_project
-            LIMIT 4
+            LIMIT %s
         """
-        projects = self.fetch_from_db(query)
+        projects = self.fetch_from_db(query, (self.project_limit or None,))
         print(f"   ✅ Carbon projects: {len(projects)}")
         
         # 2. Perhutanan sosial (12 untuk 12 program)
@@ -211,7 +76,7 @@ class ProgramPlannerAuto:
                 aksi_by_kelompok[kelompok] = []
             aksi_by_kelompok[kelompok].append(aksi)
         
-        if len(projects) < 4 or len(ps_list) < 12:
+        if len(projects) < (self.project_limit or 1) or len(ps_list) < 12:
             print("❌ Tidak cukup data untuk membuat program")
             return
         
@@ -221,13 +86,13 @@ class ProgramPlannerAuto:
             {"name": "kapasitas", "label": "Penguatan Kapasitas", "jenis": "KAPASITAS"}
         ]
         
-        created_programs = []
-        
         print(f"\n📋 Membuat {len(projects)} projects × {len(program_types)} types = {len(projects) * len(program_types)} programs")
         
-        for i, project in enumerate(projects[:4]):
-            print(f"\n--- Project {i+1}: {project['kode_project']} - {project['nama_project']} ---")
-            
+        # Rencanakan semua program, lalu simpan per project secara paralel
+        plans = []
+        details = {}
+        for i, project in enumerate(projects):
+            planned = []
             for j, prog_type in enumerate(program_types):
                 # Select PS untuk program ini
                 ps_index = (i * len(program_types) + j) % len(ps_list)
@@ -267,29 +132,41 @@ class ProgramPlannerAuto:
                     "total_budget": budget,
                     "budget_status": "draft"
                 }
-                
-                print(f"   Creating {kode_program}...")
-                program_id = self.create_program(program_data, aksi_ids)
-                
-                if program_id:
-                    created_programs.append({
-                        "id": program_id,
-                        "kode": kode_program,
-                        "nama": nama_program,
-                        "project": project['kode_project'],
-                        "type": prog_type["name"],
-                        "budget": budget,
-                        "aksi_count": len(aksi_ids)
-                    })
-                    print(f"   ✅ Berhasil dibuat (ID: {program_id})")
-                else:
-                    print(f"   ❌ Gagal membuat program")
+                planned.append(PlannedProgram(program_data, aksi_ids))
+                details[kode_program] = {
+                    "kode": kode_program,
+                    "nama": nama_program,
+                    "project": project['kode_project'],
+                    "type": prog_type["name"],
+                    "budget": budget,
+                    "aksi_count": len(aksi_ids)
+                }
+            plans.append(ProjectPlan(project['kode_project'], planned))
+        
+        def report_project(result):
+            if not result.ok:
+                print(f"   ❌ {result.kode_project}: gagal ({result.error})")
+                return
+            existing = f", {len(result.existing)} sudah ada" if result.existing else ""
+            print(f"   ✅ {result.kode_project}: {len(result.created)} program dibuat{existing} ({result.elapsed:.2f}s)")
+        
+        print(f"\n⚙️  Menyimpan {len(plans)} project dengan {self.workers} worker...")
+        results = run_pipeline(plans, DatabasePersister(db), self.workers, on_result=report_project)
+        
+        created_programs = []
+        for result in results:
+            for kode_program, program_id in result.program_ids.items():
+                if kode_program in result.created:
+                    created_programs.append(dict(details[kode_program], id=program_id))
         
         # Summary
         print("\n" + "=" * 80)
         print("SUMMARY: PROGRAM PLANNER TASK COMPLETE")
         print("=" * 80)
         print(f"\n✅ Berhasil dibuat: {len(created_programs)} dari {len(projects) * len(program_types)} program")
+        existing_count = sum(len(r.existing) for r in results)
+        if existing_count:
+            print(f"ℹ️  {existing_count} program sudah ada sebelumnya dan tidak dibuat ulang")
         
         if created_programs:
             print("\n📊 Detail program yang dibuat:")
@@ -416,5 +293,12 @@ class ProgramPlannerAuto:
         return int(round(budget / 100000) * 100000)  # Round to nearest 100,000
 
 if __name__ == "__main__":
-    planner = ProgramPlannerAuto()
+    parser = argparse.ArgumentParser(description="Buat program aksi mitigasi langsung ke database")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Jumlah project yang disimpan paralel (default {DEFAULT_WORKERS})")
+    parser.add_argument("--projects", type=int, default=4,
+                        help="Jumlah carbon project (default 4, 0 untuk semua)")
+    args = parser.parse_args()
+    
+    planner = ProgramPlannerAuto(workers=args.workers, project_limit=args.projects)
     planner.run()
\ No newline at end of file
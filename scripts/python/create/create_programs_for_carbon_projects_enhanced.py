@@ -10,110 +10,66 @@ Tanggal: 2026-02-13
 import os
 import sys
 import json
-import requests
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import psycopg2
+from typing import Dict, List, Any
 from dotenv import load_dotenv
-import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import sisinfops_db as db
+from program_pipeline import DEFAULT_WORKERS, PlannedProgram, ProjectPlan, RestPersister, run_pipeline
 
 # Load environment
 load_dotenv('.env.local')
 
 class ProgramPlanner:
-    def __init__(self):
+    def __init__(self, workers=DEFAULT_WORKERS, project_limit=4, assume_yes=False):
+        self.workers = workers
+        self.project_limit = project_limit
+        self.assume_yes = assume_yes
         self.supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
         self.supabase_key = os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
         self.db_params = self.get_db_params()
+        self.rest = self.get_rest_client()
         self.programs_created = []
         
     def get_db_params(self):
         """Get database connection parameters"""
-        env_path = os.path.join(os.path.dirname(__file__), '.env.local')
-        if not os.path.exists(env_path):
-            print(f"❌ .env.local not found at: {env_path}")
-            return None
-        
-        with open(env_path, 'r') as f:
-            content = f.read()
-        
-        # Parse Supabase URL
-        supabase_url = ""
-        for line in content.split('\n'):
-            if line.startswith('NEXT_PUBLIC_SUPABASE_URL='):
-                supabase_url = line.split('=', 1)[1].strip().strip('"\'')
-                break
-        
-        if not supabase_url:
-            print("❌ Could not find NEXT_PUBLIC_SUPABASE_URL in .env.local")
+        try:
+            return db.get_db_params()
+        except db.ConfigError as e:
+            print(f"❌ {e}")
             return None
-        
-        # Extract project reference
-        import re
-        match = re.search(r'https://([a-zA-Z0-9]+)\.supabase\.co', supabase_url)
-        if match:
-            project_ref = match.group(1)
-            db_host = f"db.{project_ref}.supabase.co"
-        else:
-            print(f"❌ Could not parse Supabase URL: {supabase_url}")
+    
+    def get_rest_client(self):
+        """REST client dengan satu session keep-alive untuk semua request API"""
+        if not self.supabase_url or not self.supabase_key:
             return None
-        
-        # Use the database password
-        db_password = "4@@E-Zd%zCQ!7ZV"
-        
-        return {
-            "host": db_host,
-            "port": 5432,
-            "database": "postgres",
-            "user": "postgres",
-            "password": db_password,
-            "sslmode": "require"
-        }
+        return db.RestClient(self.supabase_url, self.supabase_key, pool_size=self.workers)
     
     def fetch_from_db(self, query: str, params=None):
-        """Execute query and return results"""
+        """Execute query and return results (koneksi dari pool bersama)"""
         if not self.db_params:
             print("❌ Database connection not available")
             return []
         
         try:
-            conn = psycopg2.connect(**self.db_params)
-            cur = conn.cursor()
-            cur.execute(query, params or ())
-            columns = [desc[0] for desc in cur.description] if cur.description else []
-            rows = cur.fetchall()
-            cur.close()
-            conn.close()
-            
-            if columns:
-                return [dict(zip(columns, row)) for row in rows]
-            return rows
+            return db.fetch_all(query, params)
         except Exception as e:
             print(f"❌ Database error: {e}")
             return []
     
     def fetch_via_api(self, table: str, select="*", limit=100):
         """Fetch data via Supabase REST API"""
-        if not self.supabase_url or not self.supabase_key:
+        if not self.rest:
             print("❌ Supabase credentials not available")
             return []
         
-        url = f"{self.supabase_url}/rest/v1/{table}"
-        headers = {
-            "apikey": self.supabase_key,
-            "Authorization": f"Bearer {self.supabase_key}",
-            "Content-Type": "application/json"
-        }
-        params = {"select": select, "limit": limit}
-        
         try:
-            response = requests.get(url, headers=headers, params=params)
-            if response.status_code == 200:
-                return response.json()
-            else:
-                print(f"❌ API error ({table}): {response.status_code} - {response.text}")
-                return []
+            return self.rest.select(table, select=select, limit=limit)
+        except db.RestError as e:
+            print(f"❌ API error ({table}): {e.status} - {e.body}")
+            return []
         except Exception as e:
             print(f"❌ Request error ({table}): {e}")
             return []
@@ -200,124 +156,6 @@ class ProgramPlanner:
         
         return aksi_list, kelompok_dict
     
-    def create_program_via_api(self, program_data: Dict) -> Optional[str]:
-        """Create program via API"""
-        if not self.supabase_url or not self.supabase_key:
-            print("❌ Cannot create program: Supabase credentials missing")
-            return None
-        
-        url = f"{self.supabase_url}/rest/v1/programs"
-        headers = {
-            "apikey": self.supabase_key,
-            "Authorization": f"Bearer {self.supabase_key}",
-            "Content-Type": "application/json",
-            "Prefer": "return=representation"
-        }
-        
-        try:
-            response = requests.post(url, headers=headers, json=program_data)
-            if response.status_code in [200, 201]:
-                result = response.json()
-                program_id = result[0]['id'] if isinstance(result, list) else result.get('id')
-                print(f"   ✅ Program '{program_data.get('nama_program')}' created with ID: {program_id}")
-                return program_id
-            else:
-                print(f"❌ Failed to create program: {response.status_code} - {response.text}")
-                return None
-        except Exception as e:
-            print(f"❌ API error: {e}")
-            return None
-    
-    def link_aksi_mitigasi(self, program_id: str, aksi_ids: List[int]):
-        """Link aksi mitigasi to program"""
-        if not program_id or not aksi_ids:
-            return
-        
-        for aksi_id in aksi_ids:
-            data = {
-                "program_id": program_id,
-                "aksi_mitigasi_id": aksi_id
-            }
-            self.create_program_aksi_mitigasi(data)
-    
-    def create_program_aksi_mitigasi(self, data: Dict):
-        """Create program_aksi_mitigasi record"""
-        if not self.supabase_url or not self.supabase_key:
-            return
-        
-        url = f"{self.supabase_url}/rest/v1/program_aksi_mitigasi"
-        headers = {
-            "apikey": self.supabase_key,
-            "Authorization": f"Bearer {self.supabase_key}",
-            "Content-Type": "application/json",
-            "Prefer": "return=representation"
-        }
-        
-        try:
-            response = requests.post(url, headers=headers, json=data)
-            if response.status_code in [200, 201]:
-                print(f"   ✅ Linked aksi mitigasi {data['aksi_mitigasi_id']} to program")
-            else:
-                print(f"   ⚠️  Failed to link aksi mitigasi: {response.status_code}")
-        except Exception as e:
-            print(f"   ⚠️  Error linking aksi mitigasi: {e}")
-    
-    def create_program_budget(self, program_id: str, budget_data: Dict, items: List[Dict]):
-        """Create program budget with items"""
-        if not program_id:
-            return
-        
-        # First create budget header
-        budget_data['program_id'] = program_id
-        budget_id = self.create_budget_via_api(budget_data)
-        
-        if budget_id and items:
-            for item in items:
-                item['program_budget_id'] = budget_id
-                self.create_budget_item_via_api(item)
-    
-    def create_budget_via_api(self, budget_data: Dict) -> Optional[str]:
-        """Create program budget via API"""
-        url = f"{self.supabase_url}/rest/v1/program_budgets"
-        headers = {
-            "apikey": self.supabase_key,
-            "Authorization": f"Bearer {self.supabase_key}",
-            "Content-Type": "application/json",
-            "Prefer": "return=representation"
-        }
-        
-        try:
-            response = requests.post(url, headers=headers, json=budget_data)
-            if response.status_code in [200, 201]:
-                result = response.json()
-                budget_id = result[0]['id'] if isinstance(result, list) else result.get('id')
-                print(f"   ✅ Budget '{budget_data.get('budget_name')}' created with ID: {budget_id}")
-                return budget_id
-            else:
-                print(f"   ⚠️  Failed to create budget: {response.status_code}")
-                return None
-        except Exception as e:
-            print(f"   ⚠️  Error creating budget: {e}")
-            return None
-    
-    def create_budget_item_via_api(self, item_data: Dict):
-        """Create program budget item via API"""
-        url = f"{self.supabase_url}/rest/v1/program_budget_items"
-        headers = {
-            "apikey": self.supabase_key,
-            "Authorization": f"Bearer {self.supabase_key}",
-            "Content-Type": "application/json"
-        }
-        
-        try:
-            response = requests.post(url, headers=headers, json=item_data)
-            if response.status_code in [200, 201]:
-                print(f"   ✅ Budget item '{item_data.get('item_code')}' created")
-            else:
-                print(f"   ⚠️  Failed to create budget item: {response.status_code}")
-        except Exception as e:
-            print(f"   ⚠️  Error creating budget item: {e}")
-    
     def generate_program_data(self, project: Dict, ps_list: List[Dict], 
                              aksi_by_kelompok: Dict, price_items_by_category: Dict,
                              program_type: str, program_num: int) -> Dict:
@@ -517,7 +355,13 @@ class ProgramPlanner:
         }
     
     def run(self):
-        """Main execution"""
+        """
+        Main execution
+        Program disimpan dengan RestPersister: satu bulk insert per tabel per
+        project, jadi satu row yang ditolak menggagalkan seluruh insert tabel
+        itu untuk project tersebut, bukan hanya row itu seperti saat row
+        masih dikirim satu per satu.
+        """
         print("=" * 80)
         print("PROGRAM PLANNER: Membuat 3 Daftar Program Aksi Mitigasi untuk 4 Project Karbon")
         print("=" * 80)
@@ -527,9 +371,11 @@ class ProgramPlanner:
         
         # Get carbon projects
         carbon_projects = self.get_carbon_projects()
-        if len(carbon_projects) < 4:
-            print(f"❌ Hanya ditemukan {len(carbon_projects)} carbon projects, butuh minimal 4")
+        if len(carbon_projects) < (self.project_limit or 1):
+            print(f"❌ Hanya ditemukan {len(carbon_projects)} carbon projects, butuh minimal {self.project_limit or 1}")
             return
+        if self.project_limit:
+            carbon_projects = carbon_projects[:self.project_limit]
         
         # Get perhutanan sosial
         ps_list = self.get_perhutanan_sosial()
@@ -561,7 +407,7 @@ class ProgramPlanner:
         program_types = ["perlindungan", "restorasi", "kapasitas"]
         all_programs = []
         
-        for i, project in enumerate(carbon_projects[:4]):  # Only first 4 projects
+        for i, project in enumerate(carbon_projects):
             print(f"\n--- Project {i+1}: {project['kode_project']} - {project['nama_project']} ---")
             
             for j, prog_type in enumerate(program_types):
@@ -592,44 +438,57 @@ class ProgramPlanner:
         # Step 3: Ask for confirmation
         print("\n📋 STEP 3: Konfirmasi pembuatan program")
         print(f"   Akan dibuat {len(all_programs)} program:")
-        print(f"   • 4 Project × 3 Program Type = 12 Program")
+        print(f"   • {len(carbon_projects)} Project × {len(program_types)} Program Type = {len(all_programs)} Program")
         
-        response = input("\n   Lanjutkan pembuatan program? (y/n): ")
+        response = 'y' if self.assume_yes else input("\n   Lanjutkan pembuatan program? (y/n): ")
         if response.lower() != 'y':
             print("❌ Pembuatan program dibatalkan")
             return
         
-        # Step 4: Create programs via API
-        print("\n📋 STEP 4: Menyimpan program ke database...")
+        # Step 4: Create programs via API, per project in parallel
+        # (program -> aksi links -> budget -> budget items within a project)
+        print(f"\n📋 STEP 4: Menyimpan program ke database ({self.workers} worker)...")
+        if not self.rest:
+            print("❌ Cannot create program: Supabase credentials missing")
+            return
         
-        created_count = 0
-        for i, prog_info in enumerate(all_programs):
-            print(f"\n   Program {i+1}/{len(all_programs)}: {prog_info['data']['kode_program']}")
-            
-            # Prepare program data for API (remove aksi_mitigasi_ids as it's separate)
+        plans = {}
+        for prog_info in all_programs:
+            # aksi_mitigasi_ids is linked separately
             api_data = prog_info['data'].copy()
             aksi_ids = api_data.pop('aksi_mitigasi_ids', [])
-            
-            # Create program
-            program_id = self.create_program_via_api(api_data)
-            
-            if program_id:
-                # Link aksi mitigasi
-                if aksi_ids:
-                    self.link_aksi_mitigasi(program_id, aksi_ids)
-                
-                # Create budget
-                if prog_info['budget_items']:
-                    budget_data = self.generate_budget_data(prog_info['data'], prog_info['budget_items'])
-                    self.create_program_budget(program_id, budget_data, prog_info['budget_items'])
-                
-                created_count += 1
+            budget = None
+            if prog_info['budget_items']:
+                budget = self.generate_budget_data(prog_info['data'], prog_info['budget_items'])
+            plans.setdefault(prog_info['project'], ProjectPlan(prog_info['project'], [])).programs.append(
+                PlannedProgram(api_data, aksi_ids, budget, prog_info['budget_items'])
+            )
+        
+        def report_project(result):
+            if not result.ok:
+                print(f"   ❌ {result.kode_project}: {result.error}")
+                return
+            existing = f", {len(result.existing)} sudah ada" if result.existing else ""
+            print(f"   ✅ {result.kode_project}: {len(result.created)} program, "
+                  f"{result.budget_items} budget item{existing} ({result.elapsed:.2f}s)")
+        
+        results = run_pipeline(list(plans.values()), RestPersister(self.rest), self.workers,
+                               on_result=report_project)
+        
+        created_codes = set()
+        for result in results:
+            created_codes.update(result.created)
+        created_programs = []
+        for prog_info in all_programs:
+            if prog_info['data']['kode_program'] in created_codes:
+                created_programs.append(prog_info)
                 self.programs_created.append(prog_info['type'])
-                
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
-            else:
-                print(f"   ❌ Gagal membuat program {prog_info['data']['kode_program']}")
+        created_count = len(created_programs)
+        
+        existing_count = sum(len(r.existing) for r in results)
+        if existing_count:
+            print(f"\n   ℹ️  {existing_count} program sudah ada sebelumnya dan tidak dibuat ulang")
+        print(f"\n   📡 {self.rest.request_count} request API untuk {len(plans)} project")
         
         # Step 5: Summary
         print("\n" + "=" * 80)
@@ -639,22 +498,21 @@ class ProgramPlanner:
         
         if created_count > 0:
             print(f"\n📊 Detail program yang dibuat:")
-            for i, prog_info in enumerate(all_programs):
-                if i < created_count:
-                    print(f"\n   {i+1}. {prog_info['data']['kode_program']}")
-                    print(f"      Project: {prog_info['project']}")
-                    print(f"      Type: {prog_info['type']}")
-                    print(f"      Name: {prog_info['data']['nama_program']}")
-                    print(f"      Budget: Rp {prog_info['data']['total_budget']:,.0f}")
-                    print(f"      Aksi Mitigasi: {len(prog_info['data'].get('aksi_mitigasi_ids', []))} item")
-                    print(f"      Budget Items: {len(prog_info['budget_items'])} item")
+            for i, prog_info in enumerate(created_programs):
+                print(f"\n   {i+1}. {prog_info['data']['kode_program']}")
+                print(f"      Project: {prog_info['project']}")
+                print(f"      Type: {prog_info['type']}")
+                print(f"      Name: {prog_info['data']['nama_program']}")
+                print(f"      Budget: Rp {prog_info['data']['total_budget']:,.0f}")
+                print(f"      Aksi Mitigasi: {len(prog_info['data'].get('aksi_mitigasi_ids', []))} item")
+                print(f"      Budget Items: {len(prog_info['budget_items'])} item")
             
             print(f"\n📋 Compliance dengan form isian:")
             print(f"   ✅ Kode Program unik: {created_count} kode berbeda")
             print(f"   ✅ Nama Program deskriptif: semua program memiliki nama jelas")
             print(f"   ✅ Perhutanan Sosial dipilih: semua program terkait PS")
             print(f"   ✅ Jenis Program sesuai: KARBON/KAPASITAS sesuai template")
-            print(f"   ✅ Kategori Hutan untuk program KARBON: 8 program")
+            print(f"   ✅ Kategori Hutan untuk program KARBON: {sum(1 for p in created_programs if p['type'] != 'kapasitas')} program")
             print(f"   ✅ Aksi Mitigasi dipilih: semua program memiliki aksi")
             print(f"   ✅ Rincian Anggaran dari Price List: semua program memiliki item anggaran")
             print(f"   ✅ Status: semua program berstatus 'draft'")
@@ -671,7 +529,7 @@ class ProgramPlanner:
             "timestamp": datetime.now().isoformat(),
             "created_count": created_count,
             "total_programs": len(all_programs),
-            "programs": all_programs[:created_count] if created_count > 0 else []
+            "programs": created_programs
         }
         
         report_file = "program_planner_report.json"
@@ -681,5 +539,15 @@ class ProgramPlanner:
         print(f"\n📄 Report saved to: {report_file}")
 
 if __name__ == "__main__":
-    planner = ProgramPlanner()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Buat program aksi mitigasi untuk carbon project via API")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Jumlah project yang disimpan paralel (default {DEFAULT_WORKERS})")
+    parser.add_argument("--projects", type=int, default=4,
+                        help="Jumlah carbon project (default 4, 0 untuk semua)")
+    parser.add_argument("--yes", action="store_true", help="Lewati konfirmasi")
+    args = parser.parse_args()
+    
+    planner = ProgramPlanner(workers=args.workers, project_limit=args.projects, assume_yes=args.yes)
     planner.run()
\ No newline at end of file
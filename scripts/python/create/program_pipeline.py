@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Pipeline pembuatan program per carbon project secara paralel.
+
+Setiap project dikerjakan oleh satu worker dari thread pool terbatas, dengan
+urutan FK tetap di dalam project: program, link aksi mitigasi, budget, lalu
+budget item. Waktu total mengikuti jumlah project / jumlah worker, bukan
+jumlah project.
+
+Pipeline idempotent: program dengan kode_program yang sudah ada tidak dibuat
+ulang, link dan budget memakai constraint unik (program_id, aksi_mitigasi_id)
+dan budget_code, dan budget item hanya dibuat untuk budget yang belum punya
+item. Menjalankan ulang setelah gagal di tengah jalan hanya melengkapi yang
+kurang.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+DEFAULT_WORKERS = int(os.environ.get('SISINFOPS_PIPELINE_WORKERS', 8))
+
+# program_budget_items.total_amount adalah GENERATED ALWAYS (quantity * unit_price)
+BUDGET_ITEM_COLUMNS = ('price_list_id', 'item_code', 'item_name', 'quantity', 'unit', 'unit_price', 'category')
+
+
+@dataclass
+class PlannedProgram:
+    """Satu program beserta row turunannya, belum tersimpan"""
+    program: dict
+    aksi_ids: List[int] = field(default_factory=list)
+    budget: Optional[dict] = None
+    budget_items: List[dict] = field(default_factory=list)
+
+    @property
+    def kode(self) -> str:
+        return self.program['kode_program']
+
+
+@dataclass
+class ProjectPlan:
+    kode_project: str
+    programs: List[PlannedProgram]
+
+
+@dataclass
+class ProjectResult:
+    """Hasil persist satu project"""
+    kode_project: str
+    program_ids: Dict[str, str] = field(default_factory=dict)
+    created: List[str] = field(default_factory=list)
+    existing: List[str] = field(default_factory=list)
+    budget_items: int = 0
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def budget_item_rows(items: List[dict], budget_id) -> List[dict]:
+    return [dict({k: item.get(k) for k in BUDGET_ITEM_COLUMNS}, program_budget_id=budget_id)
+            for item in items]
+
+
+def run_pipeline(plans: List[ProjectPlan], persist: Callable[[ProjectPlan], ProjectResult],
+                 workers: int = DEFAULT_WORKERS,
+                 on_result: Optional[Callable[[ProjectResult], None]] = None) -> List[ProjectResult]:
+    """
+    Jalankan persist(plan) untuk setiap project di thread pool
+    Exception satu project dicatat di result.error tanpa menghentikan project
+    lain. on_result dipanggil dari thread utama begitu sebuah project selesai;
+    hasil dikembalikan dalam urutan plans. Jumlah worker dibatasi
+    persist.max_workers jika ada (mis. ukuran connection pool).
+    """
+    if not plans:
+        return []
+    workers = min(workers, getattr(persist, 'max_workers', workers))
+    results: List[Optional[ProjectResult]] = [None] * len(plans)
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(plans)))) as pool:
+        futures = {pool.submit(_persist_timed, persist, plan): i for i, plan in enumerate(plans)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if on_result:
+                on_result(result)
+    return results
+
+
+def _persist_timed(persist, plan: ProjectPlan) -> ProjectResult:
+    started = time.perf_counter()
+    try:
+        result = persist(plan)
+    except Exception as e:
+        result = ProjectResult(plan.kode_project, error=str(e))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+class DatabasePersister:
+    """
+    Persist lewat pool sisinfops_db, satu transaksi per project
+    Project tersimpan utuh atau tidak sama sekali, sehingga budget yang sudah
+    ada pasti sudah punya item-nya. Advisory lock per project menjaga dua run
+    yang berjalan bersamaan tidak membuat program yang sama dua kali.
+    """
+
+    def __init__(self, db):
+        from psycopg2.extensions import AsIs
+        self.db = db
+        self.default = AsIs('DEFAULT')
+
+    @property
+    def max_workers(self) -> int:
+        # ThreadedConnectionPool menolak getconn() di atas maxconn, bukan menunggu
+        return self.db.get_pool().maxconn
+
+    def _values(self, rows: List[dict]):
+        # Kolom yang None memakai default kolom, seperti INSERT tanpa kolom itu
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        values = [[self.default if row.get(c) is None else row[c] for c in columns] for row in rows]
+        return columns, values
+
+    def __call__(self, plan: ProjectPlan) -> ProjectResult:
+        from psycopg2.extras import execute_values
+
+        result = ProjectResult(plan.kode_project)
+        with self.db.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"program_pipeline:{plan.kode_project}",))
+
+            codes = [p.kode for p in plan.programs]
+            cur.execute("SELECT kode_program, id FROM programs WHERE kode_program = ANY(%s)", (codes,))
+            ids = dict(cur.fetchall())
+            result.existing = [code for code in codes if code in ids]
+
+            new = [p.program for p in plan.programs if p.kode not in ids]
+            if new:
+                columns, values = self._values(new)
+                created = execute_values(
+                    cur, f"INSERT INTO programs ({', '.join(columns)}) VALUES %s RETURNING kode_program, id",
+                    values, fetch=True,
+                )
+                ids.update(created)
+                result.created = [code for code, _ in created]
+
+            links = [(ids[p.kode], aksi_id) for p in plan.programs for aksi_id in p.aksi_ids]
+            if links:
+                execute_values(
+                    cur, "INSERT INTO program_aksi_mitigasi (program_id, aksi_mitigasi_id) VALUES %s "
+                         "ON CONFLICT (program_id, aksi_mitigasi_id) DO NOTHING",
+                    links,
+                )
+
+            planned = [p for p in plan.programs if p.budget]
+            if planned:
+                columns, values = self._values([dict(p.budget, program_id=ids[p.kode]) for p in planned])
+                budget_ids = dict(execute_values(
+                    cur, f"INSERT INTO program_budgets ({', '.join(columns)}) VALUES %s "
+                         f"ON CONFLICT (budget_code) DO NOTHING RETURNING budget_code, id",
+                    values, fetch=True,
+                ))
+                items = []
+                for p in planned:
+                    if p.budget['budget_code'] in budget_ids:
+                        items += budget_item_rows(p.budget_items, budget_ids[p.budget['budget_code']])
+                if items:
+                    columns, values = self._values(items)
+                    execute_values(cur, f"INSERT INTO program_budget_items ({', '.join(columns)}) VALUES %s",
+                                   values)
+                result.budget_items = len(items)
+            cur.close()
+
+        result.program_ids = {code: ids[code] for code in codes}
+        return result
+
+
+class RestPersister:
+    """
+    Persist lewat PostgREST (sisinfops_db.RestClient), satu request bulk per
+    tabel per project
+    Tanpa transaksi, idempotensi berasal dari pengecekan row yang sudah ada
+    sebelum setiap insert.
+    Karena row satu tabel dikirim dalam satu request, satu row yang ditolak
+    menggagalkan insert seluruh row tabel itu untuk project tersebut (dulu
+    row dikirim satu per satu dan hanya row yang buruk yang gagal). Project
+    dilaporkan gagal; setelah datanya diperbaiki, menjalankan ulang hanya
+    melengkapi yang kurang.
+    """
+
+    def __init__(self, rest):
+        from sisinfops_db import in_filter
+        self.rest = rest
+        self.in_filter = in_filter
+
+    def __call__(self, plan: ProjectPlan) -> ProjectResult:
+        rest = self.rest
+        result = ProjectResult(plan.kode_project)
+
+        codes = [p.kode for p in plan.programs]
+        ids = {row['kode_program']: row['id'] for row in
+               rest.select('programs', 'id,kode_program', kode_program=self.in_filter(codes))}
+        result.existing = [code for code in codes if code in ids]
+
+        new = [p.program for p in plan.programs if p.kode not in ids]
+        if new:
+            created = rest.insert('programs', new)
+            ids.update((row['kode_program'], row['id']) for row in created)
+            result.created = [row['kode_program'] for row in created]
+
+        links = [{"program_id": ids[p.kode], "aksi_mitigasi_id": aksi_id}
+                 for p in plan.programs for aksi_id in p.aksi_ids]
+        if links:
+            rest.insert('program_aksi_mitigasi', links, returning=False,
+                        on_conflict='program_id,aksi_mitigasi_id', ignore_duplicates=True)
+
+        planned = [p for p in plan.programs if p.budget]
+        if planned:
+            budget_codes = [p.budget['budget_code'] for p in planned]
+            budget_ids = {row['budget_code']: row['id'] for row in
+                          rest.select('program_budgets', 'id,budget_code',
+                                      budget_code=self.in_filter(budget_codes))}
+            # A budget from an earlier, interrupted run may still lack its items
+            with_items = set()
+            if budget_ids:
+                with_items = {row['program_budget_id'] for row in
+                              rest.select('program_budget_items', 'program_budget_id',
+                                          program_budget_id=self.in_filter(budget_ids.values()))}
+            missing = [dict(p.budget, program_id=ids[p.kode]) for p in planned
+                       if p.budget['budget_code'] not in budget_ids]
+            if missing:
+                budget_ids.update((row['budget_code'], row['id']) for row in
+                                  rest.insert('program_budgets', missing))
+            items = []
+            for p in planned:
+                budget_id = budget_ids.get(p.budget['budget_code'])
+                if budget_id is not None and budget_id not in with_items:
+                    items += budget_item_rows(p.budget_items, budget_id)
+            if items:
+                rest.insert('program_budget_items', items, returning=False)
+            result.budget_items = len(items)
+
+        result.program_ids = {code: ids[code] for code in codes}
+        return result
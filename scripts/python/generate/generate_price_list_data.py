@@ -4,10 +4,17 @@ Script untuk generate 500 item price_list untuk project karbon
 Mengikuti 25 kategori yang sudah difinalisasi
 """
 
+import argparse
 import json
+import os
+import sys
 import uuid
+from collections import Counter
 from datetime import datetime, timedelta
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'insert'))
+from bulk_load import format_copy_row
+
 # 25 Kategori yang sudah difinalisasi
 CATEGORIES = [
     "jasa_konsultasi",
@@ -501,135 +508,264 @@ ITEM_TEMPLATES = {
     ]
 }
 
-def generate_items():
-    """Generate 500 items for price_list"""
-    items = []
+PRICE_LIST_COLUMNS = [
+    "id", "item_code", "item_name", "item_description", "unit", "unit_price", "currency",
+    "category", "is_active", "valid_from", "valid_until", "created_at"
+]
+
+DEFAULT_COUNT = 500
+DEFAULT_BATCH_SIZE = 1000
+OUTPUT_DIR = '/home/sangumang/Documents/sisinfops'
+
+def _timestamps():
+    """valid_from, valid_until dan created_at, dihitung sekali per batch"""
+    now = datetime.now()
+    return {
+        "valid_from": now.strftime("%Y-%m-%d"),
+        "valid_until": (now + timedelta(days=365*3)).strftime("%Y-%m-%d"),
+        "created_at": now.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def _iter_item_specs(count):
+    """Yield (category, item_code, name, description, unit, price) tanpa menyimpan semua item"""
+    produced = 0
     item_counter = 1
     
     for category in CATEGORIES:
-        if category in ITEM_TEMPLATES:
-            for template in ITEM_TEMPLATES[category]:
-                item_id = str(uuid.uuid4())
-                item_code = f"{category[:3].upper()}-{item_counter:03d}"
-                
-                item = {
-                    "id": item_id,
-                    "item_code": item_code,
-                    "item_name": template["name"],
-                    "item_description": f"{template['name']} untuk project karbon",
-                    "unit": template["unit"],
-                    "unit_price": float(template["price"]),
-                    "currency": "IDR",
-                    "category": category,
-                    "is_active": True,
-                    "valid_from": datetime.now().strftime("%Y-%m-%d"),
-                    "valid_until": (datetime.now() + timedelta(days=365*3)).strftime("%Y-%m-%d"),
-                    "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-                items.append(item)
-                item_counter += 1
+        for template in ITEM_TEMPLATES.get(category, []):
+            if produced >= count:
+                return
+            yield (
+                category,
+                f"{category[:3].upper()}-{item_counter:03d}",
+                template["name"],
+                f"{template['name']} untuk project karbon",
+                template["unit"],
+                template["price"]
+            )
+            item_counter += 1
+            produced += 1
     
-    # Jika kurang dari 500, tambahkan item tambahan
-    while len(items) < 500:
-        category = CATEGORIES[len(items) % len(CATEGORIES)]
-        item_id = str(uuid.uuid4())
-        item_code = f"EXT-{len(items)+1:03d}"
-        
-        item = {
-            "id": item_id,
+    # Jika kurang dari count, tambahkan item tambahan
+    while produced < count:
+        yield (
+            CATEGORIES[produced % len(CATEGORIES)],
+            f"EXT-{produced+1:03d}",
+            f"Item Tambahan {produced+1}",
+            "Item tambahan untuk kelengkapan price list project karbon",
+            "unit",
+            1000000
+        )
+        produced += 1
+
+def iter_item_batches(count=DEFAULT_COUNT, batch_size=DEFAULT_BATCH_SIZE):
+    """Generate items price_list dalam batch (list of dict) dengan memori konstan"""
+    batch = []
+    stamps = _timestamps()
+    
+    for category, item_code, name, description, unit, price in _iter_item_specs(count):
+        batch.append({
+            "id": str(uuid.uuid4()),
             "item_code": item_code,
-            "item_name": f"Item Tambahan {len(items)+1}",
-            "item_description": f"Item tambahan untuk kelengkapan price list project karbon",
-            "unit": "unit",
-            "unit_price": 1000000.0,
+            "item_name": name,
+            "item_description": description,
+            "unit": unit,
+            "unit_price": float(price),
             "currency": "IDR",
             "category": category,
             "is_active": True,
-            "valid_from": datetime.now().strftime("%Y-%m-%d"),
-            "valid_until": (datetime.now() + timedelta(days=365*3)).strftime("%Y-%m-%d"),
-            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        items.append(item)
+            **stamps
+        })
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+            stamps = _timestamps()
     
-    return items[:500]  # Pastikan hanya 500 item
+    if batch:
+        yield batch
 
-def main():
-    print("Generating 500 price list items...")
-    items = generate_items()
-    
-    # Save to JSON file
-    with open('/home/sangumang/Documents/sisinfops/price_list_500_items.json', 'w') as f:
-        json.dump(items, f, indent=2)
-    
-    print(f"✅ Generated {len(items)} items")
-    print(f"📁 Saved to: price_list_500_items.json")
+def generate_items(count=DEFAULT_COUNT):
+    """Generate items for price_list (default 500)"""
+    return [item for batch in iter_item_batches(count) for item in batch]
+
+def sql_literal(value):
+    """Format nilai Python sebagai literal SQL"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+class SqlValuesSink:
+    """INSERT multi-row VALUES, satu statement per batch"""
+    extension = "sql"
     
-    # Create SQL file
-    create_sql_file(items)
+    def __init__(self, f):
+        self.f = f
     
-    # Show statistics
-    show_statistics(items)
-
-def create_sql_file(items):
-    """Create SQL INSERT statements"""
-    sql_content = """-- SQL INSERT statements for 500 price_list items
+    def begin(self):
+        self.f.write("""-- SQL INSERT statements for price_list items
 -- Generated for Carbon Project price list
--- Total: 500 items across 25 categories
 
 BEGIN;
 
 -- Clear existing data (optional, comment out if you want to keep existing data)
 -- DELETE FROM price_list;
 
-"""
+""")
+    
+    def write_batch(self, batch):
+        self.f.write(f"INSERT INTO price_list ({', '.join(PRICE_LIST_COLUMNS)}) VALUES\n")
+        self.f.write(",\n".join(
+            "(" + ", ".join(sql_literal(item[c]) for c in PRICE_LIST_COLUMNS) + ")"
+            for item in batch
+        ))
+        self.f.write(";\n\n")
     
-    for item in items:
-        sql_content += f"""INSERT INTO price_list (
-    id, item_code, item_name, item_description, unit, unit_price, currency,
-    category, is_active, valid_from, valid_until, created_at
-) VALUES (
-    '{item["id"]}',
-    '{item["item_code"]}',
-    '{item["item_name"]}',
-    '{item["item_description"]}',
-    '{item["unit"]}',
-    {item["unit_price"]},
-    '{item["currency"]}',
-    '{item["category"]}',
-    {str(item["is_active"]).lower()},
-    '{item["valid_from"]}',
-    '{item["valid_until"]}',
-    '{item["created_at"]}'
-);
+    def end(self):
+        self.f.write("COMMIT;\n")
 
-"""
+class CopyTsvSink:
+    """COPY text format (tab separated), untuk COPY price_list FROM STDIN"""
+    extension = "tsv"
     
-    sql_content += "COMMIT;\n"
+    def __init__(self, f):
+        self.f = f
     
-    with open('/home/sangumang/Documents/sisinfops/price_list_500_items.sql', 'w') as f:
-        f.write(sql_content)
+    def begin(self):
+        pass
     
-    print(f"📁 SQL file created: price_list_500_items.sql")
+    def write_batch(self, batch):
+        self.f.writelines(format_copy_row([item[c] for c in PRICE_LIST_COLUMNS]) for item in batch)
+    
+    def end(self):
+        pass
 
-def show_statistics(items):
-    """Show statistics about generated items"""
-    from collections import Counter
+class NdjsonSink:
+    """Newline-delimited JSON, satu item per baris"""
+    extension = "ndjson"
+    
+    def __init__(self, f):
+        self.f = f
     
-    categories = [item["category"] for item in items]
-    category_counts = Counter(categories)
+    def begin(self):
+        pass
     
+    def write_batch(self, batch):
+        self.f.writelines(json.dumps(item, ensure_ascii=False) + "\n" for item in batch)
+    
+    def end(self):
+        pass
+
+class JsonArraySink:
+    """JSON array (format lama, dibaca oleh insert_price_list_to_db.py)"""
+    extension = "json"
+    
+    def __init__(self, f):
+        self.f = f
+        self.first = True
+    
+    def begin(self):
+        self.f.write("[")
+    
+    def write_batch(self, batch):
+        for item in batch:
+            self.f.write("\n  " if self.first else ",\n  ")
+            self.f.write(json.dumps(item, indent=2).replace("\n", "\n  "))
+            self.first = False
+    
+    def end(self):
+        self.f.write("\n]" if not self.first else "]")
+
+SINKS = {
+    "sql": SqlValuesSink,
+    "tsv": CopyTsvSink,
+    "ndjson": NdjsonSink,
+    "json": JsonArraySink,
+}
+
+class ItemStatistics:
+    """Statistik yang dihitung sambil streaming"""
+    
+    def __init__(self):
+        self.category_counts = Counter()
+        self.total = 0
+        self.total_value = 0.0
+    
+    def begin(self):
+        pass
+    
+    def write_batch(self, batch):
+        for item in batch:
+            self.category_counts[item["category"]] += 1
+            self.total_value += item["unit_price"]
+        self.total += len(batch)
+    
+    def end(self):
+        pass
+
+def write_items(batches, sinks):
+    """Stream batch items ke semua sinks sekaligus"""
+    for sink in sinks:
+        sink.begin()
+    for batch in batches:
+        for sink in sinks:
+            sink.write_batch(batch)
+    for sink in sinks:
+        sink.end()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate price_list items")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT,
+                        help="Jumlah item (default: 500)")
+    parser.add_argument("--format", dest="formats", action="append", choices=sorted(SINKS),
+                        help="Format output, bisa diulang (default: json dan sql)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR,
+                        help="Direktori output")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Jumlah item per batch / per INSERT")
+    args = parser.parse_args()
+    formats = args.formats or ["json", "sql"]
+    
+    print(f"Generating {args.count} price list items...")
+    
+    files = []
+    try:
+        sinks = []
+        for fmt in formats:
+            path = os.path.join(args.output_dir, f"price_list_{args.count}_items.{SINKS[fmt].extension}")
+            f = open(path, "w", encoding="utf-8")
+            files.append((path, f))
+            sinks.append(SINKS[fmt](f))
+        
+        stats = ItemStatistics()
+        write_items(iter_item_batches(args.count, args.batch_size), sinks + [stats])
+    finally:
+        for _, f in files:
+            f.close()
+    
+    print(f"✅ Generated {stats.total} items")
+    for path, _ in files:
+        print(f"📁 Saved to: {os.path.basename(path)}")
+    
+    # Show statistics
+    show_statistics(stats)
+
+def show_statistics(stats):
+    """Show statistics about generated items"""
     print("\n📊 STATISTICS:")
     print("=" * 50)
-    print(f"Total Items: {len(items)}")
-    print(f"Unique Categories: {len(set(categories))}")
+    print(f"Total Items: {stats.total}")
+    print(f"Unique Categories: {len(stats.category_counts)}")
     print("\nItems per Category:")
-    for category, count in sorted(category_counts.items()):
+    for category, count in sorted(stats.category_counts.items()):
         print(f"  • {category}: {count} items")
     
     # Calculate total value
-    total_value = sum(item["unit_price"] for item in items)
-    print(f"\n💰 Total Value (sum of unit_price): Rp {total_value:,.0f}")
+    print(f"\n💰 Total Value (sum of unit_price): Rp {stats.total_value:,.0f}")
     print("=" * 50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
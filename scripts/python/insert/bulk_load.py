@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Bulk loader untuk Supabase/PostgreSQL berbasis COPY FROM STDIN.
+
+Rows di-stream ke temp table lewat satu COPY, lalu dipindahkan ke tabel tujuan
+dengan satu INSERT ... ON CONFLICT DO NOTHING RETURNING. Jumlah round trip
+tetap (tidak bergantung pada jumlah rows).
+"""
+
+import re
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal
+
+COPY_NULL = '\\N'
+
+# Karakter yang harus di-escape di COPY text format
+_COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+_COPY_SPECIAL = re.compile(r'[\\\t\n\r]')
+
+
+def quote_ident(name):
+    """Quote identifier PostgreSQL (mendukung schema.table)"""
+    return '.'.join('"' + part.replace('"', '""') + '"' for part in name.split('.'))
+
+
+def format_copy_value(value):
+    """Format satu nilai Python untuk COPY text format"""
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    value = str(value)
+    return value.translate(_COPY_ESCAPES) if _COPY_SPECIAL.search(value) else value
+
+
+def format_copy_row(values):
+    """Format satu row (urutan kolom) menjadi satu baris COPY text format"""
+    return '\t'.join(format_copy_value(v) for v in values) + '\n'
+
+
+class CopyStream:
+    """File-like object yang membaca baris COPY dari iterator secara lazy"""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ''
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._buffer + ''.join(self._lines)
+            self._buffer = ''
+            return data
+
+        parts = [self._buffer]
+        length = len(self._buffer)
+        for line in self._lines:
+            parts.append(line)
+            length += len(line)
+            if length >= size:
+                break
+        data = ''.join(parts)
+        self._buffer = data[size:]
+        return data[:size]
+
+
+class BulkResult:
+    """Hasil bulk insert: key yang ter-insert dan yang dilewati"""
+
+    def __init__(self, staged, inserted, skipped):
+        self.staged = staged
+        self.inserted = inserted
+        self.skipped = skipped
+
+    @property
+    def inserted_count(self):
+        return len(self.inserted)
+
+    @property
+    def skipped_count(self):
+        return len(self.skipped)
+
+
+def bulk_insert(conn, table, columns, rows, conflict_columns, key_column=None,
+                commit=True):
+    """
+    Insert rows (dict atau sequence sesuai urutan columns) ke table.
+
+    Rows yang bentrok pada conflict_columns dilewati. key_column (default:
+    kolom conflict pertama) dipakai untuk melaporkan key yang ter-insert
+    dan yang dilewati.
+    """
+    key_column = key_column or conflict_columns[0]
+    key_index = columns.index(key_column)
+    staged_keys = []
+
+    def copy_lines():
+        for row in rows:
+            values = [row[c] for c in columns] if isinstance(row, dict) else row
+            staged_keys.append(values[key_index])
+            yield format_copy_row(values)
+
+    target = quote_ident(table)
+    column_list = ', '.join(quote_ident(c) for c in columns)
+    conflict_list = ', '.join(quote_ident(c) for c in conflict_columns)
+    staging = quote_ident('_bulk_' + table.split('.')[-1])
+
+    cur = conn.cursor()
+    try:
+        # Temp table dengan tipe kolom yang sama dengan tabel tujuan
+        cur.execute(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {column_list} FROM {target} WITH NO DATA"
+        )
+        cur.copy_expert(
+            f"COPY {staging} ({column_list}) FROM STDIN",
+            CopyStream(copy_lines()),
+        )
+        cur.execute(
+            f"INSERT INTO {target} ({column_list}) "
+            f"SELECT {column_list} FROM {staging} "
+            f"ON CONFLICT ({conflict_list}) DO NOTHING "
+            f"RETURNING {quote_ident(key_column)}"
+        )
+        inserted_keys = [row[0] for row in cur.fetchall()]
+        if commit:
+            conn.commit()
+        else:
+            cur.execute(f"DROP TABLE {staging}")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    # Key dari database dibandingkan sebagai string agar tipe (mis. UUID) cocok
+    remaining = Counter(str(k) for k in inserted_keys)
+    skipped = []
+    for key in staged_keys:
+        if remaining[str(key)] > 0:
+            remaining[str(key)] -= 1
+        else:
+            skipped.append(key)
+    return BulkResult(staged=len(staged_keys), inserted=inserted_keys, skipped=skipped)
@@ -6,38 +6,15 @@ Script untuk insert 500 item price_list ke database Supabase
 import json
 import psycopg2
 import os
-import re
-from datetime import datetime
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import sisinfops_db as db
+from bulk_load import bulk_insert
 
 def get_supabase_credentials():
     """Get Supabase database credentials from .env.local"""
-    env_path = '/home/sangumang/Documents/sisinfops/.env.local'
-    with open(env_path, 'r') as f:
-        content = f.read()
-    
-    supabase_url = ''
-    for line in content.split('\n'):
-        if line.startswith('NEXT_PUBLIC_SUPABASE_URL='):
-            supabase_url = line.split('=', 1)[1].strip().strip('"\'')
-            break
-    
-    # Extract project ref from URL
-    match = re.search(r'https://([a-zA-Z0-9]+)\.supabase\.co', supabase_url)
-    if not match:
-        raise ValueError("Invalid Supabase URL format")
-    
-    project_ref = match.group(1)
-    db_host = f'db.{project_ref}.supabase.co'
-    db_password = '4@@E-Zd%zCQ!7ZV'  # Password dari informasi sebelumnya
-    
-    return {
-        'host': db_host,
-        'port': 5432,
-        'database': 'postgres',
-        'user': 'postgres',
-        'password': db_password,
-        'sslmode': 'require'
-    }
+    return db.get_db_params()
 
 def check_existing_data(conn):
     """Check existing data in price_list table"""
@@ -55,64 +32,28 @@ def check_existing_data(conn):
     finally:
         cur.close()
 
+PRICE_LIST_COLUMNS = [
+    'id', 'item_code', 'item_name', 'item_description', 'unit', 'unit_price', 'currency',
+    'category', 'is_active', 'valid_from', 'valid_until', 'created_at'
+]
+
 def insert_items(conn, items):
-    """Insert items into price_list table"""
-    cur = conn.cursor()
-    inserted_count = 0
-    skipped_count = 0
-    
+    """Insert items into price_list table (COPY ke temp table + satu INSERT)"""
     print(f"\n📤 Inserting {len(items)} items to price_list...")
     
-    for item in items:
-        try:
-            # Check if item with same code already exists
-            cur.execute(
-                "SELECT COUNT(*) FROM price_list WHERE item_code = %s",
-                (item['item_code'],)
-            )
-            exists = cur.fetchone()[0] > 0
-            
-            if exists:
-                print(f"   ⚠️  Skipping {item['item_code']} - already exists")
-                skipped_count += 1
-                continue
-            
-            # Insert new item
-            cur.execute("""
-                INSERT INTO price_list (
-                    id, item_code, item_name, item_description, unit, unit_price, currency,
-                    category, is_active, valid_from, valid_until, created_at
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-            """, (
-                item['id'],
-                item['item_code'],
-                item['item_name'],
-                item['item_description'],
-                item['unit'],
-                item['unit_price'],
-                item['currency'],
-                item['category'],
-                item['is_active'],
-                item['valid_from'],
-                item['valid_until'],
-                item['created_at']
-            ))
-            
-            inserted_count += 1
-            if inserted_count % 50 == 0:
-                print(f"   ✅ Inserted {inserted_count} items...")
-                
-        except Exception as e:
-            print(f"   ❌ Error inserting {item['item_code']}: {str(e)}")
-            conn.rollback()
-            cur = conn.cursor()  # Reset cursor after error
-            skipped_count += 1
+    result = bulk_insert(
+        conn,
+        'price_list',
+        PRICE_LIST_COLUMNS,
+        items,
+        conflict_columns=['item_code']
+    )
+    
+    for item_code in result.skipped:
+        print(f"   ⚠️  Skipping {item_code} - already exists")
+    print(f"   ✅ Inserted {result.inserted_count} items")
     
-    conn.commit()
-    cur.close()
-    return inserted_count, skipped_count
+    return result.inserted_count, result.skipped_count
 
 def main():
     print("🚀 Starting price_list data insertion to Supabase...")
@@ -71,42 +71,32 @@ def main():
         ORDER BY created_at DESC;
         """,
         
-        # 3. Update existing projects with investor data
+        # 3. Update existing projects with investor data (one set-based UPDATE, no row loop)
         """
-        DO $$
-        DECLARE
-            project_record RECORD;
-            base_investment DECIMAL;
-            base_roi DECIMAL;
-            base_carbon DECIMAL;
-        BEGIN
-            FOR project_record IN SELECT id, luas_total_ha, status FROM carbon_projects WHERE status NOT IN ('archived', 'cancelled')
-            LOOP
-                -- Calculate realistic values based on project size and status
-                base_investment := project_record.luas_total_ha * 5000000; -- 5 million per hectare
-                base_roi := CASE 
-                    WHEN project_record.status = 'active' THEN 18.0 -- 18% for active
-                    WHEN project_record.status = 'approved' THEN 15.0 -- 15% for approved
+        UPDATE carbon_projects AS cp
+        SET 
+            investment_amount = cp.luas_total_ha * 5000000, -- 5 million per hectare
+            roi_percentage = r.base_roi,
+            carbon_sequestration_estimated = cp.luas_total_ha * 100 * 10, -- 100 tons per hectare per year × 10 years
+            project_period_years = 10,
+            performance_rating = CASE 
+                WHEN r.base_roi > 20 THEN 'excellent'
+                WHEN r.base_roi > 15 THEN 'good'
+                WHEN r.base_roi > 10 THEN 'average'
+                ELSE 'poor'
+            END,
+            last_investor_update = NOW()
+        FROM (
+            SELECT id,
+                CASE 
+                    WHEN status = 'active' THEN 18.0 -- 18% for active
+                    WHEN status = 'approved' THEN 15.0 -- 15% for approved
                     ELSE 10.0 -- 10% for others
-                END;
-                base_carbon := project_record.luas_total_ha * 100 * 10; -- 100 tons per hectare per year × 10 years
-                
-                UPDATE carbon_projects
-                SET 
-                    investment_amount = base_investment,
-                    roi_percentage = base_roi,
-                    carbon_sequestration_estimated = base_carbon,
-                    project_period_years = 10,
-                    performance_rating = CASE 
-                        WHEN base_roi > 20 THEN 'excellent'
-                        WHEN base_roi > 15 THEN 'good'
-                        WHEN base_roi > 10 THEN 'average'
-                        ELSE 'poor'
-                    END,
-                    last_investor_update = NOW()
-                WHERE id = project_record.id;
-            END LOOP;
-        END $$;
+                END AS base_roi
+            FROM carbon_projects
+            WHERE status NOT IN ('archived', 'cancelled')
+        ) AS r
+        WHERE cp.id = r.id;
         """
     ]
     
@@ -154,7 +144,7 @@ def main():
     print("\n🎯 RECOMMENDED APPROACH:")
     print("1. Run: python create_carbon_projects_basic.py")
     print("2. Run migration manually in Supabase Dashboard")
-    print("3. Run: python update_investor_data.py")
+    print("3. Run: python scripts/python/update/update_investor_data_corrected.py")
     
     # Create basic carbon projects script
     create_basic_script()
@@ -164,7 +154,7 @@ def create_basic_script():
     basic_script = """#!/usr/bin/env python3
 \"\"\"
 Script untuk membuat 4 project karbon tanpa kolom investor.
-Setelah migration dijalankan manual, gunakan update_investor_data.py
+Setelah migration dijalankan manual, gunakan update/update_investor_data_corrected.py
 \"\"\"
 
 import os
@@ -282,7 +272,7 @@ def main():
     print(f"\\n📊 Created {created} out of 4 projects")
     print("\\n📋 NEXT STEPS:")
     print("1. Run migration manually in Supabase Dashboard")
-    print("2. Then run: python update_investor_data.py")
+    print("2. Then run: python scripts/python/update/update_investor_data_corrected.py")
 
 if __name__ == "__main__":
     main()
@@ -294,122 +284,13 @@ if __name__ == "__main__":
     
     print(f"\n✅ Created basic script: {script_path}")
     
-    # Create update investor data script
-    update_script = """#!/usr/bin/env python3
-\"\"\"
-Script untuk update data investor setelah migration dijalankan.
-\"\"\"
-
-import os
-import sys
-from supabase import create_client
-from dotenv import load_dotenv
-
-load_dotenv('.env.local')
-
-def calculate_investor_data(luas_ha):
-    investment = luas_ha * 5000000  # Rp 5 juta per hektar
-    roi = 18.0  # 18% ROI
-    carbon_seq = luas_ha * 100 * 10  # 100 ton/ha/year × 10 years
-    
-    if roi >= 20:
-        performance_rating = "excellent"
-    elif roi >= 15:
-        performance_rating = "good"
-    elif roi >= 10:
-        performance_rating = "average"
-    else:
-        performance_rating = "poor"
-    
-    return {
-        "investment_amount": investment,
-        "roi_percentage": roi,
-        "carbon_sequestration_estimated": carbon_seq,
-        "project_period_years": 10,
-        "performance_rating": performance_rating,
-        "investor_notes": f"Project berbasis {luas_ha:,.0f} Ha dengan estimasi ROI {roi}%"
-    }
-
-def main():
-    print("🔄 UPDATING INVESTOR DATA FOR CARBON PROJECTS")
-    print("=" * 60)
-    
-    supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    
-    if not supabase_url or not supabase_key:
-        print("❌ ERROR: Missing Supabase configuration")
-        sys.exit(1)
-    
-    try:
-        supabase = create_client(supabase_url, supabase_key)
-        print(f"✅ Connected to Supabase")
-    except Exception as e:
-        print(f"❌ Failed to connect to Supabase: {e}")
-        sys.exit(1)
-    
-    # Get all carbon projects
-    try:
-        response = supabase.table("carbon_projects").select("*").execute()
-        projects = response.data
-        print(f"📊 Found {len(projects)} carbon projects")
-    except Exception as e:
-        print(f"❌ Failed to get projects: {e}")
-        sys.exit(1)
-    
-    if not projects:
-        print("❌ No carbon projects found")
-        return
-    
-    print("\n📋 UPDATING PROJECTS:")
-    print("-" * 60)
-    
-    updated = 0
-    for project in projects:
-        print(f"\\n🔹 {project.get('nama_project', 'Unknown')}")
-        print(f"   ID: {project.get('id')}")
-        print(f"   Luas: {project.get('luas_total_ha', 0):,.2f} Ha")
-        
-        luas = project.get('luas_total_ha', 0)
-        if not luas:
-            print("   ⚠️  Skipping: No luas data")
-            continue
-        
-        investor_data = calculate_investor_data(luas)
-        
-        try:
-            response = supabase.table("carbon_projects").update(investor_data).eq("id", project["id"]).execute()
-            if response.data:
-                updated += 1
-                print(f"   ✅ Updated investor data")
-                print(f"   💰 Investment: Rp {investor_data['investment_amount']:,.0f}")
-                print(f"   📈 ROI: {investor_data['roi_percentage']}%")
-                print(f"   🌳 Carbon: {investor_data['carbon_sequestration_estimated']:,.0f} tons")
-            else:
-                print(f"   ❌ Failed to update")
-        except Exception as e:
-            print(f"   ❌ Error: {str(e)[:100]}")
-    
-    print(f"\\n📊 Updated {updated} out of {len(projects)} projects")
-    print("\\n✅ INVESTOR DATA UPDATE COMPLETE!")
-    print("\\n📋 NEXT STEPS:")
-    print("1. Check investor dashboard: http://localhost:3000/id/dashboard/investor")
-    print("2. Verify data source shows 'database_views' or 'database_direct'")
-
-if __name__ == "__main__":
-    main()
-"""
-    
-    update_path = "update_investor_data.py"
-    with open(update_path, 'w') as f:
-        f.write(update_script)
-    
-    print(f"✅ Created update script: {update_path}")
+    # Investor data is recomputed for all projects in one UPDATE by
+    # update/update_investor_data_corrected.py instead of a generated per-row script
     
     print("\n📋 COMPLETE WORKFLOW:")
     print("1. python create_carbon_projects_basic.py")
     print("2. Run migration manually in Supabase Dashboard")
-    print("3. python update_investor_data.py")
+    print("3. python scripts/python/update/update_investor_data_corrected.py")
     print("4. python verify_investor_dashboard.py")
 
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+"""
+Akses database bersama untuk scripts/python
+
+    import sisinfops_db as db
+
+    with db.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM programs")
+
+Konfigurasi dibaca dari .env.local satu kali per proses dan semua query
+memakai satu ThreadedConnectionPool. db.get_snapshot() memberi katalog
+database (tabel, kolom, constraint, index, policy) dari cache, dan
+db.RestClient() akses REST API Supabase dengan satu session keep-alive.
+"""
+from .config import ConfigError, get_db_params, load_env, reset_cache
+from .pool import close_pool, connection, cursor, fetch_all, get_pool
+from .rest import RestClient, RestError, in_filter
+from .schema import (SchemaChange, SchemaSnapshot, diff_snapshots, fetch_snapshot, get_snapshot,
+                     load_snapshot, save_snapshot)
+
+__all__ = [
+    "ConfigError",
+    "RestClient",
+    "RestError",
+    "SchemaChange",
+    "SchemaSnapshot",
+    "close_pool",
+    "connection",
+    "cursor",
+    "diff_snapshots",
+    "fetch_all",
+    "fetch_snapshot",
+    "get_db_params",
+    "get_pool",
+    "get_snapshot",
+    "in_filter",
+    "load_env",
+    "load_snapshot",
+    "reset_cache",
+    "save_snapshot",
+]
@@ -0,0 +1,6 @@
+"""python3 -m sisinfops_db snapshot|diff, lihat sisinfops_db/schema.py"""
+import sys
+
+from .schema import main
+
+sys.exit(main())
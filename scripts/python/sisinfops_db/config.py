@@ -0,0 +1,129 @@
+"""
+Resolusi konfigurasi database untuk scripts/python
+Membaca .env.local satu kali per proses dan membangun parameter psycopg2
+"""
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+ENV_FILENAME = ".env.local"
+
+_SUPABASE_URL_RE = re.compile(r"https://([a-zA-Z0-9]+)\.supabase\.co")
+
+# SUPABASE_DB_MODE: langsung ke database, atau lewat pooler Supabase (satu
+# koneksi server per sesi / per transaksi). Mode transaction membuat banyak
+# worker paralel tidak menghabiskan max_connections.
+CONNECTION_MODES = ("direct", "session", "transaction")
+MODE_PORTS = {"direct": 5432, "session": 5432, "transaction": 6543}
+
+_lock = threading.Lock()
+_env_cache: Optional[Dict[str, str]] = None
+_params_cache: Optional[Dict[str, object]] = None
+
+
+class ConfigError(Exception):
+    """Konfigurasi database tidak lengkap atau tidak valid"""
+
+
+def find_env_file() -> Optional[str]:
+    """Cari .env.local: SISINFOPS_ENV_FILE, direktori kerja, lalu root project"""
+    candidates = [
+        os.environ.get("SISINFOPS_ENV_FILE"),
+        os.path.join(os.getcwd(), ENV_FILENAME),
+        os.path.join(PROJECT_ROOT, ENV_FILENAME),
+    ]
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def parse_env_file(path: str) -> Dict[str, str]:
+    """Parse file KEY=VALUE (komentar, baris kosong dan prefix export diabaikan)"""
+    values = {}
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            if line.startswith("export "):
+                line = line[len("export "):]
+            key, value = line.split("=", 1)
+            values[key.strip()] = value.strip().strip("\"'")
+    return values
+
+
+def load_env() -> Dict[str, str]:
+    """Isi .env.local (di-cache per proses), ditimpa oleh environment variables"""
+    global _env_cache
+    with _lock:
+        if _env_cache is None:
+            path = find_env_file()
+            values = parse_env_file(path) if path else {}
+            values.update(os.environ)
+            _env_cache = values
+        return _env_cache
+
+
+def get_db_params() -> Dict[str, object]:
+    """
+    Parameter koneksi psycopg2 (di-cache per proses)
+    Host diturunkan dari NEXT_PUBLIC_SUPABASE_URL kecuali SUPABASE_DB_HOST di-set.
+    Dengan SUPABASE_DB_MODE=session/transaction dan SUPABASE_DB_POOLER_HOST,
+    koneksi lewat shared pooler dengan user postgres.<project_ref>; mode
+    transaction tanpa pooler host memakai dedicated pooler (port 6543).
+    SUPABASE_DB_PASSWORD wajib ada (environment atau .env.local).
+    """
+    global _params_cache
+    if _params_cache is not None:
+        return dict(_params_cache)
+
+    env = load_env()
+    mode = env.get("SUPABASE_DB_MODE", "direct")
+    if mode not in CONNECTION_MODES:
+        raise ConfigError(f"SUPABASE_DB_MODE tidak valid: {mode} ({', '.join(CONNECTION_MODES)})")
+    match = _SUPABASE_URL_RE.search(env.get("NEXT_PUBLIC_SUPABASE_URL", ""))
+    host = env.get("SUPABASE_DB_HOST")
+    if not host:
+        supabase_url = env.get("NEXT_PUBLIC_SUPABASE_URL", "")
+        if not supabase_url:
+            raise ConfigError(f"NEXT_PUBLIC_SUPABASE_URL tidak ditemukan di {ENV_FILENAME}")
+        if not match:
+            raise ConfigError(f"Format Supabase URL tidak valid: {supabase_url}")
+        host = f"db.{match.group(1)}.supabase.co"
+
+    user = "postgres"
+    pooler_host = env.get("SUPABASE_DB_POOLER_HOST")
+    if mode != "direct" and pooler_host:
+        if not match:
+            raise ConfigError("Shared pooler butuh project ref dari NEXT_PUBLIC_SUPABASE_URL")
+        host = pooler_host
+        user = f"postgres.{match.group(1)}"
+    elif mode == "session":
+        raise ConfigError("SUPABASE_DB_MODE=session butuh SUPABASE_DB_POOLER_HOST")
+
+    password = env.get("SUPABASE_DB_PASSWORD")
+    if not password:
+        raise ConfigError(f"SUPABASE_DB_PASSWORD tidak ditemukan di environment maupun {ENV_FILENAME}")
+
+    params = {
+        "host": host,
+        "port": int(env.get("SUPABASE_DB_PORT", MODE_PORTS[mode])),
+        "database": env.get("SUPABASE_DB_NAME", "postgres"),
+        "user": env.get("SUPABASE_DB_USER", user),
+        "password": password,
+        "sslmode": env.get("SUPABASE_DB_SSLMODE", "require"),
+    }
+    with _lock:
+        _params_cache = params
+    return dict(params)
+
+
+def reset_cache():
+    """Lupakan konfigurasi yang di-cache (mis. setelah .env.local berubah)"""
+    global _env_cache, _params_cache
+    with _lock:
+        _env_cache = None
+        _params_cache = None
@@ -0,0 +1,97 @@
+"""
+Connection pool bersama untuk scripts/python
+Satu ThreadedConnectionPool per proses, dibuat saat pertama kali dipakai,
+sehingga script dengan banyak query hanya membayar SSL handshake sekali
+"""
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
+
+from .config import get_db_params
+
+# psycopg2 menutup koneksi di atas minconn saat dikembalikan ke pool, jadi
+# minconn adalah jumlah koneksi yang tetap terbuka di antara query
+DEFAULT_MIN_CONNECTIONS = int(os.environ.get("SISINFOPS_DB_POOL_MIN", 1))
+DEFAULT_MAX_CONNECTIONS = int(os.environ.get("SISINFOPS_DB_POOL_MAX", 5))
+
+_lock = threading.Lock()
+_pool: Optional[ThreadedConnectionPool] = None
+
+
+def get_pool(minconn: int = DEFAULT_MIN_CONNECTIONS,
+             maxconn: int = DEFAULT_MAX_CONNECTIONS) -> ThreadedConnectionPool:
+    """Pool proses, dibuat saat pertama kali dipakai"""
+    global _pool
+    with _lock:
+        if _pool is None or _pool.closed:
+            _pool = ThreadedConnectionPool(minconn, max(minconn, maxconn), **get_db_params())
+        return _pool
+
+
+def close_pool():
+    """Tutup semua koneksi di pool"""
+    global _pool
+    with _lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
+
+
+atexit.register(close_pool)
+
+
+@contextmanager
+def connection(autocommit: bool = False) -> Iterator["psycopg2.extensions.connection"]:
+    """
+    Pinjam koneksi dari pool
+    Commit saat blok selesai, rollback jika terjadi exception. Koneksi yang
+    rusak tidak dikembalikan ke pool.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
+    try:
+        if conn.autocommit != autocommit:
+            conn.autocommit = autocommit
+        yield conn
+        if not autocommit:
+            conn.commit()
+    except Exception:
+        if not conn.closed:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+        raise
+    finally:
+        broken = broken or bool(conn.closed)
+        if not broken and conn.autocommit:
+            conn.autocommit = False
+        pool.putconn(conn, close=broken)
+
+
+@contextmanager
+def cursor(autocommit: bool = False, dict_rows: bool = False) -> Iterator["psycopg2.extensions.cursor"]:
+    """
+    with db.cursor() as cur: ...
+    dict_rows=True mengembalikan row sebagai dict (RealDictCursor)
+    """
+    with connection(autocommit=autocommit) as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor) if dict_rows else conn.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+
+
+def fetch_all(query: str, params=None) -> List[dict]:
+    """Jalankan query dan kembalikan semua row sebagai list of dict"""
+    with cursor(dict_rows=True) as cur:
+        cur.execute(query, params or ())
+        return [dict(row) for row in cur.fetchall()] if cur.description else []
@@ -0,0 +1,147 @@
+"""
+Client PostgREST (Supabase REST API) bersama untuk scripts/python
+Satu requests.Session dengan connection pool keep-alive, sehingga banyak
+request hanya membayar TLS handshake sekali, dan insert bulk: list row
+dikirim sebagai JSON array, dipecah otomatis per chunk_size row.
+
+    import sisinfops_db as db
+
+    with db.RestClient() as rest:
+        rows = rest.insert("program_budget_items", items)
+"""
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from .config import ConfigError, load_env
+
+DEFAULT_CHUNK_SIZE = int(os.environ.get("SISINFOPS_REST_CHUNK_SIZE", 500))
+DEFAULT_TIMEOUT = 30
+DEFAULT_POOL_SIZE = 10
+
+# Hanya kegagalan koneksi (request belum terkirim) dan GET yang diulang;
+# POST yang gagal di tengah jalan mungkin sudah tersimpan
+DEFAULT_RETRIES = 3
+RETRY_STATUSES = (502, 503, 504)
+
+
+class RestError(Exception):
+    """Request PostgREST gagal (status bukan 2xx)"""
+
+    def __init__(self, method: str, table: str, status: int, body: str):
+        super().__init__(f"{method} {table}: {status} - {body[:300]}")
+        self.status = status
+        self.body = body
+
+
+def in_filter(values: Iterable[Any]) -> str:
+    """Filter PostgREST in.(...) dengan nilai di-quote, mis. kode_program=in_filter(kodes)"""
+    quoted = ('"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"' for v in values)
+    return f"in.({','.join(quoted)})"
+
+
+def _chunks(rows: List[dict], size: int) -> Iterable[List[dict]]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class RestClient:
+    """
+    Akses tabel lewat /rest/v1 dengan satu session
+    Boleh dipakai dari beberapa thread; pool_size sebaiknya tidak kurang
+    dari jumlah thread. URL dan key dibaca dari .env.local (NEXT_PUBLIC_SUPABASE_URL dan
+    NEXT_PUBLIC_SUPABASE_ANON_KEY) kecuali diberikan.
+    """
+
+    def __init__(self, url: Optional[str] = None, key: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, timeout: float = DEFAULT_TIMEOUT,
+                 pool_size: int = DEFAULT_POOL_SIZE, retries: int = DEFAULT_RETRIES):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        env = load_env()
+        self.url = (url or env.get("NEXT_PUBLIC_SUPABASE_URL") or "").rstrip("/")
+        self.key = key or env.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+        if not self.url or not self.key:
+            raise ConfigError("NEXT_PUBLIC_SUPABASE_URL / NEXT_PUBLIC_SUPABASE_ANON_KEY tidak ditemukan")
+        self.chunk_size = max(1, chunk_size)
+        self.timeout = timeout
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      backoff_factor=0.5, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset({"GET", "HEAD"}), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "apikey": self.key,
+            "Authorization": f"Bearer {self.key}",
+            "Content-Type": "application/json",
+        })
+
+    def __enter__(self) -> "RestClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _request(self, method: str, table: str, **kwargs):
+        with self._count_lock:
+            self.request_count += 1
+        response = self.session.request(method, f"{self.url}/rest/v1/{table}",
+                                        timeout=self.timeout, **kwargs)
+        if response.status_code >= 300:
+            raise RestError(method, table, response.status_code, response.text)
+        return response
+
+    def select(self, table: str, select: str = "*", limit: Optional[int] = None,
+               **filters: str) -> List[dict]:
+        """GET rows; filter memakai sintaks PostgREST, mis. status="eq.draft" """
+        params: Dict[str, Any] = {"select": select, **filters}
+        if limit is not None:
+            params["limit"] = limit
+        return self._request("GET", table, params=params).json()
+
+    def insert(self, table: str, rows: Union[dict, List[dict]], returning: bool = True,
+               on_conflict: Optional[str] = None, ignore_duplicates: bool = False,
+               chunk_size: Optional[int] = None) -> List[dict]:
+        """
+        Insert satu atau banyak row, satu request per chunk
+        returning=True mengembalikan row yang tersimpan (Prefer:
+        return=representation) dalam urutan input. Dengan on_conflict (nama
+        kolom unik) row yang sudah ada di-update (upsert), atau dilewati
+        dengan ignore_duplicates=True sehingga hanya row baru yang
+        dikembalikan. Row dengan key berbeda-beda dikirim dengan ?columns=
+        sehingga key yang tidak ada memakai default kolom, bukan NULL.
+        Setiap chunk all-or-nothing: satu row yang ditolak (constraint, tipe
+        data) menggagalkan seluruh chunk dengan RestError, tidak hanya row itu.
+        """
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        if not rows:
+            return []
+
+        prefer = ["return=representation" if returning else "return=minimal"]
+        params: Dict[str, str] = {}
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        if any(len(row) != len(columns) for row in rows):
+            params["columns"] = ",".join(columns)
+            prefer.append("missing=default")
+        if on_conflict:
+            params["on_conflict"] = on_conflict
+            prefer.append("resolution=ignore-duplicates" if ignore_duplicates
+                          else "resolution=merge-duplicates")
+        headers = {"Prefer": ",".join(prefer)}
+
+        stored: List[dict] = []
+        for chunk in _chunks(rows, chunk_size or self.chunk_size):
+            response = self._request("POST", table, json=chunk, params=params, headers=headers)
+            if returning:
+                stored.extend(response.json())
+        return stored
@@ -0,0 +1,427 @@
+"""
+Snapshot dan diff skema database untuk scripts/python
+Seluruh katalog (tabel, kolom, constraint, index, policy, view) diambil
+dengan beberapa query bulk ke pg_catalog dalam satu transaksi, disimpan
+sebagai JSON ringkas dan bisa dibandingkan dengan snapshot lain. Script
+check_* cukup membaca snapshot alih-alih query information_schema per tabel.
+
+    import sisinfops_db as db
+
+    schema = db.get_snapshot()
+    schema.missing_columns("perhutanan_sosial", ["telepon_ketua_ps"])
+
+    python3 -m sisinfops_db snapshot -o before.json
+    python3 -m sisinfops_db diff before.json
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SCHEMAS = ("public",)
+SNAPSHOT_PATH = os.environ.get(
+    "SISINFOPS_SCHEMA_SNAPSHOT",
+    os.path.join(os.path.expanduser("~"), ".cache", "sisinfops", "schema_snapshot.json"),
+)
+# Snapshot di file lebih tua dari ini diambil ulang oleh get_snapshot()
+DEFAULT_MAX_AGE = int(os.environ.get("SISINFOPS_SCHEMA_MAX_AGE", 300))
+
+RELATION_KINDS = {
+    "r": "table",
+    "p": "partitioned table",
+    "v": "view",
+    "m": "materialized view",
+    "f": "foreign table",
+}
+CONSTRAINT_TYPES = {
+    "p": "primary key",
+    "f": "foreign key",
+    "u": "unique",
+    "c": "check",
+    "x": "exclusion",
+    "t": "trigger",
+}
+
+RELATIONS_QUERY = """
+SELECT n.nspname, c.relname, c.relkind, c.relrowsecurity,
+       CASE WHEN c.relkind IN ('v', 'm') THEN pg_get_viewdef(c.oid) END
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f') AND n.nspname = ANY(%s)
+ORDER BY 1, 2
+"""
+COLUMNS_QUERY = """
+SELECT n.nspname, c.relname, a.attname, format_type(a.atttypid, a.atttypmod),
+       a.attnotnull, pg_get_expr(d.adbin, d.adrelid)
+FROM pg_attribute a
+JOIN pg_class c ON c.oid = a.attrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+WHERE a.attnum > 0 AND NOT a.attisdropped
+  AND c.relkind IN ('r', 'p', 'v', 'm', 'f') AND n.nspname = ANY(%s)
+ORDER BY 1, 2, a.attnum
+"""
+CONSTRAINTS_QUERY = """
+SELECT n.nspname, c.relname, k.conname, k.contype, pg_get_constraintdef(k.oid)
+FROM pg_constraint k
+JOIN pg_class c ON c.oid = k.conrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = ANY(%s)
+ORDER BY 1, 2, 3
+"""
+INDEXES_QUERY = """
+SELECT n.nspname, c.relname, i.relname, pg_get_indexdef(x.indexrelid)
+FROM pg_index x
+JOIN pg_class c ON c.oid = x.indrelid
+JOIN pg_class i ON i.oid = x.indexrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = ANY(%s)
+ORDER BY 1, 2, 3
+"""
+POLICIES_QUERY = """
+SELECT schemaname, tablename, policyname, permissive, roles, cmd, qual, with_check
+FROM pg_policies
+WHERE schemaname = ANY(%s)
+ORDER BY 1, 2, 3
+"""
+
+_memo_lock = threading.Lock()
+_memo: Optional["SchemaSnapshot"] = None
+
+
+def qualify(name: str, schema: str = "public") -> str:
+    """'programs' -> 'public.programs', nama yang sudah berskema tidak diubah"""
+    return name if "." in name else f"{schema}.{name}"
+
+
+class SchemaSnapshot:
+    """
+    Katalog database pada satu waktu
+    Data berupa dict JSON: tables[schema.nama] berisi kind, rls, columns
+    (urut posisi, [type, not_null, default]), constraints, indexes dan
+    policies; definisi view ada di key "definition".
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    @property
+    def tables(self) -> Dict[str, dict]:
+        return self.data["tables"]
+
+    @property
+    def captured_at(self) -> float:
+        return self.data.get("captured_at", 0.0)
+
+    @property
+    def database(self) -> str:
+        return self.data.get("database", "")
+
+    @property
+    def schemas(self) -> List[str]:
+        return self.data.get("schemas", [])
+
+    def covers(self, schemas: Iterable[str]) -> bool:
+        """Snapshot memuat semua skema ini"""
+        return set(self.schemas) >= set(schemas)
+
+    def table(self, name: str) -> Optional[dict]:
+        return self.tables.get(qualify(name))
+
+    def has_table(self, name: str) -> bool:
+        return qualify(name) in self.tables
+
+    def table_names(self, schema: Optional[str] = None) -> List[str]:
+        return [name for name in self.tables if schema is None or name.startswith(schema + ".")]
+
+    def columns(self, table: str) -> Dict[str, list]:
+        """Kolom tabel berurutan: nama -> [type, not_null, default]; {} jika tabel tidak ada"""
+        entry = self.table(table)
+        return entry["columns"] if entry else {}
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column in self.columns(table)
+
+    def missing_columns(self, table: str, columns: Iterable[str]) -> List[str]:
+        existing = self.columns(table)
+        return [column for column in columns if column not in existing]
+
+    def to_json(self) -> str:
+        return json.dumps(self.data, separators=(",", ":"), sort_keys=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "SchemaSnapshot":
+        data = json.loads(text)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Versi snapshot tidak didukung: {data.get('version')}")
+        return cls(data)
+
+
+@contextmanager
+def _read_only_snapshot(cur):
+    """
+    Transaksi REPEATABLE READ READ ONLY untuk query katalog, tanpa menyentuh
+    pekerjaan pemanggil yang belum di-commit
+    Koneksi tanpa transaksi terbuka mendapat transaksi sendiri yang di-rollback
+    di akhir; transaksi pemanggil yang sudah berjalan dipakai lewat savepoint
+    dan tetap terbuka setelahnya.
+    """
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+    conn = cur.connection
+    if conn.autocommit:
+        cur.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        try:
+            yield
+        finally:
+            cur.execute("ROLLBACK")
+    elif conn.info.transaction_status == TRANSACTION_STATUS_IDLE:
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        try:
+            yield
+        finally:
+            conn.rollback()
+    else:
+        cur.execute("SAVEPOINT sisinfops_snapshot")
+        try:
+            yield
+        except Exception:
+            cur.execute("ROLLBACK TO SAVEPOINT sisinfops_snapshot")
+            raise
+        cur.execute("RELEASE SAVEPOINT sisinfops_snapshot")
+
+
+def fetch_snapshot(cur=None, schemas: Iterable[str] = DEFAULT_SCHEMAS) -> SchemaSnapshot:
+    """
+    Ambil katalog dari database dengan lima query bulk
+    Query berjalan dalam satu transaksi REPEATABLE READ sehingga semuanya
+    melihat katalog yang sama. Tanpa cursor, koneksi dipinjam dari pool.
+    Cursor pemanggil yang sedang dalam transaksi dipakai lewat savepoint:
+    transaksinya tidak di-rollback dan tetap terbuka.
+    """
+    if cur is None:
+        from .pool import cursor
+        with cursor() as own:
+            return fetch_snapshot(own, schemas)
+
+    schemas = list(schemas)
+    params = cur.connection.get_dsn_parameters()
+    tables: Dict[str, dict] = {}
+
+    with _read_only_snapshot(cur):
+        cur.execute(RELATIONS_QUERY, (schemas,))
+        for schema, name, kind, rls, definition in cur.fetchall():
+            entry = {"kind": RELATION_KINDS[kind], "rls": rls, "columns": {},
+                     "constraints": {}, "indexes": {}, "policies": {}}
+            if definition is not None:
+                entry["definition"] = definition.strip()
+            tables[f"{schema}.{name}"] = entry
+
+        cur.execute(COLUMNS_QUERY, (schemas,))
+        for schema, table, column, data_type, not_null, default in cur.fetchall():
+            tables[f"{schema}.{table}"]["columns"][column] = [data_type, not_null, default]
+
+        cur.execute(CONSTRAINTS_QUERY, (schemas,))
+        for schema, table, name, contype, definition in cur.fetchall():
+            entry = tables.get(f"{schema}.{table}")
+            if entry is not None:
+                entry["constraints"][name] = [CONSTRAINT_TYPES.get(contype, contype), definition]
+
+        cur.execute(INDEXES_QUERY, (schemas,))
+        for schema, table, name, definition in cur.fetchall():
+            entry = tables.get(f"{schema}.{table}")
+            if entry is not None:
+                entry["indexes"][name] = definition
+
+        cur.execute(POLICIES_QUERY, (schemas,))
+        for schema, table, name, permissive, roles, command, using, check in cur.fetchall():
+            entry = tables.get(f"{schema}.{table}")
+            if entry is not None:
+                entry["policies"][name] = [permissive, command, _role_list(roles), using, check]
+
+    return SchemaSnapshot({
+        "version": SNAPSHOT_VERSION,
+        "captured_at": time.time(),
+        "database": f"{params.get('host', '')}:{params.get('port', '')}/{params.get('dbname', '')}",
+        "schemas": schemas,
+        "tables": tables,
+    })
+
+
+def _role_list(roles) -> List[str]:
+    # pg_policies.roles adalah name[]; psycopg2 bisa mengembalikannya sebagai '{a,b}'
+    if isinstance(roles, str):
+        return [r for r in roles.strip("{}").split(",") if r]
+    return list(roles or [])
+
+
+def save_snapshot(snapshot: SchemaSnapshot, path: Optional[str] = None) -> str:
+    """Tulis snapshot ke file (atomic), kembalikan path-nya"""
+    path = path or SNAPSHOT_PATH
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "w") as f:
+        f.write(snapshot.to_json())
+    os.replace(temp, path)
+    return path
+
+
+def load_snapshot(path: Optional[str] = None) -> SchemaSnapshot:
+    with open(path or SNAPSHOT_PATH, "r") as f:
+        return SchemaSnapshot.from_json(f.read())
+
+
+def _current_database() -> str:
+    from .config import get_db_params
+    params = get_db_params()
+    return f"{params['host']}:{params['port']}/{params['database']}"
+
+
+def get_snapshot(max_age: Optional[float] = None, refresh: bool = False,
+                 schemas: Iterable[str] = DEFAULT_SCHEMAS) -> SchemaSnapshot:
+    """
+    Snapshot katalog database saat ini, dari cache jika masih segar
+    Urutan: snapshot proses ini, lalu file SNAPSHOT_PATH jika umurnya di
+    bawah max_age detik, berasal dari database yang sama dan memuat semua
+    skema yang diminta, lalu database. refresh=True selalu mengambil ulang
+    (mis. setelah ALTER TABLE).
+    """
+    global _memo
+    max_age = DEFAULT_MAX_AGE if max_age is None else max_age
+    schemas = list(schemas)
+    with _memo_lock:
+        if (not refresh and _memo is not None and _memo.covers(schemas)
+                and time.time() - _memo.captured_at <= max_age):
+            return _memo
+
+    snapshot = None
+    if not refresh:
+        try:
+            cached = load_snapshot()
+            if (time.time() - cached.captured_at <= max_age and cached.covers(schemas)
+                    and cached.database == _current_database()):
+                snapshot = cached
+        except (OSError, ValueError, KeyError):
+            snapshot = None
+    if snapshot is None:
+        snapshot = fetch_snapshot(schemas=schemas)
+        try:
+            save_snapshot(snapshot)
+        except OSError:
+            pass
+    with _memo_lock:
+        _memo = snapshot
+    return snapshot
+
+
+@dataclass
+class SchemaChange:
+    """Satu perbedaan antara dua snapshot"""
+    action: str  # added, removed, changed
+    kind: str  # table, column, constraint, index, policy, rls
+    name: str
+    detail: str = ""
+
+    def __str__(self) -> str:
+        symbol = {"added": "+", "removed": "-", "changed": "~"}[self.action]
+        text = f"{symbol} {self.kind} {self.name}"
+        return f"{text}: {self.detail}" if self.detail else text
+
+
+def _diff_items(kind: str, owner: str, old: dict, new: dict, describe) -> List[SchemaChange]:
+    changes = []
+    for name in old:
+        if name not in new:
+            changes.append(SchemaChange("removed", kind, f"{owner}.{name}", describe(old[name])))
+    for name, value in new.items():
+        if name not in old:
+            changes.append(SchemaChange("added", kind, f"{owner}.{name}", describe(value)))
+        elif old[name] != value:
+            changes.append(SchemaChange("changed", kind, f"{owner}.{name}",
+                                        f"{describe(old[name])} -> {describe(value)}"))
+    return changes
+
+
+def _describe_column(column: list) -> str:
+    data_type, not_null, default = column
+    text = data_type + (" NOT NULL" if not_null else "")
+    return text + (f" DEFAULT {default}" if default is not None else "")
+
+
+def _describe_policy(policy: list) -> str:
+    permissive, command, roles, using, check = policy
+    text = f"{permissive} FOR {command} TO {', '.join(roles)}"
+    if using:
+        text += f" USING ({using})"
+    if check:
+        text += f" WITH CHECK ({check})"
+    return text
+
+
+def diff_snapshots(old: SchemaSnapshot, new: SchemaSnapshot) -> List[SchemaChange]:
+    """Perubahan dari old ke new; isi tabel yang ditambah atau dihapus tidak dirinci"""
+    changes = []
+    for name, entry in old.tables.items():
+        if name not in new.tables:
+            changes.append(SchemaChange("removed", entry["kind"], name))
+    for name, entry in new.tables.items():
+        before = old.tables.get(name)
+        if before is None:
+            changes.append(SchemaChange("added", entry["kind"], name,
+                                        f"{len(entry['columns'])} kolom"))
+            continue
+        if before["kind"] != entry["kind"]:
+            changes.append(SchemaChange("changed", "table", name, f"{before['kind']} -> {entry['kind']}"))
+        if before.get("definition") != entry.get("definition"):
+            changes.append(SchemaChange("changed", "view definition", name))
+        if before["rls"] != entry["rls"]:
+            changes.append(SchemaChange("changed", "rls", name,
+                                        "enabled" if entry["rls"] else "disabled"))
+        changes += _diff_items("column", name, before["columns"], entry["columns"], _describe_column)
+        changes += _diff_items("constraint", name, before["constraints"], entry["constraints"],
+                               lambda c: c[1])
+        changes += _diff_items("index", name, before["indexes"], entry["indexes"], lambda i: i)
+        changes += _diff_items("policy", name, before["policies"], entry["policies"], _describe_policy)
+    return changes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m sisinfops_db",
+                                     description="Snapshot dan diff skema database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snap = commands.add_parser("snapshot", help="Ambil snapshot katalog dan simpan ke file")
+    snap.add_argument("-o", "--output", default=SNAPSHOT_PATH, help=f"File tujuan (default {SNAPSHOT_PATH})")
+    snap.add_argument("-s", "--schema", action="append", help="Skema yang diambil (default public, bisa diulang)")
+
+    diff = commands.add_parser("diff", help="Bandingkan dua snapshot (tanpa NEW: dengan database saat ini)")
+    diff.add_argument("old")
+    diff.add_argument("new", nargs="?")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "snapshot":
+        started = time.perf_counter()
+        snapshot = fetch_snapshot(schemas=args.schema or DEFAULT_SCHEMAS)
+        path = save_snapshot(snapshot, args.output)
+        columns = sum(len(t["columns"]) for t in snapshot.tables.values())
+        print(f"📸 {len(snapshot.tables)} tabel/view, {columns} kolom "
+              f"({time.perf_counter() - started:.2f}s) -> {path}")
+        return 0
+
+    old = load_snapshot(args.old)
+    new = load_snapshot(args.new) if args.new else fetch_snapshot(schemas=old.data["schemas"])
+    changes = diff_snapshots(old, new)
+    if not changes:
+        print("✅ Tidak ada perubahan skema")
+        return 0
+    print(f"🔍 {len(changes)} perubahan skema:")
+    for change in changes:
+        print(f"  {change}")
+    return 1
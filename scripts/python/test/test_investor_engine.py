@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test the set-based investor recomputation without a database: the
+vectorized pass matches the old per-project calculate_investor_data and
+projects without estimated credits are skipped.
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python", "update"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python"))
+
+from investor_engine import INVESTOR_COLUMNS, UPDATE_SQL, compute_investor_data, plan_updates  # noqa: E402
+
+
+def scalar_investor_data(estimated_credits, status):
+    """The per-project calculation the engine replaces"""
+    estimated_hectares = estimated_credits / 1000 if estimated_credits > 0 else 0
+    investment = estimated_hectares * 5000000
+    roi = {'active': 18.0, 'approved': 15.0, 'validated': 12.0}.get(status, 10.0)
+    if roi >= 20:
+        performance_rating = "excellent"
+    elif roi >= 15:
+        performance_rating = "good"
+    elif roi >= 10:
+        performance_rating = "average"
+    else:
+        performance_rating = "poor"
+    return {
+        "investment_amount": investment,
+        "roi_percentage": roi,
+        "carbon_sequestration_estimated": estimated_credits * 10,
+        "project_period_years": 10,
+        "performance_rating": performance_rating,
+        "investor_notes": f"Project based on {estimated_hectares:,.1f} estimated hectares ({estimated_credits:,.0f} credits). Estimated ROI: {roi}%."
+    }
+
+
+def test_vectorized_matches_scalar():
+    credits = [72800.99, 56771.0, 1500.0, 250.5, 1e9]
+    statuses = ['active', 'approved', 'validated', 'draft', None]
+    data = compute_investor_data(credits, statuses)
+    for i, (c, status) in enumerate(zip(credits, statuses)):
+        expected = scalar_investor_data(c, status)
+        for column in INVESTOR_COLUMNS:
+            if column == 'investor_notes':
+                continue
+            assert data[column][i] == expected[column], (column, i)
+
+
+def test_plan_updates_skips_projects_without_credits():
+    projects = [
+        {"id": "a", "project_code": "PRJ-A", "project_name": "A", "estimated_credits": 2000, "status": "active"},
+        {"id": "b", "project_code": "PRJ-B", "project_name": "B", "estimated_credits": None, "status": "active"},
+        {"id": "c", "project_code": "PRJ-C", "project_name": "C", "estimated_credits": 0, "status": "draft"},
+        {"id": "d", "project_code": "PRJ-D", "project_name": "D", "estimated_credits": 500, "status": None},
+    ]
+    rows, skipped = plan_updates(projects)
+    assert [r["id"] for r in rows] == ["a", "d"]
+    assert [p["id"] for p in skipped] == ["b", "c"]
+    assert rows[0] == dict(projects[0], **scalar_investor_data(2000, "active"))
+    assert rows[1]["roi_percentage"] == 10.0
+    # Plain Python values, ready for psycopg2
+    assert all(type(rows[0][c]) in (float, int, str) for c in INVESTOR_COLUMNS)
+    assert plan_updates(projects[1:3]) == ([], projects[1:3])
+
+
+def test_update_is_one_statement():
+    assert UPDATE_SQL.count("UPDATE") == 1
+    assert "FROM (VALUES %s)" in UPDATE_SQL
+    assert all(f"{c} = v.{c}" in UPDATE_SQL for c in INVESTOR_COLUMNS)
+
+
+def main():
+    print("🧪 Testing investor recomputation engine")
+    print("=" * 60)
+    tests = [
+        test_vectorized_matches_scalar,
+        test_plan_updates_skips_projects_without_credits,
+        test_update_is_one_statement,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎉 All investor engine tests passed")
+
+
+if __name__ == "__main__":
+    main()
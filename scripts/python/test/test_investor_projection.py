@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized investor projection without a database: matrices match
+a per-project loop, IRR and payback on known cashflows, and the rows
+written to the projection tables.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python", "update"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python"))
+
+from investor_projection import (SUMMARY_COLUMNS, YEARLY_COLUMNS, ProjectionAssumptions, irr,  # noqa: E402
+                                 project, project_rows, summary_rows, yearly_rows)
+
+
+def loop_projection(luas_ha, credits, period, horizon, a):
+    """Per-project reference for one project"""
+    hectares = luas_ha if luas_ha > 0 else credits / 1000
+    annual = credits if credits > 0 else luas_ha * a.sequestration_per_ha
+    cashflow, npv = [], 0.0
+    for year in range(horizon + 1):
+        flow = -hectares * a.investment_per_ha if year == 0 else 0.0
+        if 1 <= year <= period:
+            flow += annual * a.carbon_price - hectares * a.operating_cost_per_ha
+        cashflow.append(flow)
+        npv += flow / (1 + a.discount_rate) ** year
+    return cashflow, npv
+
+
+def test_matrices_match_loop():
+    a = ProjectionAssumptions(carbon_price=50_000, discount_rate=0.08)
+    luas = [72800.99, 0, 120.0, 10.0]
+    credits = [0, 56771.0, 500.0, 0]
+    period = [10, 30, 5, 20]
+    result = project(luas, credits, [2024, 2025, 2026, 2027], period, a)
+    assert result.cashflow.shape == (4, 31)
+    assert result.calendar_year[1, 0] == 2025 and result.calendar_year[1, 30] == 2055
+    for i in range(4):
+        cashflow, npv = loop_projection(luas[i], credits[i], period[i], 30, a)
+        assert np.allclose(result.cashflow[i], cashflow)
+        assert np.isclose(result.npv[i], npv)
+    # No sequestration outside the crediting period
+    assert result.sequestration[2, 6:].sum() == 0 and result.sequestration[2, 0] == 0
+
+
+def test_irr_and_payback():
+    cashflow = np.array([
+        [-100.0, 110.0, 0.0],
+        [-100.0, 60.0, 60.0],
+        [100.0, 10.0, 10.0],
+    ])
+    rates = irr(cashflow)
+    assert np.isclose(rates[0], 0.10)
+    assert np.isclose(rates[1], 0.1306623863, atol=1e-8)
+    assert np.isnan(rates[2])
+
+    a = ProjectionAssumptions(carbon_price=1, sequestration_per_ha=2, investment_per_ha=5,
+                              operating_cost_per_ha=0, discount_rate=0)
+    result = project([1.0, 1.0], [0, 0], 2024, [10, 2], a)
+    # 5 invested, 2 per year back
+    assert result.payback_years.tolist() == [3, -1]
+    assert result.npv.tolist() == [15.0, -1.0]
+
+
+def test_rows_for_projection_tables():
+    projects = [
+        {"id": "a", "project_code": "PRJ-A", "luas_total_ha": 100, "estimated_credits": None,
+         "start_year": 2024, "period_years": 10},
+        {"id": "b", "project_code": "PRJ-B", "luas_total_ha": None, "estimated_credits": None,
+         "start_year": 2024, "period_years": 10},
+        {"id": "c", "project_code": "PRJ-C", "luas_total_ha": None, "estimated_credits": 3000,
+         "start_year": 2030, "period_years": 3},
+    ]
+    a = ProjectionAssumptions()
+    projected, skipped, projection = project_rows(projects, a)
+    assert [p["id"] for p in projected] == ["a", "c"]
+    assert [p["id"] for p in skipped] == ["b"]
+
+    yearly = list(yearly_rows(["a", "c"], projection))
+    assert all(len(row) == len(YEARLY_COLUMNS) for row in yearly)
+    assert len(yearly) == 11 + 4
+    assert yearly[-1][:3] == ("c", 3, 2033)
+
+    summary = summary_rows(projected, projection, a)
+    assert [len(row) for row in summary] == [len(SUMMARY_COLUMNS)] * 2
+    assert summary[1][:3] == ("c", 2030, 3)
+    assert summary[1][3] == 9000.0
+
+
+def test_empty_projection():
+    result = project([], [], [], [])
+    assert result.cashflow.shape[0] == 0
+    assert len(irr(result.cashflow)) == 0
+
+
+def main():
+    print("🧪 Testing investor projection engine")
+    print("=" * 60)
+    tests = [
+        test_matrices_match_loop,
+        test_irr_and_payback,
+        test_rows_for_projection_tables,
+        test_empty_projection,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎉 All investor projection tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test the Monte Carlo scenario engine without a database: degenerate
+distributions reproduce the deterministic projection, results do not
+depend on the number of workers and percentile bands are ordered.
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python", "update"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python"))
+
+from investor_projection import ProjectionAssumptions, project  # noqa: E402
+from investor_scenarios import (RESULT_COLUMNS, ScenarioDistributions, price_list_multipliers,  # noqa: E402
+                                result_rows, run_scenarios, simulate_project, summarize)
+
+PROJECTS = [
+    {"id": "a", "project_code": "PRJ-A", "luas_total_ha": 120.0, "estimated_credits": None, "period_years": 10},
+    {"id": "b", "project_code": "PRJ-B", "luas_total_ha": None, "estimated_credits": 5000, "period_years": 20},
+    {"id": "c", "project_code": "PRJ-C", "luas_total_ha": None, "estimated_credits": None, "period_years": 10},
+]
+
+
+def test_fixed_distributions_match_projection():
+    a = ProjectionAssumptions()
+    fixed = ScenarioDistributions(carbon_price=(a.carbon_price,) * 3, sequestration_factor=(1.0, 0.0),
+                                  cost_overrun=(0.0, 0.0, 0.0))
+    results = simulate_project(0.0, 5000.0, 20, 1000, seed=1, base=a, distributions=fixed, batch_size=300)
+    expected = project([0.0], [5000.0], 0, 20, a)
+    assert len(results["npv"]) == 1000
+    assert np.allclose(results["npv"], expected.npv[0])
+    assert not np.isnan(expected.irr[0])
+    assert np.allclose(results["irr_percentage"], expected.irr[0] * 100)
+    assert np.allclose(results["total_sequestration_ton"], 5000 * 20)
+
+
+def test_uncertainty_widens_bands():
+    results = simulate_project(120.0, 0.0, 10, 20_000, seed=7)
+    band = summarize(results["npv"])
+    assert band["p10"] < band["p50"] < band["p90"]
+    sequestration = summarize(results["total_sequestration_ton"])
+    assert np.isclose(sequestration["p50"], 120 * 100 * 10, rtol=0.02)
+    assert summarize(np.array([np.nan, np.nan]))["p50"] is None
+
+
+def test_results_do_not_depend_on_workers():
+    serial = run_scenarios(PROJECTS, simulations=5000, seed=3, workers=1)
+    parallel = run_scenarios(PROJECTS, simulations=5000, seed=3, workers=2)
+    assert [r["project"]["id"] for r in serial] == ["a", "b"]
+    assert [r["bands"] for r in serial] == [r["bands"] for r in parallel]
+    other_seed = run_scenarios(PROJECTS, simulations=5000, seed=4, workers=1)
+    assert serial[0]["bands"]["npv"] != other_seed[0]["bands"]["npv"]
+
+
+def test_price_list_multipliers_and_rows():
+    multipliers = price_list_multipliers([("Bibit", 1000), ("Bibit", 2000), ("Bibit", 3000), ("Pupuk", 50)])
+    assert multipliers == [0.5, 1.0, 1.5, 1.0]
+
+    distributions = ScenarioDistributions(unit_cost_multipliers=multipliers)
+    results = run_scenarios(PROJECTS[:1], simulations=1000, seed=0, distributions=distributions, workers=1)
+    rows = result_rows(results, 1000, distributions)
+    assert [row[1] for row in rows] == ["npv", "irr_percentage", "total_revenue", "total_sequestration_ton"]
+    assert all(len(row) == len(RESULT_COLUMNS) for row in rows)
+    assert json.loads(rows[0][-1])["unit_cost_multipliers"] == 4
+
+
+def main():
+    print("🧪 Testing Monte Carlo scenario engine")
+    print("=" * 60)
+    tests = [
+        test_fixed_distributions_match_projection,
+        test_uncertainty_widens_bands,
+        test_results_do_not_depend_on_workers,
+        test_price_list_multipliers_and_rows,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎉 All scenario engine tests passed")
+
+
+if __name__ == "__main__":
+    main()
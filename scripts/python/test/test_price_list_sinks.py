@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Round-trip tests for the output sinks of
+scripts/python/generate/generate_price_list_data.py: every format decodes back
+to the items that were written, including values that need escaping.
+"""
+
+import io
+import json
+import os
+import sqlite3
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python", "generate"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_price_list_data import (PRICE_LIST_COLUMNS, CopyTsvSink, JsonArraySink,  # noqa: E402
+                                      NdjsonSink, SqlValuesSink, iter_item_batches, write_items)
+from test_bulk_load import parse_copy_line  # noqa: E402
+
+
+def sample_batches():
+    batches = list(iter_item_batches(7, batch_size=3))
+    tricky = dict(batches[0][0], item_code="ODD-001", item_name="Bibit Ma'ruf \"premium\"",
+                  item_description="tab\there, line\nbreak, back\\slash \\N", unit=None, is_active=False)
+    batches.append([tricky])
+    return batches
+
+
+def write(sink_class, batches):
+    f = io.StringIO()
+    write_items(batches, [sink_class(f)])
+    return f.getvalue()
+
+
+def all_items(batches):
+    return [item for batch in batches for item in batch]
+
+
+def test_json_sinks_round_trip():
+    batches = sample_batches()
+    assert json.loads(write(JsonArraySink, batches)) == all_items(batches)
+    lines = write(NdjsonSink, batches).splitlines()
+    assert [json.loads(line) for line in lines] == all_items(batches)
+    assert json.loads(write(JsonArraySink, [])) == []
+
+
+def test_copy_tsv_sink_round_trip():
+    batches = sample_batches()
+    lines = io.StringIO(write(CopyTsvSink, batches)).readlines()
+
+    def as_copy_text(value):
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        return str(value)
+
+    expected = [[as_copy_text(item[c]) for c in PRICE_LIST_COLUMNS] for item in all_items(batches)]
+    assert [parse_copy_line(line) for line in lines] == expected
+
+
+def test_sql_values_sink_round_trip():
+    batches = sample_batches()
+    db = sqlite3.connect(":memory:")
+    db.execute(f"CREATE TABLE price_list ({', '.join(PRICE_LIST_COLUMNS)})")
+    db.executescript(write(SqlValuesSink, batches))
+    rows = db.execute(f"SELECT {', '.join(PRICE_LIST_COLUMNS)} FROM price_list ORDER BY rowid").fetchall()
+    expected = [tuple(int(v) if isinstance(v, bool) else v for v in (item[c] for c in PRICE_LIST_COLUMNS))
+                for item in all_items(batches)]
+    assert rows == expected
+
+
+def main():
+    print("🧪 TESTING PRICE LIST SINKS")
+    print("=" * 60)
+
+    tests = [
+        test_json_sinks_round_trip,
+        test_copy_tsv_sink_round_trip,
+        test_sql_values_sink_round_trip,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
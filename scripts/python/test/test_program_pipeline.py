@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Test the concurrent program pipeline without a database: results keep plan
+order, one failing project does not stop the others, workers are capped by
+the persister, the database persister inserts in FK order and the REST
+persister is idempotent across runs.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from psycopg2.extensions import adapt
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python", "create"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python"))
+
+from program_pipeline import (DatabasePersister, PlannedProgram, ProjectPlan, ProjectResult,  # noqa: E402
+                              RestPersister, run_pipeline)
+
+
+class MemoryRest:
+    """In-memory stand-in for sisinfops_db.RestClient with PostgREST semantics"""
+
+    UNIQUE = {"program_budgets": ("budget_code",), "program_aksi_mitigasi": ("program_id", "aksi_mitigasi_id")}
+
+    def __init__(self):
+        self.tables = {}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def select(self, table, select="*", limit=None, **filters):
+        with self.lock:
+            self.calls.append(("GET", table))
+            rows = self.tables.get(table, [])
+            for column, expression in filters.items():
+                values = {v.strip('"') for v in expression[len("in.("):-1].split(",")}
+                rows = [r for r in rows if str(r.get(column)) in values]
+            return [dict(r) for r in rows]
+
+    def insert(self, table, rows, returning=True, on_conflict=None, ignore_duplicates=False, chunk_size=None):
+        with self.lock:
+            self.calls.append(("POST", table))
+            stored = []
+            existing = self.tables.setdefault(table, [])
+            key = self.UNIQUE.get(table)
+            for row in rows:
+                if key and any(all(r[k] == row[k] for k in key) for r in existing):
+                    if ignore_duplicates:
+                        continue
+                    raise RuntimeError(f"duplicate key in {table}")
+                row = dict(row, id=f"{table}-{len(existing) + 1}")
+                existing.append(row)
+                stored.append(row)
+            return stored if returning else []
+
+
+def project_plan(kode_project):
+    programs = []
+    for n in (1, 2):
+        kode = f"PRG-{kode_project}-{n:02d}"
+        programs.append(PlannedProgram(
+            {"kode_program": kode, "nama_program": f"Program {n}"},
+            aksi_ids=[1, 2],
+            budget={"budget_code": f"BUD-{kode}", "budget_name": kode, "total_amount": 3000},
+            budget_items=[{"price_list_id": "p1", "item_code": "I1", "item_name": "Bibit",
+                           "quantity": 3, "unit": "unit", "unit_price": 1000, "total_amount": 3000}],
+        ))
+    return ProjectPlan(kode_project, programs)
+
+
+def test_run_pipeline_order_and_errors():
+    plans = [ProjectPlan(f"P{i}", []) for i in range(6)]
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def persist(plan):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02 if plan.kode_project != "P0" else 0.05)
+        with lock:
+            active[0] -= 1
+        if plan.kode_project == "P3":
+            raise RuntimeError("boom")
+        return ProjectResult(plan.kode_project, created=[plan.kode_project])
+
+    persist.max_workers = 2
+    seen = []
+    results = run_pipeline(plans, persist, workers=8, on_result=lambda r: seen.append(r.kode_project))
+    assert [r.kode_project for r in results] == [p.kode_project for p in plans]
+    assert sorted(seen) == sorted(p.kode_project for p in plans)
+    assert results[3].error == "boom" and not results[3].ok
+    assert all(r.ok for i, r in enumerate(results) if i != 3)
+    assert peak[0] == 2
+    assert all(r.elapsed > 0 for r in results)
+
+
+def test_rest_persister_is_idempotent():
+    rest = MemoryRest()
+    persister = RestPersister(rest)
+    plans = [project_plan("A"), project_plan("B")]
+
+    first = run_pipeline(plans, persister, workers=2)
+    assert [len(r.created) for r in first] == [2, 2]
+    assert len(rest.tables["programs"]) == 4
+    assert len(rest.tables["program_aksi_mitigasi"]) == 8
+    assert len(rest.tables["program_budgets"]) == 4
+    items = rest.tables["program_budget_items"]
+    assert len(items) == 4
+    # total_amount is a generated column and must not be sent
+    assert all("total_amount" not in item for item in items)
+
+    # An interrupted run left a budget without items
+    del rest.tables["program_budget_items"][0]
+    second = run_pipeline(plans, persister, workers=2)
+    assert [r.created for r in second] == [[], []]
+    assert [len(r.existing) for r in second] == [2, 2]
+    assert second[0].program_ids == first[0].program_ids
+    assert len(rest.tables["programs"]) == 4
+    assert len(rest.tables["program_aksi_mitigasi"]) == 8
+    assert len(rest.tables["program_budget_items"]) == 4
+    assert sum(r.budget_items for r in second) == 1
+
+
+class FakeCursor:
+    """Records the SQL execute_values builds; RETURNING gives (code, "<table>:<code>")"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.log = connection.log
+        self.existing = connection.existing
+        self.rows = []
+
+    def mogrify(self, template, args):
+        return template % tuple(adapt(arg).getquoted() for arg in args)
+
+    def execute(self, sql, params=None):
+        sql = sql.decode() if isinstance(sql, bytes) else sql
+        self.log.append(sql)
+        if sql.startswith("SELECT kode_program"):
+            self.rows = [(code, f"programs:{code}") for code in params[0] if code in self.existing]
+        elif "RETURNING" in sql:
+            table = sql.split()[2]
+            self.rows = [(code, f"{table}:{code}") for code in re.findall(r"\('([^']+)'", sql)]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeDb:
+    """Stand-in for sisinfops_db; kode_program in existing are already stored"""
+
+    encoding = "UTF8"
+
+    def __init__(self, existing=()):
+        self.log = []
+        self.existing = set(existing)
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def test_database_persister_values_default_for_none():
+    persister = DatabasePersister(FakeDb())
+    columns, values = persister._values([{"kode_program": "PRG-1", "deskripsi": None},
+                                         {"kode_program": "PRG-2", "status": "draft"}])
+    assert columns == ["kode_program", "deskripsi", "status"]
+    assert [[adapt(v).getquoted() for v in row] for row in values] == [
+        [b"'PRG-1'", b"DEFAULT", b"DEFAULT"],
+        [b"'PRG-2'", b"DEFAULT", b"'draft'"],
+    ]
+
+
+def test_database_persister_inserts_in_fk_order():
+    db = FakeDb(existing={"PRG-A-01"})
+    plan = project_plan("A")
+    plan.programs[1].program["deskripsi"] = None
+    result = DatabasePersister(db)(plan)
+
+    assert [" ".join(sql.split()[:3]) for sql in db.log] == [
+        "SELECT pg_advisory_xact_lock(hashtext(%s))",
+        "SELECT kode_program, id",
+        "INSERT INTO programs",
+        "INSERT INTO program_aksi_mitigasi",
+        "INSERT INTO program_budgets",
+        "INSERT INTO program_budget_items",
+    ]
+    assert (result.existing, result.created) == (["PRG-A-01"], ["PRG-A-02"])
+    assert result.program_ids == {"PRG-A-01": "programs:PRG-A-01", "PRG-A-02": "programs:PRG-A-02"}
+    assert "VALUES ('PRG-A-02','Program 2',DEFAULT) RETURNING" in db.log[2]
+    assert "('programs:PRG-A-01',1),('programs:PRG-A-01',2)" in db.log[3]
+    assert "('BUD-PRG-A-02','PRG-A-02',3000,'programs:PRG-A-02')" in db.log[4]
+    # total_amount is a generated column and must not be sent
+    assert "total_amount" not in db.log[5]
+    assert db.log[5].count("'program_budgets:BUD-PRG-A-0") == 2
+    assert result.budget_items == 2
+
+
+def main():
+    print("🧪 Testing concurrent program pipeline")
+    print("=" * 60)
+    tests = [
+        test_run_pipeline_order_and_errors,
+        test_database_persister_values_default_for_none,
+        test_database_persister_inserts_in_fk_order,
+        test_rest_persister_is_idempotent,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎉 All program pipeline tests passed")
+
+
+if __name__ == "__main__":
+    main()
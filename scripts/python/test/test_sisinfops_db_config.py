@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test sisinfops_db connection settings without a database: values come from
+the file named by SISINFOPS_ENV_FILE, SUPABASE_DB_* environment variables
+override the file and the result is cached until reset_cache().
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python"))
+
+import sisinfops_db as db  # noqa: E402
+
+ENV_FILE = """# Supabase
+NEXT_PUBLIC_SUPABASE_URL=https://abcdef123.supabase.co
+export SUPABASE_DB_PASSWORD="from-file"
+SUPABASE_DB_NAME=sisinfops
+"""
+
+
+@contextmanager
+def isolated_env(env_file=ENV_FILE, **environ):
+    """Only SISINFOPS_ENV_FILE and the given variables are visible to sisinfops_db"""
+    saved = dict(os.environ)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, ".env.local")
+        with open(path, "w") as f:
+            f.write(env_file)
+        for key in list(os.environ):
+            if key.startswith(("SUPABASE_", "NEXT_PUBLIC_SUPABASE_", "SISINFOPS_")):
+                del os.environ[key]
+        os.environ["SISINFOPS_ENV_FILE"] = path
+        os.environ.update(environ)
+        db.reset_cache()
+        try:
+            yield path
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+            db.reset_cache()
+
+
+def test_params_from_env_file():
+    with isolated_env():
+        assert db.get_db_params() == {
+            "host": "db.abcdef123.supabase.co",
+            "port": 5432,
+            "database": "sisinfops",
+            "user": "postgres",
+            "password": "from-file",
+            "sslmode": "require",
+        }
+
+
+def test_environment_overrides_env_file():
+    with isolated_env(SUPABASE_DB_PASSWORD="from-env", SUPABASE_DB_HOST="/tmp/pgdata",
+                      SUPABASE_DB_SSLMODE="disable", SUPABASE_DB_PORT="6432"):
+        params = db.get_db_params()
+        assert params["password"] == "from-env"
+        assert params["host"] == "/tmp/pgdata"
+        assert params["sslmode"] == "disable"
+        assert params["port"] == 6432
+        assert params["database"] == "sisinfops"
+
+
+def test_pooler_modes():
+    with isolated_env(SUPABASE_DB_MODE="transaction"):
+        params = db.get_db_params()
+        assert (params["host"], params["port"], params["user"]) == ("db.abcdef123.supabase.co", 6543, "postgres")
+
+    with isolated_env(SUPABASE_DB_MODE="session", SUPABASE_DB_POOLER_HOST="aws-0-ap-southeast-1.pooler.supabase.com"):
+        params = db.get_db_params()
+        assert (params["host"], params["port"], params["user"]) == (
+            "aws-0-ap-southeast-1.pooler.supabase.com", 5432, "postgres.abcdef123")
+
+
+def test_invalid_config_raises():
+    for env_file, environ in [
+        ("SUPABASE_DB_PASSWORD=x\n", {}),
+        ("NEXT_PUBLIC_SUPABASE_URL=http://localhost:54321\n", {}),
+        (ENV_FILE, {"SUPABASE_DB_MODE": "pgbouncer"}),
+        (ENV_FILE, {"SUPABASE_DB_MODE": "session"}),
+        ("NEXT_PUBLIC_SUPABASE_URL=https://abcdef123.supabase.co\n", {}),
+        (ENV_FILE.replace("from-file", ""), {}),
+    ]:
+        with isolated_env(env_file, **environ):
+            try:
+                db.get_db_params()
+            except db.ConfigError:
+                continue
+            raise AssertionError(f"expected ConfigError for {env_file!r} {environ}")
+
+
+def test_params_cached_until_reset():
+    with isolated_env() as path:
+        assert db.get_db_params()["password"] == "from-file"
+        with open(path, "w") as f:
+            f.write(ENV_FILE.replace("from-file", "rotated"))
+        assert db.get_db_params()["password"] == "from-file"
+        db.reset_cache()
+        assert db.get_db_params()["password"] == "rotated"
+
+
+def main():
+    print("🧪 TESTING SISINFOPS_DB CONFIG")
+    print("=" * 60)
+
+    tests = [
+        test_params_from_env_file,
+        test_environment_overrides_env_file,
+        test_pooler_modes,
+        test_invalid_config_raises,
+        test_params_cached_until_reset,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test the sisinfops_db PostgREST client against a local HTTP server:
+bulk inserts are chunked into JSON arrays, all requests reuse one
+keep-alive connection and failed requests raise RestError.
+"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python"))
+
+from sisinfops_db.rest import RestClient, RestError  # noqa: E402
+
+
+class FakePostgrest(BaseHTTPRequestHandler):
+    """Stores posted rows per table and echoes them back with an id"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        server.connections.add(self.client_address)
+        url = urlparse(self.path)
+        table = url.path.rsplit("/", 1)[-1]
+        rows = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append({"table": table, "rows": rows, "query": parse_qs(url.query),
+                                "prefer": self.headers.get("Prefer", "")})
+        if table == "missing_table":
+            self.reply(404, {"message": f"relation {table} does not exist"})
+            return
+        stored = []
+        for row in rows:
+            server.next_id += 1
+            stored.append(dict(row, id=server.next_id))
+        if "return=representation" in self.headers.get("Prefer", ""):
+            self.reply(201, stored)
+        else:
+            self.send_response(201)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakePostgrest)
+    server.requests, server.connections, server.next_id = [], set(), 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_bulk_insert_chunks_over_one_connection():
+    server = start_server()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with RestClient(url, "anon-key", chunk_size=2) as rest:
+            items = [{"item_code": f"ITEM-{i}", "quantity": i} for i in range(5)]
+            stored = rest.insert("program_budget_items", items)
+            assert [row["item_code"] for row in stored] == [item["item_code"] for item in items]
+            assert all("id" in row for row in stored)
+            assert rest.insert("program_aksi_mitigasi", [{"program_id": 1, "aksi_mitigasi_id": 2}],
+                               returning=False) == []
+            assert rest.request_count == 4
+        assert [len(r["rows"]) for r in server.requests] == [2, 2, 1, 1]
+        assert server.requests[0]["prefer"] == "return=representation"
+        assert server.requests[-1]["prefer"] == "return=minimal"
+        assert len(server.connections) == 1
+    finally:
+        server.shutdown()
+
+
+def test_insert_with_different_keys_and_upsert():
+    server = start_server()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with RestClient(url, "anon-key") as rest:
+            rest.insert("programs", [{"kode_program": "A", "status": "draft"}, {"kode_program": "B"}],
+                        on_conflict="kode_program")
+        request = server.requests[0]
+        assert request["query"]["columns"] == ["kode_program,status"]
+        assert request["query"]["on_conflict"] == ["kode_program"]
+        assert "missing=default" in request["prefer"]
+        assert "resolution=merge-duplicates" in request["prefer"]
+    finally:
+        server.shutdown()
+
+
+def test_failed_request_raises():
+    server = start_server()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with RestClient(url, "anon-key") as rest:
+            try:
+                rest.insert("missing_table", {"id": 1})
+            except RestError as e:
+                assert e.status == 404
+                assert "does not exist" in e.body
+            else:
+                raise AssertionError("RestError not raised")
+    finally:
+        server.shutdown()
+
+
+def main():
+    print("🧪 Testing sisinfops_db REST client")
+    print("=" * 60)
+    tests = [
+        test_bulk_insert_chunks_over_one_connection,
+        test_insert_with_different_keys_and_upsert,
+        test_failed_request_raises,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎉 All REST client tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test the sisinfops_db schema snapshot without a database: lookups on a
+snapshot, the JSON round trip and the diff between two snapshots.
+"""
+
+import copy
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "python"))
+
+import sisinfops_db.schema as schema_module  # noqa: E402
+from sisinfops_db.schema import (SchemaSnapshot, diff_snapshots, fetch_snapshot, get_snapshot,  # noqa: E402
+                                 load_snapshot, save_snapshot)
+
+
+def table(columns, **extra):
+    entry = {"kind": "table", "rls": False, "columns": columns,
+             "constraints": {}, "indexes": {}, "policies": {}}
+    entry.update(extra)
+    return entry
+
+
+def sample_snapshot():
+    return SchemaSnapshot({
+        "version": 1,
+        "captured_at": 1700000000.0,
+        "database": "db.example.supabase.co:5432/postgres",
+        "schemas": ["public"],
+        "tables": {
+            "public.perhutanan_sosial": table(
+                {
+                    "id": ["uuid", True, "gen_random_uuid()"],
+                    "nama_ps": ["text", True, None],
+                    "telepon_ketua_ps": ["character varying(20)", False, None],
+                },
+                rls=True,
+                constraints={"perhutanan_sosial_pkey": ["primary key", "PRIMARY KEY (id)"]},
+                indexes={"perhutanan_sosial_pkey": "CREATE UNIQUE INDEX perhutanan_sosial_pkey ON public.perhutanan_sosial USING btree (id)"},
+                policies={"read_all": ["PERMISSIVE", "SELECT", ["public"], "true", None]},
+            ),
+            "public.programs": table({"id": ["uuid", True, None], "nama_program": ["text", False, None]}),
+        },
+    })
+
+
+def test_snapshot_lookups():
+    schema = sample_snapshot()
+    assert schema.has_table("perhutanan_sosial")
+    assert schema.has_table("public.programs")
+    assert not schema.has_table("vvb_engagements")
+    assert list(schema.columns("perhutanan_sosial")) == ["id", "nama_ps", "telepon_ketua_ps"]
+    assert schema.columns("vvb_engagements") == {}
+    assert schema.missing_columns("perhutanan_sosial", ["telepon_ketua_ps", "telepon_kepala_desa"]) == [
+        "telepon_kepala_desa"
+    ]
+
+
+def test_snapshot_json_round_trip():
+    schema = sample_snapshot()
+    with tempfile.TemporaryDirectory() as directory:
+        path = save_snapshot(schema, os.path.join(directory, "cache", "schema.json"))
+        loaded = load_snapshot(path)
+        assert loaded.data == schema.data
+        with open(path) as f:
+            assert "\n" not in f.read()
+
+
+def test_diff_snapshots():
+    old = sample_snapshot()
+    new = SchemaSnapshot(copy.deepcopy(old.data))
+    ps = new.tables["public.perhutanan_sosial"]
+    ps["columns"]["telepon_kepala_desa"] = ["character varying(20)", False, None]
+    ps["columns"]["nama_ps"] = ["text", False, None]
+    ps["rls"] = False
+    del ps["policies"]["read_all"]
+    del new.tables["public.programs"]
+    new.tables["public.vvb_engagements"] = table({"id": ["uuid", True, None]})
+
+    changes = {(c.action, c.kind, c.name) for c in diff_snapshots(old, new)}
+    assert changes == {
+        ("added", "column", "public.perhutanan_sosial.telepon_kepala_desa"),
+        ("changed", "column", "public.perhutanan_sosial.nama_ps"),
+        ("changed", "rls", "public.perhutanan_sosial"),
+        ("removed", "policy", "public.perhutanan_sosial.read_all"),
+        ("removed", "table", "public.programs"),
+        ("added", "table", "public.vvb_engagements"),
+    }
+    assert diff_snapshots(old, old) == []
+
+
+class FakeConnection:
+    def __init__(self, autocommit, status):
+        self.autocommit = autocommit
+        self.info = SimpleNamespace(transaction_status=status)
+        self.log = []
+
+    def get_dsn_parameters(self):
+        return {"host": "localhost", "port": "5432", "dbname": "postgres"}
+
+    def rollback(self):
+        self.log.append("<rollback>")
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql, params=None):
+        self.connection.log.append(sql.split()[0] if params else sql)
+
+    def fetchall(self):
+        return []
+
+
+def snapshot_log(autocommit, status):
+    conn = FakeConnection(autocommit, status)
+    snapshot = fetch_snapshot(FakeCursor(conn), ["public", "auth"])
+    assert snapshot.data["schemas"] == ["public", "auth"]
+    return conn.log
+
+
+def test_fetch_snapshot_keeps_caller_transaction():
+    queries = ["SELECT"] * 5
+    assert snapshot_log(False, TRANSACTION_STATUS_INTRANS) == (
+        ["SAVEPOINT sisinfops_snapshot"] + queries + ["RELEASE SAVEPOINT sisinfops_snapshot"])
+    assert snapshot_log(False, TRANSACTION_STATUS_IDLE) == (
+        ["SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"] + queries + ["<rollback>"])
+    assert snapshot_log(True, TRANSACTION_STATUS_IDLE) == (
+        ["BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY"] + queries + ["ROLLBACK"])
+
+
+def test_get_snapshot_checks_cached_schemas():
+    fetched = []
+
+    def fake_fetch(cur=None, schemas=("public",)):
+        fetched.append(list(schemas))
+        data = copy.deepcopy(sample_snapshot().data)
+        data.update(captured_at=time.time(), schemas=list(schemas))
+        return SchemaSnapshot(data)
+
+    auth_only = fake_fetch(schemas=["auth"])
+    fetched.clear()
+    saved = (schema_module.SNAPSHOT_PATH, schema_module.fetch_snapshot,
+             schema_module._current_database, schema_module._memo)
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            schema_module.SNAPSHOT_PATH = save_snapshot(auth_only, os.path.join(directory, "schema.json"))
+            schema_module.fetch_snapshot = fake_fetch
+            schema_module._current_database = lambda: auth_only.database
+            schema_module._memo = None
+
+            # `snapshot -s auth` must not stand in for the default public snapshot
+            assert get_snapshot().schemas == ["public"]
+            assert fetched == [["public"]]
+            assert load_snapshot(schema_module.SNAPSHOT_PATH).schemas == ["public"]
+            assert get_snapshot().schemas == ["public"]
+            assert get_snapshot(schemas=["public", "auth"]).schemas == ["public", "auth"]
+            assert get_snapshot(schemas=["auth"]).schemas == ["public", "auth"]
+            assert fetched == [["public"], ["public", "auth"]]
+        finally:
+            (schema_module.SNAPSHOT_PATH, schema_module.fetch_snapshot,
+             schema_module._current_database, schema_module._memo) = saved
+
+
+def main():
+    print("🧪 Testing sisinfops_db schema snapshot")
+    print("=" * 60)
+    tests = [
+        test_snapshot_lookups,
+        test_snapshot_json_round_trip,
+        test_diff_snapshots,
+        test_fetch_snapshot_keeps_caller_transaction,
+        test_get_snapshot_checks_cached_schemas,
+    ]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🎉 All schema snapshot tests passed")
+
+
+if __name__ == "__main__":
+    main()
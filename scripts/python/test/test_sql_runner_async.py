@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test the asyncpg backend of the SQL runner without a database:
+connection parameter translation, command tag parsing and which queries
+execute_queries streams.
+"""
+
+import asyncio
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+from async_executor import AsyncSQLExecutor, _command_row_count, asyncpg_connect_kwargs  # noqa: E402
+from executor import ExecutionResult  # noqa: E402
+
+
+def test_connect_kwargs_from_psycopg2_params():
+    kwargs = asyncpg_connect_kwargs({
+        "host": "db.example.supabase.co",
+        "port": 5432,
+        "database": "postgres",
+        "user": "postgres",
+        "password": "secret",
+        "sslmode": "require",
+    })
+    assert kwargs == {
+        "host": "db.example.supabase.co",
+        "port": 5432,
+        "database": "postgres",
+        "user": "postgres",
+        "password": "secret",
+        "ssl": "require",
+    }
+
+
+def test_connect_kwargs_from_dsn():
+    dsn = "postgresql://postgres@localhost/postgres"
+    assert asyncpg_connect_kwargs({"dsn": dsn}) == {"dsn": dsn}
+
+
+def test_command_row_count():
+    assert _command_row_count("INSERT 0 5") == 5
+    assert _command_row_count("UPDATE 3") == 3
+    assert _command_row_count("CREATE TABLE") is None
+    assert _command_row_count("") is None
+
+
+class RecordingExecutor(AsyncSQLExecutor):
+    """Executor without a pool that records how each query is run"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def stream_query(self, sql, out_path=None, fmt=None, itersize=None):
+        self.calls.append(("stream", sql))
+        return ExecutionResult(success=True, execution_time=0)
+
+    async def execute_sql(self, sql):
+        self.calls.append(("execute", sql))
+        return ExecutionResult(success=True, execution_time=0)
+
+
+def test_execute_queries_streams_reads():
+    cte = "WITH totals AS (SELECT kabupaten_id, count(*) FROM carbon_projects GROUP BY 1) SELECT * FROM totals"
+    insert = "INSERT INTO price_list (item_name) VALUES ('Bibit') RETURNING id"
+    executor = RecordingExecutor()
+    results = asyncio.run(executor.execute_queries(
+        ["SELECT 1", cte, "SHOW work_mem", insert, insert],
+        out_paths=[None, None, None, None, "ids.csv"],
+    ))
+    assert executor.calls == [
+        ("stream", "SELECT 1"), ("stream", cte), ("execute", "SHOW work_mem"),
+        ("execute", insert), ("stream", insert),
+    ]
+    assert [r.statement for r in results] == ["SELECT 1", cte, "SHOW work_mem", insert, insert]
+
+
+def main():
+    print("🧪 TESTING SQL RUNNER ASYNC BACKEND")
+    print("=" * 60)
+
+    tests = [
+        test_connect_kwargs_from_psycopg2_params,
+        test_connect_kwargs_from_dsn,
+        test_command_row_count,
+        test_execute_queries_streams_reads,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
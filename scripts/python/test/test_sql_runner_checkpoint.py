@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test SQL runner checkpoints (run --resume) without a database:
+committed statements are skipped, edits to them are refused and edits after
+the failure are allowed.
+"""
+
+import os
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+from checkpoint import CheckpointMismatch, FileCheckpoint  # noqa: E402
+
+STATEMENTS = [(f"INSERT INTO t VALUES ({i});", i + 1) for i in range(5)]
+
+
+def fail_at(directory, sql_path, statements, failing_index):
+    """Record a run that stops at statements[failing_index]"""
+    tracker = FileCheckpoint(sql_path, scope="test", directory=directory)
+    for index, (stmt, line) in enumerate(tracker.resume(statements, None)):
+        tracker.record(stmt, index != failing_index, line, error="boom")
+        if index == failing_index:
+            break
+    tracker.close()
+    return tracker
+
+
+def with_files(test):
+    def wrapper():
+        with tempfile.TemporaryDirectory() as directory:
+            sql_path = os.path.join(directory, "fix.sql")
+            with open(sql_path, "w") as f:
+                f.write("\n".join(stmt for stmt, _ in STATEMENTS))
+            test(directory, sql_path)
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+
+@with_files
+def test_resume_skips_committed(directory, sql_path):
+    fail_at(directory, sql_path, STATEMENTS, 3)
+
+    tracker = FileCheckpoint(sql_path, scope="test", directory=directory)
+    saved = tracker.load()
+    assert saved["completed"] == 3 and saved["failed_line"] == 4
+    remaining = list(tracker.resume(STATEMENTS, saved))
+    assert remaining == STATEMENTS[3:]
+    assert tracker.skipped == 3
+
+
+@with_files
+def test_failing_statement_may_be_edited(directory, sql_path):
+    fail_at(directory, sql_path, STATEMENTS, 3)
+
+    edited = STATEMENTS[:3] + [("INSERT INTO t VALUES (30);", 4)] + STATEMENTS[4:]
+    tracker = FileCheckpoint(sql_path, scope="test", directory=directory)
+    remaining = list(tracker.resume(edited, tracker.load()))
+    assert remaining[0][0] == "INSERT INTO t VALUES (30);"
+
+
+@with_files
+def test_committed_statement_edit_is_refused(directory, sql_path):
+    fail_at(directory, sql_path, STATEMENTS, 3)
+
+    edited = [("INSERT INTO t VALUES (-1);", 1)] + STATEMENTS[1:]
+    tracker = FileCheckpoint(sql_path, scope="test", directory=directory)
+    try:
+        list(tracker.resume(edited, tracker.load()))
+    except CheckpointMismatch:
+        return
+    raise AssertionError("resume accepted a changed committed statement")
+
+
+@with_files
+def test_checkpoint_is_per_scope(directory, sql_path):
+    fail_at(directory, sql_path, STATEMENTS, 3)
+    assert FileCheckpoint(sql_path, scope="other", directory=directory).load() is None
+
+
+@with_files
+def test_partly_written_line_is_ignored(directory, sql_path):
+    tracker = fail_at(directory, sql_path, STATEMENTS, 3)
+    with open(tracker.path, "a") as f:
+        f.write('{"file_path": "trunc')
+    assert FileCheckpoint(sql_path, scope="test", directory=directory).load()["completed"] == 3
+
+
+@with_files
+def test_complete_run_is_cleared(directory, sql_path):
+    tracker = FileCheckpoint(sql_path, scope="test", directory=directory)
+    for stmt, line in tracker.resume(STATEMENTS, None):
+        tracker.record(stmt, True, line)
+    assert tracker.complete
+    tracker.clear()
+    assert not os.path.exists(tracker.path)
+
+
+def main():
+    print("🧪 TESTING SQL RUNNER CHECKPOINTS")
+    print("=" * 60)
+
+    tests = [
+        test_resume_skips_committed,
+        test_failing_statement_may_be_edited,
+        test_committed_statement_edit_is_refused,
+        test_checkpoint_is_per_scope,
+        test_partly_written_line_is_ignored,
+        test_complete_run_is_cleared,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test SQL runner executor decisions without a database: which queries
+stream_query may wrap in a server-side cursor, which file statements are
+grouped by execute_batch and how a failed batch is replayed.
+"""
+
+import os
+import sys
+
+import psycopg2
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+from executor import ExecutionResult, SQLExecutor, StatementResult, can_declare_cursor  # noqa: E402
+
+
+def test_plain_reads_use_server_side_cursor():
+    for sql in [
+        "SELECT * FROM carbon_projects",
+        "-- export\nselect id from profiles;",
+        "/* dashboard */ VALUES (1), (2)",
+        "TABLE price_list",
+        "SELECT * FROM audit_log WHERE action = 'DELETE'",
+        "SELECT \"update\", \"into\" FROM t",
+        "SELECT $$insert into$$ AS sql, E'merge\\'s' -- update later\nFROM t /* delete */",
+        "WITH totals AS (SELECT kabupaten_id, count(*) FROM carbon_projects GROUP BY 1) SELECT * FROM totals",
+    ]:
+        assert can_declare_cursor(sql), sql
+
+
+def test_other_statements_use_client_cursor():
+    for sql in [
+        "SELECT * INTO carbon_projects_backup FROM carbon_projects",
+        "INSERT INTO price_list (item_name) VALUES ('Bibit') RETURNING id",
+        "UPDATE carbon_projects SET status = 'active' RETURNING id",
+        "DELETE FROM programs WHERE status = 'draft' RETURNING id",
+        "WITH moved AS (DELETE FROM programs RETURNING *) SELECT count(*) FROM moved",
+        "SHOW work_mem",
+        "EXPLAIN SELECT * FROM carbon_projects",
+        "SELECT * FROM carbon_projects FOR UPDATE",
+    ]:
+        assert not can_declare_cursor(sql), sql
+
+
+class FakeCursor:
+    """Records statements; any statement containing 'broken' fails"""
+
+    def __init__(self, log):
+        self.log = log
+        self.rowcount = 1
+
+    def execute(self, sql, params=None):
+        self.log.append(sql)
+        if "broken" in sql and not sql.startswith("ROLLBACK"):
+            raise psycopg2.Error("relation \"broken\" does not exist")
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self):
+        self.log = []
+        self.autocommit = False
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+
+class RecordingExecutor(SQLExecutor):
+    """Executor without a connection that records how statements are sent"""
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.retry_policy = None
+        self.connection = FakeConnection()
+        self.calls = []
+        self.failing = set()
+
+    def execute_sql(self, sql, params=None):
+        self.calls.append(sql)
+        return ExecutionResult(success=sql not in self.failing, execution_time=0)
+
+    def execute_batch(self, statements, stop_on_error=True):
+        self.calls.append([stmt for stmt, _ in statements])
+        return [StatementResult(statement=stmt, line_number=line,
+                                result=ExecutionResult(success=stmt not in self.failing, execution_time=0))
+                for stmt, line in statements]
+
+
+def numbered(statements):
+    return [(stmt, i) for i, stmt in enumerate(statements, 1)]
+
+
+FILE_STATEMENTS = [
+    "CREATE TABLE seed (id int);",
+    "INSERT INTO seed VALUES (1);",
+    "-- second row\nINSERT INTO seed VALUES (2);",
+    "UPDATE seed SET id = id + 1;",
+    "BEGIN;",
+    "DELETE FROM seed WHERE id > 10;",
+    "INSERT INTO seed VALUES (3);",
+    "COMMIT;",
+    "WITH moved AS (DELETE FROM seed RETURNING *) INSERT INTO seed SELECT * FROM moved;",
+    "INSERT INTO seed VALUES (4);",
+]
+
+
+def test_consecutive_dml_is_batched():
+    executor = RecordingExecutor()
+    results = list(executor._iter_file_results(numbered(FILE_STATEMENTS), True, batch_size=3))
+    s = FILE_STATEMENTS
+    assert executor.calls == [
+        s[0], [s[1], s[2], s[3]],
+        s[4], [s[5], s[6]], s[7],    # transaction statements end a batch
+        s[8], [s[9]],                # WITH ... is never batched
+    ]
+    assert [r.line_number for r in results] == list(range(1, len(s) + 1))
+
+
+def test_batching_disabled():
+    executor = RecordingExecutor()
+    list(executor._iter_file_results(numbered(FILE_STATEMENTS), True, batch_size=1))
+    assert executor.calls == FILE_STATEMENTS
+
+    profiled = RecordingExecutor(profiler=object())
+    list(profiled._iter_file_results(numbered(FILE_STATEMENTS), True, batch_size=50))
+    assert profiled.calls == FILE_STATEMENTS
+
+
+def test_failed_batch_stops_file():
+    executor = RecordingExecutor()
+    executor.failing = {FILE_STATEMENTS[2]}
+    results = list(executor._iter_file_results(numbered(FILE_STATEMENTS), True, batch_size=3))
+    assert executor.calls == [FILE_STATEMENTS[0], FILE_STATEMENTS[1:4]]
+    assert [r.result.success for r in results] == [True, True, False, True]
+
+
+def test_batch_is_one_round_trip():
+    executor = RecordingExecutor()
+    statements = numbered(["INSERT INTO a VALUES (1);", "UPDATE a SET x = 2 -- no semicolon"])
+    results = SQLExecutor.execute_batch(executor, statements)
+    assert executor.connection.log == [
+        "BEGIN;\nINSERT INTO a VALUES (1);\nUPDATE a SET x = 2 -- no semicolon\n;\nCOMMIT;"
+    ]
+    assert executor.connection.autocommit is False
+    assert [(r.result.success, r.result.batch_size) for r in results] == [(True, 2), (True, 2)]
+
+
+def test_failed_batch_is_replayed_with_savepoints():
+    statements = numbered(["INSERT INTO a VALUES (1);", "INSERT INTO broken VALUES (1);",
+                           "INSERT INTO a VALUES (2);"])
+    executor = RecordingExecutor()
+    results = SQLExecutor.execute_batch(executor, statements, stop_on_error=True)
+    assert executor.connection.log[1:] == [
+        "ROLLBACK", "BEGIN",
+        "SAVEPOINT sql_runner_stmt", statements[0][0], "RELEASE SAVEPOINT sql_runner_stmt",
+        "SAVEPOINT sql_runner_stmt", statements[1][0], "ROLLBACK TO SAVEPOINT sql_runner_stmt",
+        "COMMIT",
+    ]
+    assert [r.result.success for r in results] == [True, False]
+    assert "broken" in results[1].result.error
+
+    executor = RecordingExecutor()
+    results = SQLExecutor.execute_batch(executor, statements, stop_on_error=False)
+    assert [r.result.success for r in results] == [True, False, True]
+    assert executor.connection.log[-1] == "COMMIT"
+
+
+def main():
+    print("🧪 TESTING SQL RUNNER EXECUTOR")
+    print("=" * 60)
+
+    tests = [
+        test_plain_reads_use_server_side_cursor,
+        test_other_statements_use_client_cursor,
+        test_consecutive_dml_is_batched,
+        test_batching_disabled,
+        test_failed_batch_stops_file,
+        test_batch_is_one_round_trip,
+        test_failed_batch_is_replayed_with_savepoints,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test SQL runner profiling (run --profile) without a database:
+statement fingerprints ignore literals and formatting, and plan changes and
+buffer regressions are flagged against the previous capture.
+"""
+
+import os
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+from profiler import PlanCapture, PlanStore, fingerprint, normalize_statement  # noqa: E402
+
+
+def explain(node_type, hit, read=0, index=None):
+    plan = {"Node Type": node_type, "Relation Name": "investors", "Actual Rows": 10,
+            "Shared Hit Blocks": hit, "Shared Read Blocks": read}
+    if index:
+        plan["Index Name"] = index
+    return [{"Plan": plan, "Execution Time": 1.5, "Planning Time": 0.1}]
+
+
+def test_fingerprint_ignores_literals():
+    a = "SELECT * FROM investors WHERE id IN (1, 2, 3) AND name = 'a' -- check"
+    b = "select *\n  from investors where id in (42) and name = 'it''s'"
+    assert fingerprint(a) == fingerprint(b)
+    assert normalize_statement(a) == "select * from investors where id in (?) and name = ?"
+    assert fingerprint(a) != fingerprint("SELECT * FROM projects WHERE id IN (1)")
+
+
+def test_identifiers_with_digits_are_kept():
+    assert normalize_statement("SELECT col2 FROM t1 LIMIT 5;") == "select col2 from t1 limit ?"
+
+
+def test_plan_change_and_buffer_regression():
+    with tempfile.TemporaryDirectory() as directory:
+        store = PlanStore(os.path.join(directory, "plans.sqlite"), scope="test")
+        sql = "SELECT * FROM investors WHERE id = 1"
+
+        first = PlanCapture.from_explain(sql, explain("Index Scan", 4, index="investors_pkey"))
+        first.compare(store.previous(first.fingerprint))
+        store.add(first, [])
+        assert first.previous is None and first.flags == []
+
+        same = PlanCapture.from_explain(sql, explain("Index Scan", 5, index="investors_pkey"))
+        same.compare(store.previous(same.fingerprint))
+        store.add(same, [])
+        assert same.flags == []
+
+        scan = PlanCapture.from_explain(sql, explain("Seq Scan", 300, read=900))
+        scan.compare(store.previous(scan.fingerprint))
+        assert scan.flags == ["plan changed", "buffers 5 -> 1200"]
+
+        assert PlanStore(store.path, scope="other").previous(scan.fingerprint) is None
+        store.close()
+
+
+def main():
+    print("🧪 TESTING SQL RUNNER PROFILER")
+    print("=" * 60)
+
+    tests = [
+        test_fingerprint_ignores_literals,
+        test_identifiers_with_digits_are_kept,
+        test_plan_change_and_buffer_regression,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test SQL runner retry policy (run --retries/--lock-timeout) without a database:
+which failures are retried for which statements, backoff and timeout parsing.
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+import psycopg2  # noqa: E402
+
+from retry import RetryPolicy, is_idempotent, parse_timeout  # noqa: E402
+
+
+class ServerError(psycopg2.Error):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self._code = pgcode
+
+    @property
+    def pgcode(self):
+        return self._code
+
+
+SSL_DROP = psycopg2.OperationalError("SSL SYSCALL error: EOF detected")
+
+
+def test_rolled_back_errors_are_retried():
+    policy = RetryPolicy()
+    assert policy.retry_reason(ServerError("40P01"), "UPDATE investors SET total = 1") == "deadlock"
+    assert policy.retry_reason(ServerError("55P03"), "ALTER TABLE carbon_projects ADD COLUMN x int") == "lock timeout"
+    assert policy.retry_reason(ServerError("57014"), "SELECT pg_sleep(60)") is None  # statement_timeout
+    assert policy.retry_reason(ServerError("23505"), "INSERT INTO t VALUES (1)") is None
+
+
+def test_lost_connection_while_committing():
+    policy = RetryPolicy()
+    insert = "INSERT INTO financial_transactions VALUES (1)"
+    assert policy.retry_reason(SSL_DROP, insert) == "connection lost"
+    assert policy.retry_reason(SSL_DROP, insert, committing=True) is None
+    ddl = "CREATE TABLE IF NOT EXISTS kabupaten (id int)"
+    assert policy.retry_reason(SSL_DROP, ddl, committing=True) == "connection lost"
+    assert policy.retry_reason(SSL_DROP, "CREATE TABLE kabupaten (id int)", committing=True) is None
+
+
+def test_non_transactional_statements_are_never_retried():
+    policy = RetryPolicy()
+    for sql in ["CREATE INDEX CONCURRENTLY idx ON carbon_projects (status)",
+                "-- cleanup\nVACUUM ANALYZE carbon_projects"]:
+        assert policy.retry_reason(ServerError("40P01"), sql) is None
+        assert policy.retry_reason(SSL_DROP, sql) is None
+
+
+def test_idempotent_statements():
+    assert is_idempotent("SELECT * FROM profiles")
+    assert is_idempotent("CREATE OR REPLACE VIEW v AS SELECT 1")
+    assert is_idempotent("DROP TABLE IF EXISTS tmp")
+    assert is_idempotent("-- recent\nSELECT * FROM audit_log WHERE action = 'DELETE'")
+    assert is_idempotent("WITH t AS (SELECT 1) SELECT * FROM t")
+    assert not is_idempotent("INSERT INTO audit_log (action) VALUES ('SELECT')")
+    assert not is_idempotent("SELECT * INTO backup FROM profiles")
+    assert not is_idempotent("WITH moved AS (DELETE FROM a RETURNING *) SELECT count(*) FROM moved")
+
+
+def test_backoff_and_timeouts():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    assert 0.5 <= policy.delay(1) <= 1
+    assert 2 <= policy.delay(3) <= 4
+    assert policy.delay(10) <= 5
+    assert parse_timeout("30s") == "30s" and parse_timeout("500") == "500"
+    assert parse_timeout(None) is None
+    try:
+        parse_timeout("30s; DROP TABLE x")
+    except ValueError:
+        return
+    raise AssertionError("invalid timeout accepted")
+
+
+def main():
+    print("🧪 TESTING SQL RUNNER RETRY POLICY")
+    print("=" * 60)
+
+    tests = [
+        test_rolled_back_errors_are_retried,
+        test_lost_connection_while_committing,
+        test_non_transactional_statements_are_never_retried,
+        test_idempotent_statements,
+        test_backoff_and_timeouts,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test the SQL runner migration scheduler without a database: relations
+written by each file are read from the SQL text and MigrationGraph orders
+only files that conflict.
+"""
+
+import os
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+from ledger import MigrationFile  # noqa: E402
+from scheduler import MigrationGraph, analyze_migration  # noqa: E402
+
+
+def build_graph(files, installed_extensions=None):
+    """Write (name, sql) pairs to migration files and build their graph"""
+    with tempfile.TemporaryDirectory() as tmp:
+        deps = []
+        for name, sql in files:
+            path = os.path.join(tmp, name)
+            with open(path, "w") as f:
+                f.write(sql)
+            deps.append(analyze_migration(MigrationFile(name=name, path=path, checksum="")))
+        return MigrationGraph(deps, installed_extensions)
+
+
+def test_write_tokens():
+    graph = build_graph([("001_mixed.sql", """
+        -- UPDATE commented_out SET x = 1;
+        CREATE TABLE IF NOT EXISTS public."Investor_Notes" (id uuid);
+        INSERT INTO price_list (item_code) VALUES ('DELETE FROM quoted');
+        UPDATE ONLY carbon_projects AS cp SET status = 'active';
+        DROP TABLE IF EXISTS old_a, public.old_b;
+        CREATE INDEX IF NOT EXISTS idx_programs_kode ON programs (kode_program);
+        COMMENT ON COLUMN program_budgets.total_amount IS 'generated';
+        GRANT SELECT ON investor_projection_summary, v_investor_projection TO anon, authenticated;
+        GRANT USAGE ON SCHEMA public TO anon;
+        CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+    """)])
+    deps = graph.nodes[0]
+    assert deps.ambiguous is None, deps.ambiguous
+    assert deps.writes == {
+        "Investor_Notes", "price_list", "carbon_projects", "old_a", "old_b", "programs",
+        "program_budgets", "investor_projection_summary", "v_investor_projection",
+        "schema:public", "extension:uuid-ossp",
+    }
+
+
+def test_same_table_writes_land_in_different_waves():
+    graph = build_graph([
+        ("001_create.sql", "CREATE TABLE investor_scenario_results (id uuid);"),
+        ("002_seed.sql", "INSERT INTO investor_scenario_results (id) VALUES (gen_random_uuid());"),
+        ("003_grant.sql", "GRANT SELECT ON investor_scenario_results TO anon;"),
+    ])
+    assert graph.waves() == [[0], [1], [2]]
+    assert graph.parents[2] == {0, 1}
+
+
+def test_independent_files_run_in_parallel():
+    graph = build_graph([
+        ("001_projection.sql", "CREATE TABLE investor_projection_yearly (id uuid);"),
+        ("002_scenarios.sql", "CREATE TABLE investor_scenario_results (id uuid);"),
+        ("003_prices.sql", "UPDATE price_list SET is_active = true;"),
+        ("004_view.sql", "CREATE VIEW v_projection AS SELECT * FROM investor_projection_yearly;"),
+    ])
+    assert graph.waves() == [[0, 1, 2], [3]]
+    assert graph.parents[3] == {0}
+
+
+def test_ambiguous_file_is_a_barrier():
+    graph = build_graph([
+        ("001_a.sql", "CREATE TABLE a (id int);"),
+        ("002_b.sql", "CREATE TABLE b (id int);"),
+        ("003_dynamic.sql", "DO $$ BEGIN EXECUTE 'TRUNCATE ' || 'a'; END $$;"),
+        ("004_c.sql", "CREATE TABLE c (id int);"),
+        ("005_cascade.sql", "DROP TABLE d CASCADE;"),
+    ])
+    assert [deps.migration.name for deps in graph.ambiguous] == ["003_dynamic.sql", "005_cascade.sql"]
+    assert graph.waves() == [[0, 1], [2], [3], [4]]
+    assert graph.parents[2] == {0, 1}
+    assert graph.parents[3] == {2}
+
+
+def test_function_calls_inherit_writes():
+    graph = build_graph([
+        ("001_function.sql", """
+            CREATE OR REPLACE FUNCTION refresh_totals() RETURNS void AS $$
+            BEGIN
+                UPDATE investors SET total = 0;
+            END;
+            $$ LANGUAGE plpgsql;
+        """),
+        ("002_investors.sql", "ALTER TABLE investors ADD COLUMN note text;"),
+        ("003_call.sql", "SELECT refresh_totals();"),
+    ])
+    assert graph.parents[1] == {0}
+    assert graph.parents[2] == {0, 1}
+
+
+def test_installed_extensions_do_not_conflict():
+    files = [
+        ("001_ext.sql", 'CREATE EXTENSION IF NOT EXISTS "uuid-ossp";'),
+        ("002_table.sql", "CREATE TABLE t (id uuid DEFAULT uuid_generate_v4());"),
+    ]
+    assert build_graph(files).waves() == [[0], [1]]
+    assert build_graph(files, installed_extensions={"uuid-ossp"}).waves() == [[0, 1]]
+
+
+def main():
+    print("🧪 TESTING SQL RUNNER SCHEDULER")
+    print("=" * 60)
+
+    tests = [
+        test_write_tokens,
+        test_same_table_writes_land_in_different_waves,
+        test_independent_files_run_in_parallel,
+        test_ambiguous_file_is_a_barrier,
+        test_function_calls_inherit_writes,
+        test_installed_extensions_do_not_conflict,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Startup guard for the SQL runner CLI.
+Runs the cases from scripts/sql_runner/bench_startup.py: `run.py --help` and
+`run.py migrations` must not import the database driver or heavy rich
+renderables and must start within budget. The budgets are set for a developer
+machine, so shared runners get BUDGET_SLACK times the budget unless
+SQL_RUNNER_STARTUP_BUDGET_STRICT=1.
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+from bench_startup import CASES, run_case  # noqa: E402
+
+RUNS = 3
+BUDGET_SLACK = 1.0 if os.environ.get("SQL_RUNNER_STARTUP_BUDGET_STRICT") == "1" else 3.0
+
+
+def check_case(case):
+    result = run_case(case, RUNS)
+    assert result.imports, f"no -X importtime output for {case.name}"
+    assert not result.forbidden_imported, (case.name, result.forbidden_imported)
+    budget_ms = case.budget_ms * BUDGET_SLACK
+    assert result.median_ms <= budget_ms, (case.name, f"{result.median_ms:.0f} ms > {budget_ms:.0f} ms")
+
+
+def test_help_startup():
+    check_case(CASES[0])
+
+
+def test_migrations_startup():
+    check_case(CASES[1])
+
+
+def main():
+    print("🧪 TESTING SQL RUNNER STARTUP")
+    print("=" * 60)
+
+    tests = [test_help_startup, test_migrations_startup]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test SQL runner workload stats (run.py stats) without a database:
+pg_stat_statements snapshots are diffed per queryid and runner timings are
+grouped by fingerprint into percentiles and histograms.
+"""
+
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+from executor import ExecutionResult, StatementResult  # noqa: E402
+from stats import StatementStats, diff_snapshots, group_timings, percentile, top_statements  # noqa: E402
+
+
+def entry(queryid, query, calls, total_ms):
+    return StatementStats(queryid=queryid, query=query, calls=calls, total_ms=total_ms,
+                          rows=calls, shared_hit=0, shared_read=0)
+
+
+def test_diff_snapshots():
+    before = {
+        1: entry(1, "SELECT * FROM carbon_projects WHERE id = $1", 10, 20.0),
+        2: entry(2, "SELECT * FROM profiles", 5, 5.0),
+        3: entry(3, "UPDATE investors SET total = $1", 50, 100.0),
+    }
+    after = {
+        1: entry(1, "SELECT * FROM carbon_projects WHERE id = $1", 40, 80.0),
+        2: entry(2, "SELECT * FROM profiles", 5, 5.0),       # not executed
+        3: entry(3, "UPDATE investors SET total = $1", 4, 12.0),  # reset in between
+        4: entry(4, "SELECT * FROM pg_stat_statements", 1, 1.0),  # the snapshot itself
+    }
+    changes = {s.queryid: s for s in diff_snapshots(before, after)}
+    assert sorted(changes) == [1, 3]
+    assert changes[1].calls == 30 and changes[1].total_ms == 60.0 and changes[1].mean_ms == 2.0
+    assert changes[3].calls == 4
+
+    assert [s.queryid for s in top_statements(list(changes.values()), "mean")] == [3, 1]
+    assert [s.queryid for s in diff_snapshots(before, after, match="carbon")] == [1]
+
+
+def test_percentile():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 50) == 3
+    assert percentile(values, 95) == 4.8
+    assert percentile([], 95) == 0.0
+
+
+def test_group_timings_by_fingerprint():
+    def result(sql, seconds, success=True):
+        return StatementResult(statement=sql, line_number=1,
+                               result=ExecutionResult(success=success, execution_time=seconds))
+
+    results = [
+        result("SELECT * FROM kabupaten WHERE id = 1", 0.002),
+        result("-- lookup\nSELECT * FROM kabupaten WHERE id = 2", 0.004),
+        result("SELECT * FROM kabupaten WHERE id = 3", 0.5, success=False),
+        result("SELECT count(*) FROM carbon_projects", 0.030),
+    ]
+    groups = group_timings(results)
+    assert [len(g.timings_ms) for g in groups] == [1, 2]
+    kabupaten = groups[1]
+    assert kabupaten.query == "select * from kabupaten where id = ?"
+    assert round(kabupaten.p50, 3) == 3.0
+    assert sum(kabupaten.histogram()) == 2
+
+
+def main():
+    print("🧪 TESTING SQL RUNNER STATS")
+    print("=" * 60)
+
+    tests = [test_diff_snapshots, test_percentile, test_group_timings_by_fingerprint]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
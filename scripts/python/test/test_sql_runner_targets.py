@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test SQL runner connection profiles (run --targets) without a database:
+target names map to env files, SQL_RUNNER_DATABASE_URL connects directly and
+the connection mode picks the direct or pooler endpoint.
+"""
+
+import os
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+from config import SupabaseConfig, load_env_config, target_env_path  # noqa: E402
+
+
+def test_target_env_paths():
+    assert target_env_path(None) == os.path.join(PROJECT_ROOT, ".env.local")
+    assert target_env_path("default") == os.path.join(PROJECT_ROOT, ".env.local")
+    assert target_env_path("staging") == os.path.join(PROJECT_ROOT, ".env.staging")
+    assert target_env_path("/etc/replica.env") == "/etc/replica.env"
+
+
+def test_database_url_target():
+    with tempfile.NamedTemporaryFile("w", suffix=".env", delete=False) as f:
+        f.write('# local replica\nSQL_RUNNER_DATABASE_URL="postgresql://postgres:pw@localhost:5433/replica"\n')
+    try:
+        config = load_env_config(target=f.name)
+    finally:
+        os.remove(f.name)
+
+    assert config.source == "dsn"
+    assert config.target == f.name
+    assert config.database_name == "replica"
+    assert config.get_direct_connection_params() == {"dsn": "postgresql://postgres:pw@localhost:5433/replica"}
+
+
+def test_supabase_target():
+    with tempfile.NamedTemporaryFile("w", suffix=".env", delete=False) as f:
+        f.write("NEXT_PUBLIC_SUPABASE_URL=https://abcdefgh.supabase.co\nSUPABASE_SERVICE_ROLE_KEY=key\n")
+    try:
+        config = load_env_config(target=f.name)
+    finally:
+        os.remove(f.name)
+
+    assert config.project_ref == "abcdefgh"
+    assert config.dsn is None
+
+
+def supabase_config(mode, pooler_host=None):
+    return SupabaseConfig(project_ref="abcdefgh", supabase_url="https://abcdefgh.supabase.co",
+                          service_role_key="key", database_host="db.abcdefgh.supabase.co",
+                          database_password="p/a%ss", connection_mode=mode, pooler_host=pooler_host)
+
+
+def test_connection_modes():
+    direct = supabase_config("direct").get_direct_connection_params()
+    assert (direct["host"], direct["port"], direct["user"]) == ("db.abcdefgh.supabase.co", 5432, "postgres")
+
+    # Dedicated pooler next to the database
+    dedicated = supabase_config("transaction").get_direct_connection_params()
+    assert (dedicated["host"], dedicated["port"], dedicated["user"]) == ("db.abcdefgh.supabase.co", 6543, "postgres")
+
+    pooler = "aws-0-ap-southeast-1.pooler.supabase.com"
+    shared = supabase_config("session", pooler).get_direct_connection_params()
+    assert (shared["host"], shared["port"], shared["user"]) == (pooler, 5432, "postgres.abcdefgh")
+    assert supabase_config("transaction", pooler).get_connection_string() == (
+        f"postgresql://postgres.abcdefgh:p%2Fa%25ss@{pooler}:6543/postgres?sslmode=require"
+    )
+
+    try:
+        supabase_config("session").get_direct_connection_params()
+    except ValueError:
+        return
+    raise AssertionError("session mode without a pooler host")
+
+
+def test_connection_mode_from_env_file():
+    with tempfile.NamedTemporaryFile("w", suffix=".env", delete=False) as f:
+        f.write("SQL_RUNNER_DATABASE_URL=postgresql://postgres:pw@pooler.local:6543/postgres\n")
+    try:
+        assert load_env_config(target=f.name).transaction_pooled
+        os.environ["SQL_RUNNER_CONNECTION_MODE"] = "direct"
+        assert load_env_config(target=f.name).connection_mode == "direct"
+    finally:
+        os.environ.pop("SQL_RUNNER_CONNECTION_MODE", None)
+        os.remove(f.name)
+
+
+def main():
+    print("🧪 TESTING SQL RUNNER TARGETS")
+    print("=" * 60)
+
+    tests = [
+        test_target_env_paths,
+        test_database_url_target,
+        test_supabase_target,
+        test_connection_modes,
+        test_connection_mode_from_env_file,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Correctness corpus for the SQL runner statement splitter.
+Compares scripts/sql_runner/splitter.py against a plain character-by-character
+reference lexer on hand-written edge cases and on every .sql file in the repo.
+"""
+
+import io
+import os
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts", "sql_runner"))
+
+from splitter import (has_writes, iter_statements, mask_literals, split_complete, split_statements,  # noqa: E402
+                      strip_leading_comments)
+
+SKIP_DIRS = {".git", "node_modules", "venv", ".venv", ".next"}
+CHUNK_SIZES = (1, 2, 7, 64, 4096)
+
+EDGE_CASES = [
+    # (sql, expected statements)
+    ("SELECT 1; SELECT 2", [("SELECT 1;", 1), ("SELECT 2", 1)]),
+    ("SELECT 'a;b';", [("SELECT 'a;b';", 1)]),
+    ("SELECT 'it''s; fine';", [("SELECT 'it''s; fine';", 1)]),
+    ("SELECT '\\'; SELECT 2;", [("SELECT '\\';", 1), ("SELECT 2;", 1)]),
+    ("SELECT E'it\\'s; fine';", [("SELECT E'it\\'s; fine';", 1)]),
+    ("SELECT e'\\\\'; SELECT 2;", [("SELECT e'\\\\';", 1), ("SELECT 2;", 1)]),
+    ("SELECT \"a;\"\"b\" FROM t;", [("SELECT \"a;\"\"b\" FROM t;", 1)]),
+    ("SELECT $$ ; $$;", [("SELECT $$ ; $$;", 1)]),
+    ("SELECT $fn$ $$ ; $fn$;", [("SELECT $fn$ $$ ; $fn$;", 1)]),
+    ("SELECT $1, a$b$c FROM t; SELECT 2;", [("SELECT $1, a$b$c FROM t;", 1), ("SELECT 2;", 1)]),
+    ("/* a /* b ; */ c ; */ SELECT 1;", [("/* a /* b ; */ c ; */ SELECT 1;", 1)]),
+    ("SELECT 1 -- trailing ; comment\n;", [("SELECT 1 -- trailing ; comment\n;", 1)]),
+    ("SELECT 1; -- only a comment ;\n", [("SELECT 1;", 1)]),
+    ("; ;\n\n  ;", []),
+    ("\n\n  -- header\nSELECT 1;", [("-- header\nSELECT 1;", 3)]),
+    (
+        "CREATE FUNCTION f() RETURNS void AS $body$\nBEGIN\n  RAISE NOTICE 'x;y';\nEND;\n"
+        "$body$ LANGUAGE plpgsql;\nSELECT f();",
+        [
+            ("CREATE FUNCTION f() RETURNS void AS $body$\nBEGIN\n  RAISE NOTICE 'x;y';\nEND;\n"
+             "$body$ LANGUAGE plpgsql;", 1),
+            ("SELECT f();", 6),
+        ],
+    ),
+    ("SELECT 'unterminated; string", [("SELECT 'unterminated; string", 1)]),
+]
+
+
+def reference_split(content):
+    """Straightforward per-character lexer used as the oracle."""
+    statements = []
+    i, n = 0, len(content)
+    start = 0
+    significant = False
+
+    def flush(end):
+        text = content[start:end].strip()
+        if significant and text:
+            first = start + (len(content[start:end]) - len(content[start:end].lstrip()))
+            statements.append((text, content.count("\n", 0, first) + 1))
+
+    while i < n:
+        c = content[i]
+        if content.startswith("--", i):
+            j = content.find("\n", i)
+            i = n if j < 0 else j
+        elif content.startswith("/*", i):
+            depth, i = 1, i + 2
+            while i < n and depth:
+                if content.startswith("/*", i):
+                    depth, i = depth + 1, i + 2
+                elif content.startswith("*/", i):
+                    depth, i = depth - 1, i + 2
+                else:
+                    i += 1
+        elif c == ";":
+            i += 1
+            flush(i)
+            start, significant = i, False
+        elif c.isspace():
+            i += 1
+        else:
+            significant = True
+            prev = content[i - 1] if i else ""
+            before = content[i - 2] if i > 1 else ""
+            if c == "'" and prev in ("e", "E") and not (before.isalnum() or before in "_$"):
+                i += 1
+                while i < n:
+                    if content[i] == "\\":
+                        i += 2
+                    elif content[i] == "'":
+                        if content.startswith("''", i):
+                            i += 2
+                        else:
+                            i += 1
+                            break
+                    else:
+                        i += 1
+            elif c in ("'", '"'):
+                i += 1
+                while i < n:
+                    if content[i] == c:
+                        if content.startswith(c * 2, i):
+                            i += 2
+                        else:
+                            i += 1
+                            break
+                    else:
+                        i += 1
+            elif c == "$" and not (prev.isalnum() or prev in "_$"):
+                j = i + 1
+                if j < n and (content[j].isalpha() or content[j] == "_"):
+                    while j < n and (content[j].isalnum() or content[j] == "_"):
+                        j += 1
+                if j < n and content[j] == "$":
+                    tag = content[i:j + 1]
+                    k = content.find(tag, j + 1)
+                    i = n if k < 0 else k + len(tag)
+                else:
+                    i += 1
+            else:
+                i += 1
+    flush(n)
+    return statements
+
+
+def iter_sql_files():
+    for root, dirs, files in os.walk(PROJECT_ROOT):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        for name in sorted(files):
+            if name.endswith(".sql"):
+                yield os.path.join(root, name)
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_edge_cases():
+    for sql, expected in EDGE_CASES:
+        assert split_statements(sql) == expected, sql
+        assert reference_split(sql) == expected, sql
+
+
+def test_repo_corpus_matches_reference():
+    files = list(iter_sql_files())
+    assert files, "no .sql files found"
+    for path in files:
+        content = read(path)
+        assert split_statements(content) == reference_split(content), path
+
+
+def test_chunk_size_does_not_change_result():
+    cases = [sql for sql, _ in EDGE_CASES] + [read(p) for p in iter_sql_files()]
+    for content in cases:
+        expected = split_statements(content)
+        for chunk_size in CHUNK_SIZES:
+            result = list(iter_statements(io.StringIO(content), chunk_size))
+            assert result == expected, (chunk_size, content[:80])
+
+
+def test_statements_are_self_contained():
+    for path in iter_sql_files():
+        for statement, _ in split_statements(read(path)):
+            assert split_statements(statement)[0][0] == statement, path
+
+
+def test_split_complete_keeps_unterminated_rest():
+    # Line-by-line input (run.py shell): only terminated statements run
+    assert split_complete("select 1;\nselect") == ([("select 1;", 1)], "\nselect")
+    assert split_complete("select 'a;") == ([], "select 'a;")
+    assert split_complete("do $$ begin; end") == ([], "do $$ begin; end")
+    assert split_complete("select 1 /* note;") == ([], "select 1 /* note;")
+    assert split_complete("select 1;\n-- done") == ([("select 1;", 1)], "")
+
+
+def test_mask_literals():
+    cases = [
+        ("SELECT * FROM audit_log WHERE action = 'DELETE'", "SELECT * FROM audit_log WHERE action =  "),
+        ("SELECT 'it''s', \"update\" FROM t", "SELECT  ,   FROM t"),
+        ("SELECT E'a\\'insert' , x", "SELECT   , x"),
+        ("SELECT $q$ into $$ $q$, $$delete$$, $1", "SELECT  ,  , $1"),
+        ("SELECT a$b$ FROM t", "SELECT a$b$ FROM t"),
+        ("-- update\nSELECT /* a /* nested */ merge */ 1", " \nSELECT   1"),
+        ("SELECT 'unterminated into", "SELECT  "),
+    ]
+    for sql, masked in cases:
+        assert mask_literals(sql) == masked, (sql, mask_literals(sql))
+
+
+def test_statement_classifiers():
+    assert strip_leading_comments("-- export\n /* daily */ SELECT 1 -- tail") == "SELECT 1 -- tail"
+    assert strip_leading_comments("SELECT 1") == "SELECT 1"
+    for sql in ["INSERT INTO a VALUES (1)", "SELECT * INTO backup FROM a",
+                "WITH moved AS (DELETE FROM a RETURNING *) SELECT * FROM moved"]:
+        assert has_writes(sql), sql
+    for sql in ["SELECT * FROM audit_log WHERE action = 'DELETE'", "SELECT \"update\" FROM t",
+                "SELECT 1 -- insert later", "SELECT updated_at FROM t"]:
+        assert not has_writes(sql), sql
+
+
+def main():
+    print("🧪 TESTING SQL STATEMENT SPLITTER")
+    print("=" * 60)
+
+    tests = [
+        test_edge_cases,
+        test_repo_corpus_matches_reference,
+        test_chunk_size_does_not_change_result,
+        test_statements_are_self_contained,
+        test_split_complete_keeps_unterminated_rest,
+        test_mask_literals,
+        test_statement_classifiers,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+
+    print(f"\n📁 Corpus: {len(list(iter_sql_files()))} .sql files")
+    return failed == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Perhitungan ulang data investor carbon_projects secara set-based.
+
+Semua project dihitung sekaligus dengan NumPy (satu array per kolom, bukan
+loop per project), lalu ditulis kembali dengan satu UPDATE ... FROM
+(VALUES ...). Jumlah round trip ke database tetap (satu SELECT, satu UPDATE)
+berapapun jumlah project.
+
+Asumsi sama dengan calculate_investor_data versi lama:
+- 1000 credits = 1 hektar
+- investasi Rp 5 juta per hektar
+- ROI tetap per status project
+- carbon sequestration = credits × 10 (project 10 tahun)
+
+Membutuhkan numpy (pip install numpy).
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+CREDITS_PER_HECTARE = 1000
+INVESTMENT_PER_HECTARE = 5_000_000
+PROJECT_PERIOD_YEARS = 10
+
+ROI_BY_STATUS = {'active': 18.0, 'approved': 15.0, 'validated': 12.0}
+DEFAULT_ROI = 10.0
+
+# (batas bawah ROI, rating), dicek berurutan
+PERFORMANCE_RATINGS = ((20.0, 'excellent'), (15.0, 'good'), (10.0, 'average'))
+DEFAULT_RATING = 'poor'
+
+INVESTOR_COLUMNS = ('investment_amount', 'roi_percentage', 'carbon_sequestration_estimated',
+                    'project_period_years', 'performance_rating', 'investor_notes')
+
+# Literal di VALUES bertipe text, jadi setiap kolom di-cast ke tipe kolom tujuan
+UPDATE_TEMPLATE = "(%s::uuid, %s::numeric, %s::numeric, %s::numeric, %s::integer, %s, %s)"
+UPDATE_SQL = f"""
+    UPDATE carbon_projects AS cp SET
+        {', '.join(f'{c} = v.{c}' for c in INVESTOR_COLUMNS)},
+        last_investor_update = NOW()
+    FROM (VALUES %s) AS v(id, {', '.join(INVESTOR_COLUMNS)})
+    WHERE cp.id = v.id
+    RETURNING cp.id
+"""
+
+SELECT_SQL = "SELECT id, project_code, project_name, estimated_credits, status FROM carbon_projects"
+
+
+def compute_investor_data(credits: Sequence[float], statuses: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Hitung kolom investor untuk semua project dalam satu pass
+    credits dan statuses sejajar (satu elemen per project); credits None
+    dianggap 0. Hasil berupa dict kolom -> array dengan panjang yang sama.
+    """
+    credits = np.array([c or 0 for c in credits], dtype=float)
+    statuses = np.asarray(statuses, dtype=object)
+
+    hectares = np.where(credits > 0, credits / CREDITS_PER_HECTARE, 0.0)
+    roi = np.select([statuses == status for status in ROI_BY_STATUS],
+                    list(ROI_BY_STATUS.values()), default=DEFAULT_ROI)
+    rating = np.select([roi >= floor for floor, _ in PERFORMANCE_RATINGS],
+                       [name for _, name in PERFORMANCE_RATINGS], default=DEFAULT_RATING)
+
+    return {
+        'estimated_hectares': hectares,
+        'investment_amount': hectares * INVESTMENT_PER_HECTARE,
+        'roi_percentage': roi,
+        'carbon_sequestration_estimated': credits * PROJECT_PERIOD_YEARS,
+        'project_period_years': np.full(len(credits), PROJECT_PERIOD_YEARS),
+        'performance_rating': rating,
+    }
+
+
+def investor_notes(credits: np.ndarray, hectares: np.ndarray, roi: np.ndarray) -> List[str]:
+    return [f"Project based on {ha:,.1f} estimated hectares ({c:,.0f} credits). Estimated ROI: {r}%."
+            for c, ha, r in zip(credits.tolist(), hectares.tolist(), roi.tolist())]
+
+
+def plan_updates(projects: List[dict]) -> Tuple[List[dict], List[dict]]:
+    """
+    Pisahkan project yang bisa dihitung (estimated_credits > 0) dari yang
+    dilewati, lalu hitung data investor untuk semuanya sekaligus
+    Mengembalikan (rows, skipped); setiap row berisi id, project_code,
+    project_name, estimated_credits, status dan kolom INVESTOR_COLUMNS.
+    """
+    usable, skipped = [], []
+    for project in projects:
+        (usable if float(project.get('estimated_credits') or 0) > 0 else skipped).append(project)
+    if not usable:
+        return [], skipped
+
+    credits = np.array([float(p['estimated_credits']) for p in usable])
+    data = compute_investor_data(credits, [p.get('status') or 'draft' for p in usable])
+    data['investor_notes'] = investor_notes(credits, data['estimated_hectares'], data['roi_percentage'])
+
+    columns = {c: (data[c].tolist() if isinstance(data[c], np.ndarray) else data[c]) for c in INVESTOR_COLUMNS}
+    rows = []
+    for i, project in enumerate(usable):
+        row = {k: project.get(k) for k in ('id', 'project_code', 'project_name', 'estimated_credits', 'status')}
+        row.update((c, columns[c][i]) for c in INVESTOR_COLUMNS)
+        rows.append(row)
+    return rows, skipped
+
+
+def write_investor_data(cur, rows: List[dict]) -> List[str]:
+    """
+    Tulis data investor semua row dengan satu statement UPDATE ... FROM (VALUES ...)
+    Mengembalikan id project yang ter-update.
+    """
+    from psycopg2.extras import execute_values
+
+    if not rows:
+        return []
+    values = [[str(row['id'])] + [row[c] for c in INVESTOR_COLUMNS] for row in rows]
+    # page_size = jumlah row: satu statement, bukan satu per 100 row (default execute_values)
+    updated = execute_values(cur, UPDATE_SQL, values, template=UPDATE_TEMPLATE,
+                             page_size=len(values), fetch=True)
+    return [str(project_id) for project_id, in updated]
+
+
+def recompute_investor_data(db, dry_run: bool = False) -> Tuple[List[dict], List[dict], List[str]]:
+    """
+    Baca semua carbon project, hitung ulang dan tulis kembali dalam satu transaksi
+    db adalah modul sisinfops_db. Mengembalikan (rows, skipped, updated_ids);
+    dengan dry_run=True tidak ada yang ditulis.
+    """
+    with db.connection() as conn:
+        cur = conn.cursor()
+        cur.execute(SELECT_SQL)
+        names = [d[0] for d in cur.description]
+        projects = [dict(zip(names, record)) for record in cur.fetchall()]
+        rows, skipped = plan_updates(projects)
+        updated = [] if dry_run else write_investor_data(cur, rows)
+        cur.close()
+    return rows, skipped, updated
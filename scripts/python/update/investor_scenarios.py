@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Simulasi Monte Carlo model finansial carbon project.
+
+Untuk setiap project dijalankan banyak skenario sekaligus: setiap skenario
+adalah satu baris di investor_projection.project() dengan asumsi hasil
+sampling (harga karbon, faktor sequestration, cost overrun dan unit cost
+dari sebaran price_list). Project dibagi ke process pool, satu project per
+task, dan hasilnya diringkas menjadi pita persentil P10/P50/P90 yang
+disimpan di investor_scenario_results
+(migration 202610171100_create_investor_scenario_results.sql).
+
+Seed per project diturunkan dari satu seed (SeedSequence.spawn), jadi hasil
+bisa diulang berapapun jumlah worker.
+
+Membutuhkan numpy (pip install numpy).
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from investor_engine import CREDITS_PER_HECTARE, PROJECT_PERIOD_YEARS
+from investor_projection import ProjectionAssumptions, project
+
+DEFAULT_SIMULATIONS = int(os.environ.get('SISINFOPS_SCENARIO_SIMULATIONS', 100_000))
+# Skenario per batch; membatasi memori matriks (batch × tahun) per worker
+DEFAULT_BATCH_SIZE = 25_000
+PERCENTILES = (10, 50, 90)
+
+RESULT_COLUMNS = ('carbon_project_id', 'metric', 'p10', 'p50', 'p90', 'mean', 'prob_negative',
+                  'simulations', 'seed', 'distributions')
+
+PRICE_LIST_SQL = """
+    SELECT category, unit_price FROM price_list
+    WHERE COALESCE(is_active, true) AND unit_price > 0
+"""
+
+
+@dataclass
+class ScenarioDistributions:
+    """
+    Sebaran input simulasi
+    carbon_price dan cost_overrun triangular (low, mode, high);
+    sequestration_factor normal (mean, sd), dipotong di 0, mengali
+    sequestration dasar. unit_cost_multipliers adalah sampel empiris rasio
+    unit_price terhadap median kategorinya di price_list (lihat
+    price_list_multipliers); kosong berarti biaya operasional tetap.
+    """
+    carbon_price: Tuple[float, float, float] = (40_000, 75_000, 150_000)
+    sequestration_factor: Tuple[float, float] = (1.0, 0.2)
+    cost_overrun: Tuple[float, float, float] = (0.0, 0.1, 0.5)
+    unit_cost_multipliers: List[float] = field(default_factory=list)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data['unit_cost_multipliers'] = len(self.unit_cost_multipliers)
+        return json.dumps(data)
+
+
+def price_list_multipliers(rows: Sequence[Tuple[Optional[str], float]]) -> List[float]:
+    """
+    Rasio unit_price / median kategori untuk setiap item price_list
+    Menggambarkan seberapa jauh harga satuan bisa menyimpang dari harga
+    tipikal kategorinya; dipakai sebagai sebaran empiris biaya operasional.
+    """
+    by_category: Dict[Optional[str], List[float]] = {}
+    for category, unit_price in rows:
+        by_category.setdefault(category, []).append(float(unit_price))
+    multipliers = []
+    for prices in by_category.values():
+        prices = np.asarray(prices)
+        multipliers.extend((prices / np.median(prices)).tolist())
+    return multipliers
+
+
+def _triangular(rng: np.random.Generator, low: float, mode: float, high: float, n: int) -> np.ndarray:
+    # low == high berarti nilai tetap, yang ditolak rng.triangular
+    return np.full(n, float(mode)) if low == high else rng.triangular(low, mode, high, size=n)
+
+
+def sample_assumptions(rng: np.random.Generator, n: int, base: ProjectionAssumptions,
+                       distributions: ScenarioDistributions) -> Tuple[ProjectionAssumptions, np.ndarray]:
+    """
+    n skenario asumsi; mengembalikan (asumsi berisi array, faktor sequestration)
+    Faktor sequestration sudah dikalikan ke sequestration_per_ha dan perlu
+    dikalikan juga ke estimated_credits. Cost overrun berlaku untuk investasi
+    dan biaya operasional.
+    """
+    d = distributions
+    overrun = 1.0 + _triangular(rng, *d.cost_overrun, n)
+    unit_cost = (rng.choice(np.asarray(d.unit_cost_multipliers), size=n)
+                 if d.unit_cost_multipliers else np.ones(n))
+    factor = np.clip(rng.normal(*d.sequestration_factor, size=n), 0.0, None)
+    sampled = ProjectionAssumptions(
+        carbon_price=_triangular(rng, *d.carbon_price, n),
+        sequestration_per_ha=base.sequestration_per_ha * factor,
+        investment_per_ha=base.investment_per_ha * overrun,
+        operating_cost_per_ha=base.operating_cost_per_ha * unit_cost * overrun,
+        discount_rate=base.discount_rate,
+    )
+    return sampled, factor
+
+
+def simulate_project(luas_ha: float, credits: float, period: int, simulations: int,
+                     seed, base: Optional[ProjectionAssumptions] = None,
+                     distributions: Optional[ScenarioDistributions] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, np.ndarray]:
+    """
+    Jalankan simulasi satu project, per batch
+    Mengembalikan dict metric -> array hasil semua skenario: npv,
+    irr_percentage (NaN jika tidak terdefinisi), total_revenue dan
+    total_sequestration_ton.
+    """
+    base = base or ProjectionAssumptions()
+    distributions = distributions or ScenarioDistributions()
+    rng = np.random.default_rng(seed)
+    # Luas tetap; ketidakpastian sequestration tidak boleh mengubah biaya per hektar
+    hectares = luas_ha if luas_ha > 0 else credits / CREDITS_PER_HECTARE
+
+    metrics: Dict[str, List[np.ndarray]] = {'npv': [], 'irr_percentage': [], 'total_revenue': [],
+                                            'total_sequestration_ton': []}
+    for start in range(0, simulations, batch_size):
+        n = min(batch_size, simulations - start)
+        sampled, factor = sample_assumptions(rng, n, base, distributions)
+        result = project(np.full(n, hectares), credits * factor, 0, period, sampled)
+        metrics['npv'].append(result.npv)
+        metrics['irr_percentage'].append(result.irr * 100)
+        metrics['total_revenue'].append(result.revenue.sum(axis=1))
+        metrics['total_sequestration_ton'].append(result.sequestration.sum(axis=1))
+    return {metric: np.concatenate(values) for metric, values in metrics.items()}
+
+
+def summarize(values: np.ndarray) -> Dict[str, Optional[float]]:
+    """Persentil P10/P50/P90, rata-rata dan peluang negatif; NaN diabaikan"""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {'p10': None, 'p50': None, 'p90': None, 'mean': None, 'prob_negative': None}
+    p10, p50, p90 = np.percentile(values, PERCENTILES).tolist()
+    return {'p10': p10, 'p50': p50, 'p90': p90, 'mean': float(values.mean()),
+            'prob_negative': float((values < 0).mean())}
+
+
+def _simulate_task(task) -> Dict[str, Dict[str, Optional[float]]]:
+    results = simulate_project(*task)
+    return {metric: summarize(values) for metric, values in results.items()}
+
+
+def run_scenarios(projects: List[dict], simulations: int = DEFAULT_SIMULATIONS, seed: int = 0,
+                  base: Optional[ProjectionAssumptions] = None,
+                  distributions: Optional[ScenarioDistributions] = None,
+                  workers: Optional[int] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> List[dict]:
+    """
+    Simulasikan semua project (row hasil investor_projection.SELECT_SQL) di
+    process pool
+    Project tanpa luas_total_ha dan estimated_credits dilewati. Mengembalikan
+    satu dict per project: project, bands (metric -> ringkasan) dan seed.
+    workers=1 menjalankan semuanya di proses ini.
+    """
+    base = base or ProjectionAssumptions()
+    distributions = distributions or ScenarioDistributions()
+    usable = [p for p in projects
+              if float(p.get('luas_total_ha') or 0) > 0 or float(p.get('estimated_credits') or 0) > 0]
+    seeds = np.random.SeedSequence(seed).spawn(len(usable))
+    tasks = [(float(p.get('luas_total_ha') or 0), float(p.get('estimated_credits') or 0),
+              int(p.get('period_years') or PROJECT_PERIOD_YEARS), simulations, s, base, distributions, batch_size)
+             for p, s in zip(usable, seeds)]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        bands = [_simulate_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Beberapa project per task agar overhead antar proses kecil untuk ribuan project
+            bands = list(pool.map(_simulate_task, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    return [{'project': p, 'bands': b, 'seed': seed} for p, b in zip(usable, bands)]
+
+
+def result_rows(results: List[dict], simulations: int, distributions: ScenarioDistributions):
+    """Row investor_scenario_results (urutan RESULT_COLUMNS), satu per project per metric"""
+    settings = distributions.to_json()
+    rows = []
+    for result in results:
+        for metric, band in result['bands'].items():
+            rows.append((str(result['project']['id']), metric, band['p10'], band['p50'], band['p90'],
+                         band['mean'], band['prob_negative'], simulations, result['seed'], settings))
+    return rows
+
+
+def write_results(cur, results: List[dict], simulations: int, distributions: ScenarioDistributions) -> int:
+    """Upsert semua pita persentil dengan satu statement; mengembalikan jumlah row"""
+    from psycopg2.extras import execute_values
+
+    rows = result_rows(results, simulations, distributions)
+    if not rows:
+        return 0
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in RESULT_COLUMNS[2:])
+    execute_values(
+        cur,
+        f"INSERT INTO investor_scenario_results ({', '.join(RESULT_COLUMNS)}) VALUES %s "
+        f"ON CONFLICT (carbon_project_id, metric) DO UPDATE SET {updates}, calculated_at = NOW()",
+        rows, template="(%s::uuid, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb)", page_size=len(rows),
+    )
+    return len(rows)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Script untuk menghitung proyeksi investor (sequestration, cashflow, NPV, IRR)
+semua carbon project dan menyimpannya ke tabel proyeksi dashboard investor.
+Migration: supabase/migrations/202610171000_create_investor_projection_tables.sql
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'insert'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import sisinfops_db as db
+from investor_engine import PROJECT_PERIOD_YEARS
+from investor_projection import (SELECT_SQL, SUMMARY_COLUMNS, YEARLY_COLUMNS, ProjectionAssumptions,
+                                 project_rows, write_projection)
+
+REQUIRED_COLUMNS = {
+    'carbon_projects': ('luas_total_ha', 'estimated_credits', 'crediting_period_start', 'project_period_years'),
+    'investor_projection_yearly': YEARLY_COLUMNS,
+    'investor_projection_summary': SUMMARY_COLUMNS,
+}
+
+def main():
+    defaults = ProjectionAssumptions()
+    parser = argparse.ArgumentParser(description="Hitung proyeksi investor semua carbon project")
+    parser.add_argument('--carbon-price', type=float, default=defaults.carbon_price, help="Rp per ton CO2e")
+    parser.add_argument('--sequestration-per-ha', type=float, default=defaults.sequestration_per_ha,
+                        help="ton CO2e per ha per tahun, jika estimated_credits kosong")
+    parser.add_argument('--investment-per-ha', type=float, default=defaults.investment_per_ha, help="Rp per ha")
+    parser.add_argument('--operating-cost-per-ha', type=float, default=defaults.operating_cost_per_ha,
+                        help="Rp per ha per tahun")
+    parser.add_argument('--discount-rate', type=float, default=defaults.discount_rate, help="mis. 0.10")
+    parser.add_argument('--horizon', type=int, help="Jumlah tahun proyeksi (default: period terpanjang)")
+    parser.add_argument('--dry-run', action='store_true', help="Hitung dan tampilkan tanpa menyimpan")
+    args = parser.parse_args()
+
+    assumptions = ProjectionAssumptions(
+        carbon_price=args.carbon_price,
+        sequestration_per_ha=args.sequestration_per_ha,
+        investment_per_ha=args.investment_per_ha,
+        operating_cost_per_ha=args.operating_cost_per_ha,
+        discount_rate=args.discount_rate,
+    )
+
+    print("📈 INVESTOR PROJECTION: SEQUESTRATION, CASHFLOW, NPV, IRR")
+    print("=" * 60)
+
+    try:
+        schema = db.get_snapshot()
+    except db.ConfigError as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Failed to connect to database: {e}")
+        sys.exit(1)
+
+    missing = [f"{table}.{column}" for table, columns in REQUIRED_COLUMNS.items()
+               for column in schema.missing_columns(table, columns)]
+    if missing:
+        print(f"❌ ERROR: Kolom/tabel tidak ditemukan: {', '.join(missing)}")
+        print("   💡 Jalankan migration 202610171000_create_investor_projection_tables.sql terlebih dahulu")
+        print("   (atau refresh schema snapshot: python -m sisinfops_db snapshot)")
+        sys.exit(1)
+
+    print(f"   Harga karbon: Rp {assumptions.carbon_price:,.0f}/ton")
+    print(f"   Discount rate: {assumptions.discount_rate:.2%}")
+    print(f"   Investasi: Rp {assumptions.investment_per_ha:,.0f}/ha, "
+          f"operasional: Rp {assumptions.operating_cost_per_ha:,.0f}/ha/tahun")
+
+    # Satu SELECT, satu pass NumPy, lalu DELETE + COPY + upsert summary dalam satu transaksi
+    try:
+        with db.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(SELECT_SQL, (PROJECT_PERIOD_YEARS,))
+            names = [d[0] for d in cur.description]
+            projects = [dict(zip(names, record)) for record in cur.fetchall()]
+
+            started = time.perf_counter()
+            projected, skipped, projection = project_rows(projects, assumptions, args.horizon)
+            elapsed = time.perf_counter() - started
+
+            yearly = 0
+            if not args.dry_run:
+                yearly = write_projection(cur, projected, projection, assumptions)
+            cur.close()
+    except Exception as e:
+        print(f"❌ Failed to update projections: {str(e)[:200]}")
+        sys.exit(1)
+
+    print(f"\n📊 Found {len(projects)} carbon projects")
+    print(f"   ⏱️  Proyeksi {len(projected)} project × {len(projection.years)} tahun: {elapsed * 1000:.1f} ms")
+
+    print("\n📋 PROJECTIONS:")
+    print("-" * 60)
+    for i, project in enumerate(projected[:20]):
+        irr = projection.irr[i]
+        payback = projection.payback_years[i]
+        print(f"\n🔹 {project['project_name']} ({project['project_code']})")
+        print(f"   Periode: {projection.calendar_year[i, 0]} + {projection.period_years[i]} tahun")
+        print(f"   🌳 Sequestration: {projection.sequestration[i].sum():,.0f} ton")
+        print(f"   💰 NPV: Rp {projection.npv[i]:,.0f}")
+        print(f"   📈 IRR: {'-' if irr != irr else f'{irr:.1%}'}")
+        print(f"   ⏳ Payback: {'-' if payback < 0 else f'{payback} tahun'}")
+    if len(projected) > 20:
+        print(f"\n   ... dan {len(projected) - 20} project lainnya")
+
+    for project in skipped:
+        print(f"\n⚠️  Skipping {project.get('project_code', 'Unknown')}: tidak ada luas_total_ha / estimated_credits")
+
+    print(f"\n📊 SUMMARY:")
+    print(f"   ✅ Projected: {len(projected)} projects")
+    print(f"   ⚠️  Skipped: {len(skipped)} projects")
+
+    if args.dry_run:
+        print("\n⏭️  DRY RUN: nothing was written")
+        return
+
+    print(f"   💾 Saved: {yearly:,} yearly rows, {len(projected)} summaries")
+    print("\n✅ INVESTOR PROJECTION UPDATE COMPLETE!")
+    print("   Dashboard: v_investor_projection / investor_projection_yearly")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Script untuk menjalankan simulasi Monte Carlo model finansial semua carbon
+project dan menyimpan pita P10/P50/P90 untuk dashboard investor.
+Migration: supabase/migrations/202610171100_create_investor_scenario_results.sql
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import sisinfops_db as db
+from investor_engine import PROJECT_PERIOD_YEARS
+from investor_projection import SELECT_SQL, ProjectionAssumptions
+from investor_scenarios import (DEFAULT_SIMULATIONS, PRICE_LIST_SQL, RESULT_COLUMNS, ScenarioDistributions,
+                                price_list_multipliers, run_scenarios, write_results)
+
+def format_band(band, fmt):
+    if band['p50'] is None:
+        return '-'
+    return f"{fmt(band['p10'])} / {fmt(band['p50'])} / {fmt(band['p90'])}"
+
+def main():
+    defaults = ScenarioDistributions()
+    parser = argparse.ArgumentParser(description="Simulasi Monte Carlo model finansial carbon project")
+    parser.add_argument('--simulations', type=int, default=DEFAULT_SIMULATIONS, help="Skenario per project")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Jumlah proses (default: jumlah CPU)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed agar hasil bisa diulang")
+    parser.add_argument('--carbon-price', type=float, nargs=3, default=defaults.carbon_price,
+                        metavar=('LOW', 'MODE', 'HIGH'), help="Rp per ton CO2e, triangular")
+    parser.add_argument('--sequestration-sd', type=float, default=defaults.sequestration_factor[1],
+                        help="Simpangan baku faktor sequestration (mean 1.0)")
+    parser.add_argument('--cost-overrun', type=float, nargs=3, default=defaults.cost_overrun,
+                        metavar=('LOW', 'MODE', 'HIGH'), help="Fraksi cost overrun, triangular")
+    parser.add_argument('--dry-run', action='store_true', help="Simulasikan tanpa menyimpan")
+    args = parser.parse_args()
+
+    print("🎲 MONTE CARLO SCENARIOS FOR INVESTOR FINANCIAL MODEL")
+    print("=" * 60)
+
+    try:
+        missing = db.get_snapshot().missing_columns('investor_scenario_results', RESULT_COLUMNS)
+    except db.ConfigError as e:
+        print(f"❌ ERROR: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Failed to connect to database: {e}")
+        sys.exit(1)
+
+    if missing and not args.dry_run:
+        print(f"❌ ERROR: Kolom/tabel tidak ditemukan: investor_scenario_results ({', '.join(missing)})")
+        print("   💡 Jalankan migration 202610171100_create_investor_scenario_results.sql terlebih dahulu")
+        print("   (atau refresh schema snapshot: python -m sisinfops_db snapshot)")
+        sys.exit(1)
+
+    try:
+        projects = db.fetch_all(SELECT_SQL, (PROJECT_PERIOD_YEARS,))
+        price_list = [(row['category'], row['unit_price']) for row in db.fetch_all(PRICE_LIST_SQL)]
+    except Exception as e:
+        print(f"❌ Failed to read projects / price_list: {str(e)[:200]}")
+        sys.exit(1)
+
+    distributions = ScenarioDistributions(
+        carbon_price=tuple(args.carbon_price),
+        sequestration_factor=(1.0, args.sequestration_sd),
+        cost_overrun=tuple(args.cost_overrun),
+        unit_cost_multipliers=price_list_multipliers(price_list),
+    )
+    print(f"📊 Found {len(projects)} carbon projects, {len(price_list)} price_list items")
+    print(f"   Harga karbon (triangular): Rp {distributions.carbon_price[0]:,.0f} / "
+          f"{distributions.carbon_price[1]:,.0f} / {distributions.carbon_price[2]:,.0f}")
+    print(f"   Skenario: {args.simulations:,} per project, {args.workers} worker")
+
+    started = time.perf_counter()
+    results = run_scenarios(projects, args.simulations, args.seed, ProjectionAssumptions(), distributions,
+                            workers=args.workers)
+    elapsed = time.perf_counter() - started
+    print(f"   ⏱️  {len(results)} project × {args.simulations:,} skenario: {elapsed:.2f} s")
+
+    print("\n📋 P10 / P50 / P90:")
+    print("-" * 60)
+    for result in results[:20]:
+        project, bands = result['project'], result['bands']
+        print(f"\n🔹 {project['project_name']} ({project['project_code']})")
+        print(f"   💰 NPV (Rp juta): {format_band(bands['npv'], lambda v: f'{v / 1e6:,.0f}')}")
+        print(f"   📈 IRR: {format_band(bands['irr_percentage'], lambda v: f'{v:.1f}%')}")
+        print(f"   🌳 Sequestration (ton): {format_band(bands['total_sequestration_ton'], lambda v: f'{v:,.0f}')}")
+        if bands['npv']['prob_negative']:
+            print(f"   ⚠️  Peluang NPV negatif: {bands['npv']['prob_negative']:.1%}")
+    if len(results) > 20:
+        print(f"\n   ... dan {len(results) - 20} project lainnya")
+
+    skipped = len(projects) - len(results)
+    if skipped:
+        print(f"\n⚠️  Skipped: {skipped} projects tanpa luas_total_ha / estimated_credits")
+
+    if args.dry_run:
+        print("\n⏭️  DRY RUN: nothing was written")
+        return
+
+    try:
+        with db.cursor() as cur:
+            written = write_results(cur, results, args.simulations, distributions)
+    except Exception as e:
+        print(f"❌ Failed to save scenario results: {str(e)[:200]}")
+        sys.exit(1)
+
+    print(f"\n💾 Saved: {written} percentile bands")
+    print("\n✅ MONTE CARLO SCENARIOS COMPLETE!")
+    print("   Dashboard: v_investor_scenario_bands / investor_scenario_results")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Async SQL Execution Engine for Supabase SQL Runner
+asyncpg backend with the same ExecutionResult/StatementResult API as
+executor.SQLExecutor, for running independent read-only checks and exports
+concurrently over a connection pool
+"""
+import asyncio
+import json
+import time
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import asyncpg
+except ImportError:  # optional, only needed for --backend async
+    asyncpg = None
+
+from config import SupabaseConfig
+from executor import (DEFAULT_ITERSIZE, ExecutionResult, StatementResult, can_declare_cursor, console,
+                      get_query_type)
+
+DEFAULT_POOL_SIZE = 4
+
+
+def asyncpg_connect_kwargs(params: dict) -> dict:
+    """Translate psycopg2 connection parameters to asyncpg keyword arguments"""
+    kwargs = {}
+    if params.get("dsn"):
+        kwargs["dsn"] = params["dsn"]
+    for key in ("host", "port", "database", "user", "password"):
+        if params.get(key) is not None:
+            kwargs[key] = params[key]
+    if params.get("sslmode"):
+        # asyncpg accepts the libpq sslmode names
+        kwargs["ssl"] = params["sslmode"]
+    return kwargs
+
+
+async def _init_connection(conn):
+    """Decode json/jsonb to Python objects, as psycopg2 does"""
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(type_name, encoder=json.dumps, decoder=json.loads,
+                                  schema="pg_catalog")
+
+
+def _command_row_count(status: str) -> Optional[int]:
+    """Row count from a command tag such as 'INSERT 0 5' or 'UPDATE 3'"""
+    last = status.rsplit(" ", 1)[-1] if status else ""
+    return int(last) if last.isdigit() else None
+
+
+class AsyncSQLExecutor:
+    """
+    asyncpg-backed executor
+    Every statement borrows a pooled connection and runs in its own
+    transaction, read-only by default, so statements given to
+    execute_queries() must not depend on each other.
+    """
+
+    def __init__(self, config: SupabaseConfig, pool_size: int = DEFAULT_POOL_SIZE,
+                 readonly: bool = True):
+        self.config = config
+        self.pool_size = pool_size
+        self.readonly = readonly
+        self.pool = None
+
+    async def connect(self):
+        """Open the connection pool"""
+        if asyncpg is None:
+            raise RuntimeError("The async backend requires asyncpg: pip install asyncpg")
+
+        console.print(f"🔌 Connecting to [bold cyan]{self.config.database_host}[/bold cyan] "
+                      f"(async, {self.pool_size} connection(s))...")
+        kwargs = asyncpg_connect_kwargs(self.config.get_direct_connection_params())
+        if self.config.transaction_pooled:
+            # asyncpg caches named prepared statements per connection; behind a
+            # transaction pooler they may not exist on the next server connection
+            kwargs["statement_cache_size"] = 0
+        try:
+            self.pool = await asyncpg.create_pool(
+                min_size=self.pool_size, max_size=self.pool_size, init=_init_connection,
+                **kwargs,
+            )
+        except (OSError, asyncpg.PostgresError) as e:
+            console.print(f"[red]❌ Database connection failed: {e}[/red]")
+            raise
+        console.print("✅ Connected to PostgreSQL")
+
+    async def close(self):
+        """Close all pooled connections"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+            console.print("[dim]Database connection closed[/dim]")
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _set_error(self, result: ExecutionResult, e: Exception):
+        """Fill error message and position from an asyncpg error"""
+        result.success = False
+        result.error = str(e)
+        position = getattr(e, "position", None)
+        if position and str(position).isdigit():
+            result.error_position = int(position)
+
+    async def execute_sql(self, sql: str) -> ExecutionResult:
+        """Execute a single SQL statement on a pooled connection"""
+        query_type = get_query_type(sql)
+        result = ExecutionResult(success=False, execution_time=0, query_type=query_type)
+
+        async with self.pool.acquire() as conn:
+            start_time = time.time()
+            try:
+                async with conn.transaction(readonly=self.readonly):
+                    if query_type in ("SELECT", "WITH"):
+                        rows = await conn.fetch(sql)
+                        result.row_count = len(rows)
+                        result.message = f"Returned {result.row_count} row(s)"
+                    else:
+                        status = await conn.execute(sql)
+                        if query_type in ("INSERT", "UPDATE", "DELETE", "CREATE", "ALTER", "DROP"):
+                            result.affected_rows = _command_row_count(status)
+                            result.message = f"Affected {result.affected_rows} row(s)"
+                        else:
+                            result.message = "Query executed successfully"
+                result.success = True
+            except (asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                self._set_error(result, e)
+            result.execution_time = time.time() - start_time
+        return result
+
+    async def stream_query(self, sql: str, out_path: Optional[str] = None,
+                           fmt: Optional[str] = None,
+                           itersize: int = DEFAULT_ITERSIZE) -> ExecutionResult:
+        """
+        Run a SELECT through a server-side cursor
+        Same behaviour as SQLExecutor.stream_query: rows are fetched itersize
+        at a time and written to out_path when given.
+        """
+        from export import detect_format, open_result_writer
+
+        result = ExecutionResult(success=False, execution_time=0,
+                                 query_type=get_query_type(sql))
+        if out_path:
+            fmt = detect_format(out_path, fmt)
+
+        writer = None
+        row_count = 0
+        async with self.pool.acquire() as conn:
+            start_time = time.time()
+            try:
+                async with conn.transaction(readonly=self.readonly):
+                    statement = await conn.prepare(sql.strip().rstrip(";"))
+                    if out_path:
+                        attributes = statement.get_attributes()
+                        writer = open_result_writer(
+                            out_path, fmt,
+                            [a.name for a in attributes],
+                            [a.type.oid for a in attributes],
+                        )
+                    cur = await statement.cursor()
+                    while True:
+                        rows = await cur.fetch(itersize)
+                        if not rows:
+                            break
+                        if writer is not None:
+                            writer.write_rows([tuple(row) for row in rows])
+                        row_count += len(rows)
+
+                result.success = True
+                result.row_count = row_count
+                result.message = (f"Exported {row_count} row(s) to {out_path} ({fmt})"
+                                  if out_path else f"Returned {row_count} row(s)")
+            except (asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                self._set_error(result, e)
+            finally:
+                if writer is not None:
+                    writer.close()
+            result.execution_time = time.time() - start_time
+        return result
+
+    async def execute_queries(self, queries: Sequence[str],
+                              out_paths: Optional[Sequence[Optional[str]]] = None,
+                              fmt: Optional[str] = None,
+                              itersize: int = DEFAULT_ITERSIZE) -> List[StatementResult]:
+        """
+        Run independent queries concurrently, at most pool_size at a time
+        Plain reads, WITH queries included, and queries with an out path are
+        streamed like `query`;
+        results come back in the order of the queries.
+        """
+        out_paths = list(out_paths or [None] * len(queries))
+
+        async def run_one(sql: str, out_path: Optional[str]) -> ExecutionResult:
+            if out_path or can_declare_cursor(sql):
+                return await self.stream_query(sql, out_path=out_path, fmt=fmt, itersize=itersize)
+            return await self.execute_sql(sql)
+
+        results = await asyncio.gather(*(run_one(sql, out) for sql, out in zip(queries, out_paths)))
+        return [StatementResult(statement=sql, result=result, line_number=1)
+                for sql, result in zip(queries, results)]
+
+    async def execute_statements(self, statements: Sequence[Tuple[str, int]]) -> List[StatementResult]:
+        """execute_sql for (statement, line) pairs, concurrently"""
+        results = await asyncio.gather(*(self.execute_sql(sql) for sql, _ in statements))
+        return [StatementResult(statement=sql, result=result, line_number=line)
+                for (sql, line), result in zip(statements, results)]
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Sync vs async backend benchmark for the Supabase SQL Runner
+Runs the same read-only statement workload through SQLExecutor (psycopg2,
+one connection, sequential) and AsyncSQLExecutor (asyncpg pool, concurrent)
+and compares wall time and results
+"""
+import asyncio
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from config import SupabaseConfig, get_config
+
+console = Console()
+
+# Independent read-only checks of the kind run against the project database
+DEFAULT_WORKLOAD = [
+    "SELECT count(*) FROM information_schema.tables",
+    "SELECT table_name, column_name, data_type FROM information_schema.columns WHERE table_schema = 'public'",
+    "SELECT schemaname, tablename, rowsecurity FROM pg_tables WHERE schemaname = 'public'",
+    "SELECT n.nspname, p.proname FROM pg_proc p JOIN pg_namespace n ON n.oid = p.pronamespace WHERE p.prosecdef",
+    "SELECT schemaname, viewname FROM pg_views WHERE schemaname NOT IN ('pg_catalog', 'information_schema')",
+    "SELECT conrelid::regclass, conname, contype FROM pg_constraint WHERE connamespace = 'public'::regnamespace",
+    "SELECT indexrelid::regclass, indrelid::regclass FROM pg_index WHERE NOT indisvalid",
+    "SELECT count(*) FROM pg_stat_activity",
+]
+
+
+@dataclass
+class BackendRun:
+    """Timings and per-statement outcomes of one backend"""
+    backend: str
+    connect_s: float
+    times_s: List[float] = field(default_factory=list)
+    outcomes: List[Tuple[bool, Optional[int]]] = field(default_factory=list)  # (success, row_count)
+
+    @property
+    def median_s(self) -> float:
+        return statistics.median(self.times_s)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for success, _ in self.outcomes if not success)
+
+
+def load_workload(sql_file: Optional[str], repeat: int) -> List[Tuple[str, int]]:
+    """(statement, line) pairs: the statements of sql_file or the default checks, repeated"""
+    if sql_file:
+        from splitter import iter_file_statements
+        statements = list(iter_file_statements(sql_file))
+    else:
+        statements = [(sql, i + 1) for i, sql in enumerate(DEFAULT_WORKLOAD)]
+    return statements * repeat
+
+
+def run_sync(config: SupabaseConfig, statements: List[Tuple[str, int]], runs: int) -> BackendRun:
+    """Sequential execute_sql on one psycopg2 connection"""
+    from executor import SQLExecutor
+
+    start = time.perf_counter()
+    with SQLExecutor(config, check_version=False) as executor:
+        run = BackendRun(backend="sync (psycopg2)", connect_s=time.perf_counter() - start)
+        for _ in range(runs):
+            start = time.perf_counter()
+            results = [executor.execute_sql(sql) for sql, _ in statements]
+            run.times_s.append(time.perf_counter() - start)
+        run.outcomes = [(r.success, r.row_count) for r in results]
+    return run
+
+
+def run_async(config: SupabaseConfig, statements: List[Tuple[str, int]], runs: int,
+              jobs: int) -> BackendRun:
+    """Concurrent execute_sql over an asyncpg pool of `jobs` connections"""
+    from async_executor import AsyncSQLExecutor
+
+    async def main():
+        start = time.perf_counter()
+        async with AsyncSQLExecutor(config, pool_size=jobs) as executor:
+            run = BackendRun(backend=f"async (asyncpg, {jobs} conn)",
+                             connect_s=time.perf_counter() - start)
+            for _ in range(runs):
+                start = time.perf_counter()
+                results = await executor.execute_statements(statements)
+                run.times_s.append(time.perf_counter() - start)
+            run.outcomes = [(r.result.success, r.result.row_count) for r in results]
+        return run
+
+    return asyncio.run(main())
+
+
+def display_runs(runs: List[BackendRun], statement_count: int):
+    """Print a comparison table, the sync backend being the reference"""
+    reference = runs[0].median_s
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Backend", style="cyan")
+    table.add_column("Connect", justify="right")
+    table.add_column("Median", justify="right")
+    table.add_column("Min", justify="right")
+    table.add_column("Statements/s", justify="right")
+    table.add_column("Speedup", justify="right")
+    table.add_column("Failed", justify="right")
+    for run in runs:
+        table.add_row(
+            run.backend,
+            f"{run.connect_s * 1000:.0f} ms",
+            f"{run.median_s * 1000:.0f} ms",
+            f"{min(run.times_s) * 1000:.0f} ms",
+            f"{statement_count / run.median_s:,.0f}",
+            f"{reference / run.median_s:.2f}x",
+            str(run.failed),
+        )
+    console.print(table)
+
+
+@click.command()
+@click.option('--dsn', envvar='SQL_RUNNER_BENCH_DSN',
+              help='libpq URI of the database to benchmark (default: the Supabase config), '
+                   'e.g. postgresql://postgres@localhost/postgres')
+@click.option('--file', 'sql_file', type=click.Path(exists=True, dir_okay=False),
+              help='Use the statements of this SQL file as the workload (must be read-only)')
+@click.option('--repeat', type=click.IntRange(min=1), default=10, show_default=True,
+              help='Times the workload is repeated per run')
+@click.option('--runs', '-n', type=click.IntRange(min=1), default=3, show_default=True,
+              help='Timed runs per backend')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Connections in the async pool')
+def main(dsn, sql_file, repeat, runs, jobs):
+    """Benchmark the sync and async executor backends on the same workload"""
+    console.print("[bold green]⏱️  SQL Runner Backend Benchmark[/bold green]")
+
+    if dsn:
+        config = SupabaseConfig(project_ref="local", supabase_url="", service_role_key="",
+                                database_host=dsn.split("@")[-1], source="dsn", dsn=dsn)
+    else:
+        config = get_config()
+        if not config:
+            console.print("[red]❌ Failed to load configuration[/red]")
+            sys.exit(1)
+
+    statements = load_workload(sql_file, repeat)
+    console.print(f"   Workload: {len(statements)} statement(s), {runs} run(s) per backend\n")
+
+    results = [
+        run_sync(config, statements, runs),
+        run_async(config, statements, runs, jobs),
+    ]
+    console.print()
+    display_runs(results, len(statements))
+
+    if results[0].outcomes != results[1].outcomes:
+        console.print("\n[bold red]❌ Backends returned different results[/bold red]")
+        for i, (sync, async_) in enumerate(zip(results[0].outcomes, results[1].outcomes)):
+            if sync != async_:
+                console.print(f"   {statements[i][0][:80]}: sync {sync}, async {async_}")
+        sys.exit(1)
+    console.print("\n[bold green]✅ Both backends returned the same results[/bold green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the Supabase SQL Runner CLI
+Times `run.py --help` and `run.py migrations` in fresh interpreters against a
+fixed budget and uses `python -X importtime` to report (and guard against)
+heavy modules loaded at startup. Heavy imports always fail the benchmark;
+going over budget fails it with --strict (or SQL_RUNNER_STARTUP_BUDGET_STRICT=1,
+for CI) and is a warning otherwise.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+RUNNER_DIR = os.path.dirname(os.path.abspath(__file__))
+RUN_PY = os.path.join(RUNNER_DIR, "run.py")
+PROJECT_ROOT = os.path.abspath(os.path.join(RUNNER_DIR, "..", ".."))
+MIGRATIONS_DIR = os.path.join(PROJECT_ROOT, "supabase", "migrations")
+
+
+@dataclass
+class StartupCase:
+    """A CLI invocation with its time budget and modules it must not import"""
+    name: str
+    args: List[str]
+    budget_ms: float
+    forbidden: List[str]
+
+
+CASES = [
+    StartupCase(
+        name="help",
+        args=["--help"],
+        budget_ms=250,
+        forbidden=["psycopg2", "executor", "async_executor", "asyncpg", "requests", "rich"],
+    ),
+    StartupCase(
+        name="migrations",
+        args=["migrations", MIGRATIONS_DIR],
+        budget_ms=400,
+        forbidden=["psycopg2", "executor", "async_executor", "asyncpg", "requests",
+                   "rich.syntax", "rich.live"],
+    ),
+]
+
+
+@dataclass
+class StartupResult:
+    """Timings and import profile of one case"""
+    case: StartupCase
+    times_ms: List[float]
+    imports: Dict[str, float] = field(default_factory=dict)  # module -> cumulative us
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.times_ms)
+
+    @property
+    def forbidden_imported(self) -> List[str]:
+        return sorted(
+            m for m in self.imports
+            if any(m == f or m.startswith(f + ".") for f in self.case.forbidden)
+        )
+
+    @property
+    def within_budget(self) -> bool:
+        return self.median_ms <= self.case.budget_ms
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Parse `-X importtime` output into module -> cumulative microseconds"""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            imports[name.strip()] = float(cumulative)
+        except ValueError:
+            continue  # header line
+    return imports
+
+
+def run_case(case: StartupCase, runs: int) -> StartupResult:
+    """Time a case over several fresh interpreters, then profile its imports once"""
+    command = [sys.executable, RUN_PY] + case.args
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True)
+        times.append((time.perf_counter() - start) * 1000)
+
+    profile = subprocess.run(
+        [sys.executable, "-X", "importtime", RUN_PY] + case.args,
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+    )
+    return StartupResult(case=case, times_ms=times, imports=parse_importtime(profile.stderr))
+
+
+def compare_with_baseline(result: StartupResult, baseline: dict) -> List[str]:
+    """Describe modules added since the baseline and the timing change"""
+    entry = baseline.get(result.case.name)
+    if not entry:
+        return []
+    notes = []
+    added = sorted(set(result.imports) - set(entry.get("modules", [])))
+    top_level_added = [m for m in added if "." not in m]
+    if top_level_added:
+        notes.append(f"new top-level imports: {', '.join(top_level_added)}")
+    previous = entry.get("median_ms")
+    if previous:
+        notes.append(f"median {previous:.0f} ms -> {result.median_ms:.0f} ms")
+    return notes
+
+
+def display_result(result: StartupResult, top: int, baseline: Optional[dict]):
+    """Print timing, budget verdict and the slowest imports for a case"""
+    status = "[green]✅ OK[/green]" if result.within_budget else "[yellow]⚠️  OVER BUDGET[/yellow]"
+    console.print(f"\n[bold]run.py {' '.join(result.case.args[:1])}[/bold]  {status}")
+    console.print(f"   Median: {result.median_ms:.0f} ms  (budget {result.case.budget_ms:.0f} ms, "
+                  f"min {min(result.times_ms):.0f} ms, {len(result.times_ms)} runs)")
+
+    forbidden = result.forbidden_imported
+    if forbidden:
+        console.print(f"   [red]❌ Heavy modules imported at startup: {', '.join(forbidden)}[/red]")
+
+    if baseline is not None:
+        for note in compare_with_baseline(result, baseline):
+            console.print(f"   [yellow]Δ {note}[/yellow]")
+
+    table = Table(show_header=True, header_style="bold", box=None)
+    table.add_column("Module", style="cyan")
+    table.add_column("Cumulative", justify="right")
+    slowest = sorted(result.imports.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    for name, cumulative in slowest:
+        table.add_row(name, f"{cumulative / 1000:.1f} ms")
+    console.print(table)
+
+
+@click.command()
+@click.option('--runs', '-n', type=click.IntRange(min=1), default=5, show_default=True,
+              help='Fresh interpreter runs per command')
+@click.option('--top', type=click.IntRange(min=1), default=10, show_default=True,
+              help='Slowest imports to show per command')
+@click.option('--baseline', type=click.Path(dir_okay=False),
+              help='Compare against a baseline saved with --save-baseline')
+@click.option('--save-baseline', type=click.Path(dir_okay=False),
+              help='Write timings and imported modules to this JSON file')
+@click.option('--strict', is_flag=True, envvar='SQL_RUNNER_STARTUP_BUDGET_STRICT',
+              help='Fail when a command is over its time budget')
+def main(runs, top, baseline, save_baseline, strict):
+    """Benchmark sql_runner CLI startup time"""
+    console.print("[bold green]⏱️  SQL Runner Startup Benchmark[/bold green]")
+
+    baseline_data = None
+    if baseline and os.path.exists(baseline):
+        with open(baseline, 'r') as f:
+            baseline_data = json.load(f)
+
+    results = [run_case(case, runs) for case in CASES]
+    for result in results:
+        display_result(result, top, baseline_data)
+
+    if save_baseline:
+        with open(save_baseline, 'w') as f:
+            json.dump({
+                r.case.name: {"median_ms": r.median_ms, "modules": sorted(r.imports)}
+                for r in results
+            }, f, indent=2)
+        console.print(f"\n💾 Baseline saved to [cyan]{save_baseline}[/cyan]")
+
+    over_budget = [r.case.name for r in results if not r.within_budget]
+    if over_budget and not strict:
+        console.print(f"\n[yellow]⚠️  Over budget on this machine: {', '.join(over_budget)}[/yellow]")
+    failed = [r for r in results if r.forbidden_imported or (strict and not r.within_budget)]
+    if failed:
+        console.print(f"\n[bold red]❌ {len(failed)} startup check(s) failed[/bold red]")
+        sys.exit(1)
+    console.print("\n[bold green]✅ Startup checks passed[/bold green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Checkpoints for Supabase SQL Runner
+Remember how many statements of a file were committed so `run --resume` can
+skip them after a failure instead of re-running the whole file
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Iterable, Iterator, Optional, Tuple
+
+CHECKPOINT_DIR = os.environ.get(
+    "SQL_RUNNER_CHECKPOINT_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "sisinfops", "sql_runner_checkpoints"),
+)
+
+# The checkpoint file is a log with one JSON state per line, appended after
+# every statement and rewritten (atomically) to a single line this often
+COMPACT_EVERY = 1000
+
+
+class CheckpointMismatch(Exception):
+    """The statements a checkpoint marks as committed are not in the file any more"""
+
+
+def _statement_digest_update(digest, statement: str):
+    digest.update(statement.encode("utf-8"))
+    digest.update(b"\0")
+
+
+class FileCheckpoint:
+    """
+    Progress of one SQL file against one database
+    Stores the file checksum, the number of statements committed from the
+    start of the file and a digest of those statements. Resuming checks the
+    digest rather than the file checksum, so statements after the failure
+    (typically the failing one itself) may be edited before resuming.
+    """
+
+    def __init__(self, file_path: str, scope: str = "", directory: Optional[str] = None):
+        self.file_path = os.path.abspath(file_path)
+        self.scope = scope  # project ref, so a checkpoint never applies to another database
+        self.directory = directory or CHECKPOINT_DIR
+        self.completed = 0
+        self.skipped = 0
+        self.total: Optional[int] = None  # statements in the file, once all were read
+        self.failed_line: Optional[int] = None
+        self.error: Optional[str] = None
+        self._digest = hashlib.sha256()
+        self._file_checksum: Optional[str] = None
+        self._log = None
+        self._log_lines = 0
+
+    @property
+    def path(self) -> str:
+        key = hashlib.sha1(f"{self.scope}:{self.file_path}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self) -> Optional[dict]:
+        """Saved checkpoint for this file, if any"""
+        try:
+            with open(self.path, "r") as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+        for line in reversed(lines):
+            try:
+                data = json.loads(line)
+                break
+            except ValueError:
+                continue  # partly written last line
+        else:
+            return None
+        if data.get("file_path") != self.file_path or data.get("scope") != self.scope:
+            return None
+        return data
+
+    def file_changed(self, saved: dict) -> bool:
+        return saved.get("file_checksum") != self._checksum()
+
+    def _checksum(self) -> str:
+        if self._file_checksum is None:
+            from ledger import file_checksum
+            self._file_checksum = file_checksum(self.file_path)
+        return self._file_checksum
+
+    def resume(self, statements: Iterable[Tuple[str, int]],
+               saved: Optional[dict]) -> Iterator[Tuple[str, int]]:
+        """
+        Skip the statements a saved checkpoint marks as committed
+        Raises CheckpointMismatch, before anything is yielded, when those
+        statements differ from the ones in the file.
+        """
+        skip = saved["completed"] if saved else 0
+        count = 0
+        for stmt, line_num in statements:
+            count += 1
+            if count <= skip:
+                _statement_digest_update(self._digest, stmt)
+                continue
+            if count == skip + 1 and skip:
+                self._verify(saved)
+            yield stmt, line_num
+        self.total = count
+        if skip and count <= skip:
+            if count < skip:
+                raise CheckpointMismatch(
+                    f"checkpoint covers {skip} statement(s) but the file has {count}"
+                )
+            self._verify(saved)
+
+    @property
+    def complete(self) -> bool:
+        """Every statement of the file is committed"""
+        return self.total is not None and self.completed == self.total
+
+    def _verify(self, saved: dict):
+        if self._digest.hexdigest() != saved.get("prefix_checksum"):
+            raise CheckpointMismatch(
+                f"the first {saved['completed']} statement(s) changed since the checkpoint"
+            )
+        self.completed = self.skipped = saved["completed"]
+
+    def record(self, statement: str, success: bool, line_number: int,
+               error: Optional[str] = None):
+        """
+        Note the outcome of the next statement, in file order
+        Only an unbroken run of successes from the start advances the
+        checkpoint. It is appended to the log after every statement, so after
+        a crash at most the statement that was committing is not recorded.
+        """
+        if self.failed_line is not None:
+            return
+        if success:
+            _statement_digest_update(self._digest, statement)
+            self.completed += 1
+        else:
+            self.failed_line = line_number
+            self.error = error
+        self.save()
+
+    def save(self):
+        data = {
+            "file_path": self.file_path,
+            "scope": self.scope,
+            "file_checksum": self._checksum(),
+            "completed": self.completed,
+            "prefix_checksum": self._digest.hexdigest(),
+            "failed_line": self.failed_line,
+            "error": self.error,
+            "updated_at": time.time(),
+        }
+        line = json.dumps(data) + "\n"
+        try:
+            if self._log is None or self._log_lines >= COMPACT_EVERY:
+                self._rewrite(line)
+            else:
+                self._log.write(line)
+                self._log.flush()
+                self._log_lines += 1
+        except OSError as e:
+            print(f"⚠️  Could not write checkpoint: {e}")
+
+    def _rewrite(self, line: str):
+        """Replace the log with a single state line and keep appending to it"""
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(line)
+        os.replace(tmp_path, self.path)
+        self._log = open(self.path, "a")
+        self._log_lines = 1
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def clear(self):
+        """Forget the checkpoint (the whole file was applied)"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -2,13 +2,34 @@
 Configuration loader for Supabase SQL Runner
 Loads environment variables and builds database connection configuration
 """
+import json
 import os
 import re
+import time
 from dataclasses import dataclass
-from typing import Optional
-from urllib.parse import urlparse
+from typing import Optional, Tuple
+from urllib.parse import quote, urlparse
 
-import requests
+# Resolved connection parameters are cached on disk, keyed by project ref,
+# so subcommands do not wait on the Management API on every invocation
+CACHE_PATH = os.environ.get(
+    "SQL_RUNNER_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "sisinfops", "sql_runner_connection.json"),
+)
+CACHE_TTL = int(os.environ.get("SQL_RUNNER_CACHE_TTL", 24 * 60 * 60))
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Target (connection profile) that maps to .env.local
+DEFAULT_TARGET = "default"
+
+# How to reach the database: a direct backend connection, or through the
+# Supabase pooler holding a server connection per client session or only
+# per transaction. Set with SQL_RUNNER_CONNECTION_MODE (environment or env
+# file) or the --mode option.
+CONNECTION_MODES = ("direct", "session", "transaction")
+DEFAULT_CONNECTION_MODE = "direct"
+MODE_PORTS = {"direct": 5432, "session": 5432, "transaction": 6543}
 
 
 @dataclass
@@ -21,43 +42,92 @@ class SupabaseConfig:
     database_password: Optional[str] = None
     database_user: str = "postgres"
     database_name: str = "postgres"
-    database_port: int = 6543
+    database_port: Optional[int] = None  # overrides the port of the connection mode
     region: Optional[str] = None
+    source: Optional[str] = None  # "cache", "api", "manual" or "dsn"
+    cached_at: Optional[float] = None
+    target: Optional[str] = None  # connection profile name (run --targets)
+    dsn: Optional[str] = None  # direct libpq URI, e.g. a local replica
+    connection_mode: str = DEFAULT_CONNECTION_MODE
+    pooler_host: Optional[str] = None  # shared pooler, e.g. aws-0-ap-southeast-1.pooler.supabase.com
+    
+    @property
+    def transaction_pooled(self) -> bool:
+        """Consecutive transactions may run on different server connections"""
+        return self.connection_mode == "transaction"
+    
+    def endpoint(self) -> Tuple[Optional[str], int, str]:
+        """
+        Host, port and user for the connection mode
+        The shared pooler (pooler_host) serves both pooled modes and finds the
+        project from the user name, postgres.<project_ref>. Without it,
+        transaction mode uses the dedicated pooler on the database host.
+        """
+        port = self.database_port or MODE_PORTS[self.connection_mode]
+        if self.connection_mode == "direct":
+            return self.database_host, port, self.database_user
+        if self.pooler_host:
+            return self.pooler_host, port, f"{self.database_user}.{self.project_ref}"
+        if self.connection_mode == "session":
+            raise ValueError("session mode needs the shared pooler host, "
+                             "set SQL_RUNNER_POOLER_HOST (Dashboard → Connect → Session pooler)")
+        return self.database_host, port, self.database_user
     
     def get_connection_string(self) -> Optional[str]:
         """Build PostgreSQL connection string"""
+        if self.dsn:
+            return self.dsn
         if not self.database_host or not self.database_password:
             return None
         
+        host, port, user = self.endpoint()
         return (
-            f"postgresql://postgres:"
-            f"{self.database_password}@{self.database_host}:"
-            f"5432/{self.database_name}"
+            f"postgresql://{quote(user, safe='')}:"
+            f"{quote(self.database_password, safe='')}@{host}:"
+            f"{port}/{self.database_name}?sslmode=require"
         )
     
     def get_direct_connection_params(self) -> dict:
         """Get connection parameters for psycopg2"""
-        # Correct Supabase connection format
-        # User is just "postgres", not "postgres.project_ref"
-        # Port is 5432 for direct connection, 6543 for connection pooling
+        if self.dsn:
+            return {"dsn": self.dsn}
+        
+        host, port, user = self.endpoint()
         return {
-            "host": self.database_host,
-            "port": 5432,  # Direct connection port
+            "host": host,
+            "port": port,
             "database": self.database_name,
-            "user": "postgres",  # Simple postgres user
+            "user": user,
             "password": self.database_password,
             "sslmode": "require",
         }
 
 
-def load_env_config() -> Optional[SupabaseConfig]:
+def target_env_path(target: Optional[str] = None) -> str:
+    """
+    Env file of a connection profile
+    "default" (or no target) is .env.local, a path is used as is and any
+    other name maps to .env.<name> in the project root (.env.staging, ...)
+    """
+    if not target or target == DEFAULT_TARGET:
+        return os.path.join(PROJECT_ROOT, ".env.local")
+    if os.sep in target or os.path.isfile(target):
+        return target
+    return os.path.join(PROJECT_ROOT, f".env.{target}")
+
+
+def load_env_config(env_path: Optional[str] = None,
+                    target: Optional[str] = None) -> Optional[SupabaseConfig]:
     """
-    Load Supabase configuration from .env.local file
+    Load Supabase configuration from .env.local (or a target's env file)
+    An env file with SQL_RUNNER_DATABASE_URL connects to that URI directly
+    and needs no Supabase keys, e.g. for a local replica.
     """
-    env_path = os.path.join(os.path.dirname(__file__), "..", "..", ".env.local")
+    env_path = env_path or target_env_path(target)
+    env_name = os.path.basename(env_path)
     
     if not os.path.exists(env_path):
-        print(f"❌ .env.local file not found at: {env_path}")
+        print(f"❌ {env_name} file not found at: {env_path}")
         return None
     
     with open(env_path, 'r') as f:
@@ -66,6 +136,9 @@ def load_env_config() -> Optional[SupabaseConfig]:
     # Parse environment variables
     supabase_url = None
     service_role_key = None
+    database_url = None
+    connection_mode = None
+    pooler_host = None
     
     for line in content.split('\n'):
         line = line.strip()
@@ -76,6 +149,36 @@ def load_env_config() -> Optional[SupabaseConfig]:
             supabase_url = line.split('=', 1)[1].strip().strip('"\'')
         elif line.startswith('SUPABASE_SERVICE_ROLE_KEY=') and not line.startswith('SUPABASE_SERVICE_ROLE_KEY=#'):
             service_role_key = line.split('=', 1)[1].strip().strip('"\'')
+        elif line.startswith('SQL_RUNNER_DATABASE_URL='):
+            database_url = line.split('=', 1)[1].strip().strip('"\'')
+        elif line.startswith('SQL_RUNNER_CONNECTION_MODE='):
+            connection_mode = line.split('=', 1)[1].strip().strip('"\'')
+        elif line.startswith('SQL_RUNNER_POOLER_HOST='):
+            pooler_host = line.split('=', 1)[1].strip().strip('"\'')
+    
+    # The environment (and so --mode) wins over the env file
+    connection_mode = os.environ.get("SQL_RUNNER_CONNECTION_MODE") or connection_mode
+    pooler_host = os.environ.get("SQL_RUNNER_POOLER_HOST") or pooler_host
+    if connection_mode and connection_mode not in CONNECTION_MODES:
+        print(f"❌ Unknown connection mode '{connection_mode}' (use {', '.join(CONNECTION_MODES)})")
+        return None
+    
+    if database_url:
+        parsed = urlparse(database_url)
+        if not connection_mode:
+            # A URI on the pooler port is a transaction pooler
+            connection_mode = "transaction" if parsed.port == MODE_PORTS["transaction"] else "direct"
+        return SupabaseConfig(
+            project_ref=target or parsed.hostname or "local",
+            supabase_url=supabase_url or "",
+            service_role_key=service_role_key or "",
+            database_host=f"{parsed.hostname or 'localhost'}:{parsed.port or 5432}{parsed.path}",
+            database_name=parsed.path.lstrip('/') or "postgres",
+            source="dsn",
+            target=target,
+            dsn=database_url,
+            connection_mode=connection_mode,
+        )
 
     if not supabase_url or not service_role_key:
         print("❌ Missing required environment variables")
@@ -100,6 +203,9 @@ def load_env_config() -> Optional[SupabaseConfig]:
         project_ref=project_ref,
         supabase_url=supabase_url,
         service_role_key=service_role_key,
+        target=target,
+        connection_mode=connection_mode or DEFAULT_CONNECTION_MODE,
+        pooler_host=pooler_host,
     )
 
 
@@ -107,6 +213,9 @@ def fetch_database_info(config: SupabaseConfig) -> bool:
     """
     Fetch database connection info from Supabase Management API
     """
+    # Imported here so cached runs do not pay for loading requests
+    import requests
+    
     api_url = f"https://api.supabase.com/v1/projects/{config.project_ref}"
     
     headers = {
@@ -172,26 +281,107 @@ def prompt_for_connection_info(config: SupabaseConfig) -> bool:
     return True
 
 
-def get_config() -> Optional[SupabaseConfig]:
+def _read_cache() -> dict:
+    """Read the connection cache file, empty on any error"""
+    try:
+        with open(CACHE_PATH, 'r') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(data: dict):
+    """Write the connection cache file (owner read/write only, it holds a password)"""
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        tmp_path = f"{CACHE_PATH}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️  Could not write connection cache: {e}")
+
+
+def load_cached_connection(config: SupabaseConfig) -> bool:
+    """
+    Fill database host/password from the on-disk cache
+    Returns False when there is no entry for the project or it is older than CACHE_TTL
+    """
+    entry = _read_cache().get(config.project_ref)
+    if not entry:
+        return False
+    
+    cached_at = entry.get("cached_at", 0)
+    if time.time() - cached_at > CACHE_TTL:
+        return False
+    if not entry.get("database_host") or not entry.get("database_password"):
+        return False
+    
+    config.database_host = entry["database_host"]
+    config.database_password = entry["database_password"]
+    config.region = entry.get("region")
+    config.source = "cache"
+    config.cached_at = cached_at
+    return True
+
+
+def save_cached_connection(config: SupabaseConfig):
+    """Store the resolved database host/password for the project"""
+    data = _read_cache()
+    data[config.project_ref] = {
+        "database_host": config.database_host,
+        "database_password": config.database_password,
+        "region": config.region,
+        "source": config.source,
+        "cached_at": time.time(),
+    }
+    _write_cache(data)
+
+
+def invalidate_cached_connection(project_ref: str):
+    """Drop the cached entry for a project (e.g. after an authentication failure)"""
+    data = _read_cache()
+    if data.pop(project_ref, None) is not None:
+        _write_cache(data)
+
+
+def get_config(refresh: bool = False, target: Optional[str] = None) -> Optional[SupabaseConfig]:
     """
     Main function to get Supabase configuration
-    Tries automatic fetch first, falls back to manual input
+    Uses the on-disk cache unless refresh is set, then tries automatic fetch
+    first and falls back to manual input (default target only)
     """
-    # Load basic config from .env.local
-    config = load_env_config()
+    # Load basic config from .env.local or the target's env file
+    config = load_env_config(target=target)
     if not config:
         return None
     
+    if config.dsn:
+        print(f"✅ Loaded config for target: {target or DEFAULT_TARGET} ({config.database_host})")
+        return config
     print(f"✅ Loaded config for project: {config.project_ref}")
     
+    if not refresh and load_cached_connection(config):
+        return config
+    
     # Try to fetch database info automatically
     print("\n🔄 Attempting to fetch database connection info...")
     if fetch_database_info(config):
+        config.source = "api"
+        save_cached_connection(config)
         return config
     
     # Fall back to manual configuration
     print("\n⚠️  Automatic configuration failed")
+    if target and target != DEFAULT_TARGET:
+        # The manual fallback only knows the default project
+        print(f"❌ Set SQL_RUNNER_DATABASE_URL in {target_env_path(target)} to connect to '{target}'")
+        return None
     if prompt_for_connection_info(config):
+        config.source = "manual"
+        save_cached_connection(config)
         return config
     
     return None
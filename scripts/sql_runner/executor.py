@@ -2,9 +2,11 @@
 SQL Execution Engine for Supabase SQL Runner
 Handles executing SQL files and statements with proper error handling
 """
-import time
+import json
+import os
 import re
-from typing import List, Tuple, Optional, Dict, Any
+import time
+from typing import List, Tuple, Optional, Dict, Any, Iterable, Iterator, TextIO
 from dataclasses import dataclass
 from contextlib import contextmanager
 
@@ -19,7 +21,9 @@ from rich.live import Live
 from rich.spinner import Spinner
 from rich.text import Text
 
-from config import SupabaseConfig, get_config
+from checkpoint import CheckpointMismatch, FileCheckpoint
+from config import SupabaseConfig, get_config, invalidate_cached_connection
+from splitter import has_writes, iter_file_statements, split_statements, strip_leading_comments
 
 console = Console()
 
@@ -35,6 +39,8 @@ class ExecutionResult:
     error_position: Optional[int] = None
     affected_rows: Optional[int] = None
     query_type: Optional[str] = None
+    batch_size: Optional[int] = None  # set when executed as part of a batch
+    attempts: int = 1  # more than 1 when retried (see retry.RetryPolicy)
 
 
 @dataclass
@@ -55,11 +61,110 @@ class SQLError(Exception):
         super().__init__(self.message)
 
 
+OUTPUT_MODES = ("verbose", "progress", "quiet")
+
+# Rows per round trip when streaming through a server-side cursor
+DEFAULT_ITERSIZE = 2000
+_DECLARE_PREFIX = 'DECLARE "sql_runner_stream" CURSOR WITHOUT HOLD FOR '
+
+# Plain reads can be wrapped in DECLARE ... CURSOR; anything that writes
+# (INSERT ... RETURNING, data-modifying WITH, SELECT INTO) or is not a query
+# at all (SHOW, EXPLAIN) has to run on a client-side cursor
+_DECLARABLE = re.compile(r"^(?:select|values|table|with)\b", re.IGNORECASE)
+
+# Statements execute_file may group into one round trip
+BATCHABLE_QUERY_TYPES = ("INSERT", "UPDATE", "DELETE")
+
+# Statements whose effect outlives their transaction. Behind a transaction
+# pooler the next statement may run on another server connection.
+_SESSION_STATE = re.compile(
+    r"^(?:set\s+(?!local\b|transaction\b|constraints\b)|reset\b|prepare\b|listen\b|discard\b"
+    r"|create\s+(?:(?:global|local)\s+)?temp(?:orary)?\b|declare\b.*\bwith\s+hold\b)"
+    r"|\bpg_advisory_lock(?:_shared)?\s*\(",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def get_query_type(sql: str) -> str:
+    """Determine the type of SQL query"""
+    sql_upper = strip_leading_comments(sql).upper()
+    
+    if sql_upper.startswith("SELECT"):
+        return "SELECT"
+    elif sql_upper.startswith("INSERT"):
+        return "INSERT"
+    elif sql_upper.startswith("UPDATE"):
+        return "UPDATE"
+    elif sql_upper.startswith("DELETE"):
+        return "DELETE"
+    elif sql_upper.startswith("CREATE"):
+        return "CREATE"
+    elif sql_upper.startswith("ALTER"):
+        return "ALTER"
+    elif sql_upper.startswith("DROP"):
+        return "DROP"
+    elif sql_upper.startswith("WITH"):
+        return "WITH"
+    else:
+        return "OTHER"
+
+
+def can_declare_cursor(sql: str) -> bool:
+    """The statement is a plain read that a server-side cursor can stream"""
+    return bool(_DECLARABLE.match(strip_leading_comments(sql))) and not has_writes(sql)
+
+
+def uses_session_state(sql: str) -> bool:
+    """The statement leaves state on the connection (SET, PREPARE, temp tables, ...)"""
+    return bool(_SESSION_STATE.search(strip_leading_comments(sql)))
+
+
+def statement_record(file_path: str, statement_num: int,
+                     stmt_result: StatementResult) -> Dict[str, Any]:
+    """Machine-readable record of one executed statement"""
+    result = stmt_result.result
+    return {
+        "file": file_path,
+        "statement": statement_num,
+        "line": stmt_result.line_number,
+        "query_type": result.query_type,
+        "success": result.success,
+        "execution_ms": round(result.execution_time * 1000, 3),
+        "row_count": result.row_count,
+        "affected_rows": result.affected_rows,
+        "message": result.message,
+        "error": result.error,
+        "error_position": result.error_position,
+        "batch_size": result.batch_size,
+        "attempts": result.attempts,
+    }
+
+
+def write_jsonl_record(stream: TextIO, file_path: str, statement_num: int,
+                       stmt_result: StatementResult):
+    """Append one statement record to a JSON Lines stream"""
+    stream.write(json.dumps(statement_record(file_path, statement_num, stmt_result)) + "\n")
+    stream.flush()
+
+
+def _count_lines(file_path: str) -> int:
+    """Number of lines in a file, read in binary blocks"""
+    lines = 0
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+    return lines + 1
+
+
 class SQLExecutor:
     """Main SQL executor class"""
     
-    def __init__(self, config: SupabaseConfig):
+    def __init__(self, config: SupabaseConfig, check_version: bool = True,
+                 profiler=None, retry_policy=None):
         self.config = config
+        self.check_version = check_version
+        self.profiler = profiler  # profiler.Profiler, runs statements under EXPLAIN ANALYZE
+        self.retry_policy = retry_policy  # retry.RetryPolicy, retries and session timeouts
         self.connection: Optional[connection] = None
         self._connect()
     
@@ -67,21 +172,58 @@ class SQLExecutor:
         """Establish database connection"""
         try:
             conn_params = self.config.get_direct_connection_params()
-            console.print(f"🔌 Connecting to [bold cyan]{self.config.database_host}[/bold cyan]...")
+            mode = self.config.connection_mode
+            via = f" via {mode} pooler" if mode != "direct" else ""
+            console.print(f"🔌 Connecting to [bold cyan]{conn_params.get('host') or self.config.database_host}"
+                          f"[/bold cyan]{via}...")
             
             self.connection = psycopg2.connect(**conn_params)
             self.connection.autocommit = False
+            self._apply_session_settings()
+            
+            if not self.check_version:
+                console.print("✅ Connected to PostgreSQL")
+                return
             
             # Test connection
             with self.connection.cursor() as cur:
                 cur.execute("SELECT version();")
                 version = cur.fetchone()[0]
-                console.print(f"✅ Connected to PostgreSQL: [dim]{version.split(',')[0]}[/dim]")
+            # End the implicit transaction so autocommit can be switched later
+            self.connection.rollback()
+            console.print(f"✅ Connected to PostgreSQL: [dim]{version.split(',')[0]}[/dim]")
                 
         except psycopg2.Error as e:
             console.print(f"[red]❌ Database connection failed: {e}[/red]")
+            if "authentication failed" in str(e) and self.config.source == "cache":
+                # Cached credentials are stale; resolve them again next run
+                invalidate_cached_connection(self.config.project_ref)
+                console.print("[yellow]   Cached connection info cleared, run again or use 'config --refresh'[/yellow]")
             raise
     
+    def _apply_session_settings(self):
+        """SET statement_timeout / lock_timeout of the retry policy for this session"""
+        settings = self.retry_policy.session_settings() if self.retry_policy else {}
+        if not settings or self.config.transaction_pooled:
+            return  # a transaction pooler does not keep them, see _local_settings_sql
+        with self.connection.cursor() as cur:
+            for name, value in settings.items():
+                cur.execute("SELECT set_config(%s, %s, false)", (name, value))
+        self.connection.commit()
+    
+    def _local_settings_sql(self, cur: cursor) -> Optional[str]:
+        """
+        Statement that sets the policy timeouts for the current transaction
+        Only used behind a transaction pooler, where session settings would
+        apply to whichever client gets the server connection next.
+        """
+        settings = self.retry_policy.session_settings() if self.retry_policy else {}
+        if not settings or not self.config.transaction_pooled:
+            return None
+        calls = ", ".join("set_config(%s, %s, true)" for _ in settings)
+        params = [part for item in settings.items() for part in item]
+        return cur.mogrify(f"SELECT {calls};", params).decode()
+    
     @contextmanager
     def get_cursor(self):
         """Context manager for database cursor"""
@@ -97,28 +239,73 @@ class SQLExecutor:
     def execute_sql(self, sql: str, params: Optional[tuple] = None) -> ExecutionResult:
         """
         Execute a single SQL statement
+        With a retry policy, transient failures (deadlocks, serialization
+        failures, lock timeouts, dropped connections) are retried with
+        backoff when the policy deems the statement safe to run again.
         """
+        if self.config.transaction_pooled and uses_session_state(sql):
+            console.print("[yellow]⚠️  This statement sets session state, which does not carry over "
+                          "to later statements behind a transaction pooler[/yellow]")
+        attempt = 1
+        while True:
+            result, error, committing = self._execute_once(sql, params)
+            policy = self.retry_policy
+            if error is None or policy is None or attempt > policy.retries:
+                break
+            reason = policy.retry_reason(error, sql, committing)
+            if reason is None:
+                break
+            delay = policy.delay(attempt)
+            console.print(f"[yellow]🔁 {reason}, retrying in {delay:.1f}s "
+                          f"(attempt {attempt + 1}/{policy.retries + 1})[/yellow]")
+            time.sleep(delay)
+            attempt += 1
+        result.attempts = attempt
+        return result
+    
+    def _execute_once(self, sql: str, params: Optional[tuple]
+                      ) -> Tuple[ExecutionResult, Optional[psycopg2.Error], bool]:
+        """One attempt of execute_sql: (result, error, whether it failed while committing)"""
         start_time = time.time()
         result = ExecutionResult(success=False, execution_time=0)
+        committing = False
         
         try:
             with self.get_cursor() as cur:
                 # Determine query type for better reporting
                 query_type = self._get_query_type(sql)
                 result.query_type = query_type
+                profiling = self.profiler is not None and self.profiler.wants(sql, query_type)
+                local_settings = self._local_settings_sql(cur)
+                if local_settings:
+                    cur.execute(local_settings)
                 
                 # Execute the query
-                cur.execute(sql, params)
+                cur.execute(self.profiler.explain(sql) if profiling else sql, params)
+                explain = cur.fetchone()[0] if profiling else None
+                committing = True
                 self.connection.commit()
+                committing = False
                 
                 # Calculate execution time
                 execution_time = time.time() - start_time
                 result.execution_time = execution_time
                 
                 # Set result based on query type
-                if query_type in ("SELECT", "WITH"):
-                    rows = cur.fetchall()
-                    result.row_count = len(rows)
+                if profiling:
+                    capture = self.profiler.record(sql, explain)
+                    if query_type in ("SELECT", "WITH"):
+                        result.row_count = capture.actual_rows
+                        result.message = f"Returned {result.row_count} row(s), profiled"
+                    else:
+                        result.affected_rows = capture.actual_rows
+                        result.message = f"Affected {result.affected_rows} row(s), profiled"
+                    if capture.flags:
+                        result.message += f" [{', '.join(capture.flags)}]"
+                    result.success = True
+                elif query_type in ("SELECT", "WITH"):
+                    # rowcount is already known; no need to build every row in Python
+                    result.row_count = cur.rowcount if cur.description else 0
                     result.message = f"Returned {result.row_count} row(s)"
                     result.success = True
                 elif query_type in ("INSERT", "UPDATE", "DELETE", "CREATE", "ALTER", "DROP"):
@@ -129,153 +316,312 @@ class SQLExecutor:
                     result.message = "Query executed successfully"
                     result.success = True
                 
-                return result
+                return result, None, False
                 
         except psycopg2.Error as e:
-            self.connection.rollback()
+            self._rollback()
             execution_time = time.time() - start_time
             result.execution_time = execution_time
-            result.error = str(e)
-            result.success = False
+            self._set_error(result, e)
+            return result, e, committing
+    
+    def _rollback(self):
+        """Roll back after a failure; a broken connection is closed so the next statement reconnects"""
+        if self.connection is None or self.connection.closed:
+            return
+        try:
+            self.connection.rollback()
+        except psycopg2.Error:
+            self.connection.close()
+    
+    def stream_query(self, sql: str, out_path: Optional[str] = None,
+                     fmt: Optional[str] = None, itersize: int = DEFAULT_ITERSIZE,
+                     show_progress: bool = True) -> ExecutionResult:
+        """
+        Run a query and stream its rows
+        Rows are fetched itersize at a time, written to out_path (CSV, NDJSON
+        or Parquet) when given and counted. Plain reads go through a
+        server-side (named) cursor, so memory stays bounded whatever the size
+        of the result; other statements (INSERT ... RETURNING, SHOW, EXPLAIN,
+        SELECT INTO) cannot be declared as a cursor and run on a client-side
+        cursor instead.
+        """
+        from export import detect_format, open_result_writer
+        
+        start_time = time.time()
+        result = ExecutionResult(success=False, execution_time=0,
+                                 query_type=self._get_query_type(sql))
+        if out_path:
+            fmt = detect_format(out_path, fmt)
+        
+        if not self.connection or self.connection.closed:
+            self._connect()
+        
+        writer = None
+        bar = task = None
+        if show_progress:
+            from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
+            bar = Progress(SpinnerColumn(), TextColumn("{task.description}"),
+                           TimeElapsedColumn(), console=console, refresh_per_second=4)
+            task = bar.add_task("0 row(s)")
+            bar.start()
+        
+        row_count = 0
+        affected_rows = None
+        declared = can_declare_cursor(sql)
+        try:
+            with self.connection.cursor() as settings_cur:
+                local_settings = self._local_settings_sql(settings_cur)
+                if local_settings:
+                    settings_cur.execute(local_settings)
+            with self.connection.cursor(name="sql_runner_stream" if declared else None) as cur:
+                cur.itersize = itersize
+                cur.execute(sql.strip().rstrip(";"))
+                # A named cursor describes its rows only after the first fetch
+                if not declared and cur.description is None:
+                    affected_rows = cur.rowcount if cur.rowcount >= 0 else None
+                while declared or cur.description is not None:
+                    rows = cur.fetchmany(itersize)
+                    if writer is None and out_path:
+                        writer = open_result_writer(
+                            out_path, fmt,
+                            [d.name for d in cur.description],
+                            [d.type_code for d in cur.description],
+                        )
+                    if not rows:
+                        break
+                    if writer is not None:
+                        writer.write_rows(rows)
+                    row_count += len(rows)
+                    if bar is not None:
+                        bar.update(task, description=f"{row_count:,} row(s)")
             
-            # Extract error position if available
+            if out_path and writer is None:
+                self.connection.rollback()
+                result.error = f"{result.query_type} statement returns no rows to export to {out_path}"
+            else:
+                self.connection.commit()
+                result.success = True
+                if affected_rows is not None:
+                    result.affected_rows = affected_rows
+                    result.message = f"Affected {affected_rows} row(s)"
+                else:
+                    result.row_count = row_count
+                    result.message = (f"Exported {row_count} row(s) to {out_path} ({fmt})"
+                                      if out_path else f"Returned {row_count} row(s)")
+        except psycopg2.Error as e:
+            self.connection.rollback()
+            self._set_error(result, e)
+            if declared and result.error_position:
+                # psycopg2 sends the query wrapped in DECLARE ... CURSOR FOR
+                result.error_position -= len(_DECLARE_PREFIX)
+        finally:
+            if writer is not None:
+                writer.close()
+            if bar is not None:
+                bar.stop()
+        
+        result.execution_time = time.time() - start_time
+        return result
+    
+    def _set_error(self, result: ExecutionResult, e: psycopg2.Error):
+        """Fill error message and position from a psycopg2 error"""
+        result.error = str(e)
+        result.success = False
+        
+        # Extract error position if available (psycopg2 reports it as a string)
+        try:
+            position = getattr(e.diag, 'statement_position', None)
+            if position:
+                result.error_position = int(position)
+        except (AttributeError, TypeError, ValueError):
+            pass  # Ignore if we can't access position
+    
+    def execute_batch(self, statements: List[Tuple[str, int]],
+                      stop_on_error: bool = True) -> List[StatementResult]:
+        """
+        Execute consecutive statements in one round trip
+        The statements are sent as a single BEGIN; ...; COMMIT; simple query.
+        If any of them fails the whole batch is rolled back and replayed one
+        statement at a time under savepoints, so the error is reported for the
+        exact statement and the statements before it are still committed.
+        Per-statement times in a successful batch are the batch time divided
+        evenly, and affected row counts are not available.
+        """
+        if len(statements) == 1:
+            stmt, line_num = statements[0]
+            return [StatementResult(statement=stmt, result=self.execute_sql(stmt), line_number=line_num)]
+        
+        body = "\n".join(
+            stmt if stmt.rstrip().endswith(";") else stmt + "\n;"
+            for stmt, _ in statements
+        )
+        start_time = time.time()
+        
+        with self.get_cursor() as cur:
+            conn = self.connection
+            previous_autocommit = conn.autocommit
+            conn.autocommit = True
             try:
-                if hasattr(e, 'diag') and e.diag:
-                    # Access the position attribute from diagnostics
-                    if hasattr(e.diag, 'position'):
-                        result.error_position = e.diag.position
-                    elif hasattr(e.diag, 'get'):
-                        result.error_position = e.diag.get('position')
-            except (AttributeError, TypeError):
-                pass  # Ignore if we can't access position
-            
-            return result
+                local_settings = self._local_settings_sql(cur) or ""
+                try:
+                    cur.execute(f"BEGIN;{local_settings}\n{body}\nCOMMIT;")
+                except psycopg2.Error:
+                    cur.execute("ROLLBACK")
+                    return self._replay_with_savepoints(cur, statements, stop_on_error)
+            finally:
+                conn.autocommit = previous_autocommit
+        
+        share = (time.time() - start_time) / len(statements)
+        return [
+            StatementResult(
+                statement=stmt,
+                result=ExecutionResult(
+                    success=True,
+                    execution_time=share,
+                    query_type=self._get_query_type(stmt),
+                    message=f"Executed in a batch of {len(statements)}",
+                    batch_size=len(statements),
+                ),
+                line_number=line_num,
+            )
+            for stmt, line_num in statements
+        ]
+    
+    def _replay_with_savepoints(self, cur: cursor, statements: List[Tuple[str, int]],
+                                stop_on_error: bool) -> List[StatementResult]:
+        """Re-run a failed batch statement by statement inside one transaction"""
+        results = []
+        cur.execute("BEGIN")
+        local_settings = self._local_settings_sql(cur)
+        if local_settings:
+            cur.execute(local_settings)
+        for stmt, line_num in statements:
+            start_time = time.time()
+            result = ExecutionResult(success=False, execution_time=0,
+                                     query_type=self._get_query_type(stmt),
+                                     batch_size=len(statements))
+            cur.execute("SAVEPOINT sql_runner_stmt")
+            try:
+                cur.execute(stmt)
+                result.affected_rows = cur.rowcount if cur.rowcount >= 0 else None
+                cur.execute("RELEASE SAVEPOINT sql_runner_stmt")
+                result.success = True
+                result.message = f"Affected {result.affected_rows} row(s)"
+            except psycopg2.Error as e:
+                cur.execute("ROLLBACK TO SAVEPOINT sql_runner_stmt")
+                self._set_error(result, e)
+            result.execution_time = time.time() - start_time
+            results.append(StatementResult(statement=stmt, result=result, line_number=line_num))
+            if not result.success and stop_on_error:
+                break
+        cur.execute("COMMIT")
+        return results
     
     def _get_query_type(self, sql: str) -> str:
         """Determine the type of SQL query"""
-        sql_upper = sql.strip().upper()
-        
-        if sql_upper.startswith("SELECT"):
-            return "SELECT"
-        elif sql_upper.startswith("INSERT"):
-            return "INSERT"
-        elif sql_upper.startswith("UPDATE"):
-            return "UPDATE"
-        elif sql_upper.startswith("DELETE"):
-            return "DELETE"
-        elif sql_upper.startswith("CREATE"):
-            return "CREATE"
-        elif sql_upper.startswith("ALTER"):
-            return "ALTER"
-        elif sql_upper.startswith("DROP"):
-            return "DROP"
-        elif sql_upper.startswith("WITH"):
-            return "WITH"
-        else:
-            return "OTHER"
+        return get_query_type(sql)
     
     def split_sql_file(self, content: str) -> List[Tuple[str, int]]:
         """
         Split SQL file into individual statements
         Returns list of (statement, line_number) tuples
         """
-        statements = []
-        current_statement = []
-        in_string = False
-        string_char = None
-        in_comment = False
-        comment_type = None  # '--' or '/*'
-        line_number = 1
-        statement_start_line = 1
-        
-        i = 0
-        while i < len(content):
-            char = content[i]
-            
-            # Track line numbers
-            if char == '\n':
-                line_number += 1
-            
-            # Handle string literals
-            if not in_comment and char in ("'", '"'):
-                if not in_string:
-                    in_string = True
-                    string_char = char
-                elif string_char == char:
-                    # Check if it's escaped
-                    if i > 0 and content[i-1] == '\\':
-                        pass  # Escaped quote, continue string
-                    else:
-                        in_string = False
-                        string_char = None
-            
-            # Handle comments
-            elif not in_string:
-                if not in_comment and i + 1 < len(content):
-                    two_chars = content[i:i+2]
-                    if two_chars == '--':
-                        in_comment = True
-                        comment_type = '--'
-                        i += 1  # Skip next char
-                    elif two_chars == '/*':
-                        in_comment = True
-                        comment_type = '/*'
-                        i += 1  # Skip next char
-                    elif in_comment and comment_type == '--' and char == '\n':
-                        in_comment = False
-                        comment_type = None
-                    elif in_comment and comment_type == '/*' and i + 1 < len(content):
-                        if content[i:i+2] == '*/':
-                            in_comment = False
-                            comment_type = None
-                            i += 1  # Skip next char
-            
-            # If not in comment or string, look for statement end
-            if not in_string and not in_comment:
-                if char == ';':
-                    # End of statement
-                    current_statement.append(char)
-                    statement_text = ''.join(current_statement).strip()
-                    if statement_text and not statement_text.isspace():
-                        statements.append((statement_text, statement_start_line))
-                    current_statement = []
-                    statement_start_line = line_number + 1  # Next statement starts on next line
-                else:
-                    current_statement.append(char)
-            else:
-                current_statement.append(char)
-            
-            i += 1
-        
-        # Handle last statement without semicolon
-        if current_statement:
-            statement_text = ''.join(current_statement).strip()
-            if statement_text and not statement_text.isspace():
-                statements.append((statement_text, statement_start_line))
-        
-        return statements
+        return split_statements(content)
     
-    def execute_file(self, file_path: str, stop_on_error: bool = True) -> List[StatementResult]:
+    def execute_file(self, file_path: str, stop_on_error: bool = True,
+                     quiet: bool = False, output: str = "verbose",
+                     jsonl: Optional[TextIO] = None,
+                     batch_size: int = 1, checkpoint: bool = False,
+                     resume: bool = False) -> List[StatementResult]:
         """
         Execute SQL statements from a file
+        output selects the rendering: "verbose" (preview, spinner and result per
+        statement), "progress" (one progress bar for the whole file) or "quiet"
+        (only the error of a failing statement, safe when several files run
+        concurrently; quiet=True is a shortcut). With jsonl, one JSON record
+        per statement is written to that stream as it completes.
+        batch_size > 1 groups consecutive DML statements into one round trip
+        (see execute_batch); it applies to the progress and quiet modes.
+        checkpoint=True records the committed statements (see FileCheckpoint)
+        and resume=True skips the ones a previous run committed.
         """
+        if quiet:
+            output = "quiet"
+        if output not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode: {output}")
+        
+        tracker = None
+        statements: Iterable[Tuple[str, int]] = iter_file_statements(file_path)
+        if checkpoint or resume:
+            tracker = FileCheckpoint(file_path, scope=self.config.project_ref)
+            saved = tracker.load() if resume else None
+            if resume:
+                self._display_resume(tracker, saved)
+            statements = tracker.resume(statements, saved)
+        
+        try:
+            if output != "verbose":
+                results = self._execute_file_streaming(file_path, statements, stop_on_error,
+                                                       progress=(output == "progress"), jsonl=jsonl,
+                                                       batch_size=batch_size, tracker=tracker)
+            else:
+                results = self._execute_file_verbose(file_path, statements, stop_on_error,
+                                                     jsonl=jsonl, tracker=tracker)
+        except CheckpointMismatch as e:
+            console.print(f"[red]❌ Cannot resume {file_path}: {e}[/red]")
+            console.print("   Run without --resume to execute the whole file")
+            return [StatementResult(statement="", line_number=0,
+                                    result=ExecutionResult(success=False, execution_time=0,
+                                                           error=f"Cannot resume: {e}"))]
+        finally:
+            if tracker is not None:
+                tracker.close()
+        
+        if tracker is not None:
+            if tracker.complete:
+                tracker.clear()
+            elif tracker.completed or tracker.failed_line is not None:
+                where = (f"line {tracker.failed_line}" if tracker.failed_line is not None
+                         else f"statement {tracker.completed + 1}")
+                console.print(f"\n💾 Checkpoint saved: {tracker.completed} statement(s) committed, "
+                              f"re-run with [bold]--resume[/bold] to continue at {where}")
+        return results
+    
+    def _display_resume(self, tracker: FileCheckpoint, saved: Optional[dict]):
+        """Tell where a resumed run picks up"""
+        if not saved or not saved.get("completed"):
+            console.print("[yellow]⚠️  No checkpoint for this file, running from the start[/yellow]")
+            return
+        console.print(f"⏩ Resuming: skipping {saved['completed']} committed statement(s)"
+                      + (f", continuing at line {saved['failed_line']}" if saved.get("failed_line") else ""))
+        if tracker.file_changed(saved):
+            console.print("[dim]   File changed since the checkpoint; the committed statements are unchanged[/dim]")
+    
+    def _execute_file_verbose(self, file_path: str, statements: Iterable[Tuple[str, int]],
+                              stop_on_error: bool, jsonl: Optional[TextIO] = None,
+                              tracker: Optional[FileCheckpoint] = None) -> List[StatementResult]:
+        """Execute statements with a preview, spinner and result for each"""
         console.print(f"\n📄 [bold]Executing SQL file:[/bold] {file_path}")
         
+        # Split into statements while reading the file in chunks
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            statements = list(statements)
+        except CheckpointMismatch:
+            raise
         except Exception as e:
             console.print(f"[red]❌ Failed to read file: {e}[/red]")
             return []
         
-        # Split into statements
-        statements = self.split_sql_file(content)
-        console.print(f"📋 Found [bold]{len(statements)}[/bold] SQL statement(s)")
+        skipped = tracker.skipped if tracker else 0
+        total = skipped + len(statements)
+        console.print(f"📋 Found [bold]{total}[/bold] SQL statement(s)"
+                      + (f", {skipped} already committed" if skipped else ""))
         
         results = []
-        for i, (stmt, line_num) in enumerate(statements, 1):
+        for i, (stmt, line_num) in enumerate(statements, skipped + 1):
             console.print(f"\n[dim]{'─' * 60}[/dim]")
-            console.print(f"🚀 [bold]Statement {i}/{len(statements)}[/bold] (Line {line_num})")
+            console.print(f"🚀 [bold]Statement {i}/{total}[/bold] (Line {line_num})")
             
             # Display statement preview
             stmt_preview = stmt[:200] + "..." if len(stmt) > 200 else stmt
@@ -292,6 +638,10 @@ class SQLExecutor:
                 line_number=line_num
             )
             results.append(stmt_result)
+            if tracker is not None:
+                tracker.record(stmt, result.success, line_num, result.error)
+            if jsonl is not None:
+                write_jsonl_record(jsonl, file_path, i, stmt_result)
             
             # Display result
             self._display_statement_result(stmt_result, i)
@@ -306,6 +656,105 @@ class SQLExecutor:
         
         return results
     
+    def _iter_file_results(self, statements: Iterable[Tuple[str, int]], stop_on_error: bool,
+                           batch_size: int = 1) -> Iterator[StatementResult]:
+        """
+        Execute statements as they are read and yield their results
+        With batch_size > 1, runs of consecutive DML statements are sent
+        through execute_batch, up to batch_size statements per round trip.
+        """
+        pending: List[Tuple[str, int]] = []
+        if self.profiler is not None:
+            batch_size = 1  # every statement needs its own EXPLAIN
+        for stmt, line_num in statements:
+            if batch_size > 1 and self._get_query_type(stmt) in BATCHABLE_QUERY_TYPES:
+                pending.append((stmt, line_num))
+                if len(pending) < batch_size:
+                    continue
+                stmt = None
+            
+            if pending:
+                batch_results = self.execute_batch(pending, stop_on_error)
+                pending = []
+                yield from batch_results
+                if stop_on_error and not all(r.result.success for r in batch_results):
+                    return
+            
+            if stmt is not None:
+                yield StatementResult(statement=stmt, result=self.execute_sql(stmt), line_number=line_num)
+        
+        if pending:
+            yield from self.execute_batch(pending, stop_on_error)
+    
+    def _execute_file_streaming(self, file_path: str, statements: Iterable[Tuple[str, int]],
+                                stop_on_error: bool, progress: bool = False,
+                                jsonl: Optional[TextIO] = None, batch_size: int = 1,
+                                tracker: Optional[FileCheckpoint] = None) -> List[StatementResult]:
+        """
+        Execute statements as they are read, without per-statement rendering
+        Statements are still timed individually (batched statements share the
+        batch time); with progress=True a single bar advances by source line
+        and is redrawn a few times per second.
+        """
+        results = []
+        failed = 0
+        bar = task = None
+        if progress:
+            from rich.progress import BarColumn, Progress, TextColumn, TimeElapsedColumn
+            bar = Progress(
+                TextColumn("📄 {task.description}"),
+                BarColumn(),
+                TextColumn("{task.fields[statements]} statement(s), {task.fields[failed]} failed"),
+                TimeElapsedColumn(),
+                console=console,
+                refresh_per_second=4,
+            )
+            task = bar.add_task(os.path.basename(file_path), total=_count_lines(file_path),
+                                statements=0, failed=0)
+            bar.start()
+        
+        try:
+            for i, stmt_result in enumerate(self._iter_file_results(statements, stop_on_error, batch_size), 1):
+                # Number statements as in the file when resuming (skipped is
+                # known once the first statement has been read)
+                i += tracker.skipped if tracker is not None else 0
+                line_num = stmt_result.line_number
+                results.append(stmt_result)
+                if tracker is not None:
+                    tracker.record(stmt_result.statement, stmt_result.result.success,
+                                   line_num, stmt_result.result.error)
+                if jsonl is not None:
+                    write_jsonl_record(jsonl, file_path, i, stmt_result)
+                
+                if not stmt_result.result.success:
+                    failed += 1
+                    target = f" @ {self.config.target}" if self.config.target else ""
+                    console.print(f"\n📄 [bold]{file_path}[/bold]{target}, statement {i} (Line {line_num})")
+                    self._display_statement_result(stmt_result, i)
+                if bar is not None:
+                    bar.update(task, completed=line_num, statements=i, failed=failed)
+                if failed and stop_on_error:
+                    break
+        except CheckpointMismatch:
+            raise
+        except Exception as e:
+            console.print(f"[red]❌ Failed to process file {file_path}: {e}[/red]")
+            failed += 1
+            results.append(StatementResult(
+                statement="", line_number=results[-1].line_number if results else 0,
+                result=ExecutionResult(success=False, execution_time=0,
+                                       error=f"Failed to process file: {e}"),
+            ))
+        finally:
+            if bar is not None:
+                if not failed:
+                    bar.update(task, completed=bar.tasks[0].total)
+                bar.stop()
+        
+        if progress:
+            self._display_execution_summary(results)
+        return results
+    
     def _display_statement_result(self, stmt_result: StatementResult, statement_num: int):
         """Display result of a single statement execution"""
         result = stmt_result.result
@@ -318,6 +767,8 @@ class SQLExecutor:
                 info_parts.append(result.message)
             if result.execution_time:
                 info_parts.append(f"({result.execution_time:.3f}s)")
+            if result.attempts > 1:
+                info_parts.append(f"after {result.attempts} attempts")
             
             if info_parts:
                 console.print(f"{status_text} {', '.join(info_parts)}")
@@ -357,7 +808,7 @@ class SQLExecutor:
         
         # Get the full line with context
         all_lines = sql.split('\n')
-        actual_line_num = line_offset + error_line_num - 1
+        actual_line_num = line_offset + error_line_num
         
         console.print(f"\n[dim]Error at line {actual_line_num}, position {char_pos}:[/dim]")
         
@@ -420,6 +871,9 @@ class SQLExecutor:
         console.print(f"\n⏱️  [bold]Timing:[/bold]")
         console.print(f"   Total execution time: {total_time:.3f}s")
         console.print(f"   Average per statement: {avg_time:.3f}s")
+        retried = sum(1 for r in results if r.result.attempts > 1)
+        if retried:
+            console.print(f"   Retried statements: {retried}")
         
         if failed == 0:
             console.print("\n🎉 [bold green]All statements executed successfully![/bold green]")
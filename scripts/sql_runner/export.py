@@ -0,0 +1,179 @@
+"""
+Result writers for Supabase SQL Runner
+Write query results incrementally to CSV, NDJSON or Parquet so exports of
+large tables use bounded memory
+"""
+import csv
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".parquet": "parquet",
+}
+
+# Rows buffered before a Parquet row group is written
+PARQUET_ROW_GROUP_ROWS = 50_000
+
+# PostgreSQL type OIDs (cursor.description type_code) -> Parquet column kind
+_PG_TYPE_KINDS = {
+    16: "bool",
+    20: "int64", 21: "int64", 23: "int64",
+    700: "float64", 701: "float64", 1700: "float64",
+    1082: "date",
+    1114: "timestamp", 1184: "timestamptz",
+    114: "json", 3802: "json",
+}
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """Export format from an explicit name or the file extension"""
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _EXTENSIONS:
+        raise ValueError(
+            f"Cannot infer export format from '{path}', use --format ({', '.join(EXPORT_FORMATS)})"
+        )
+    return _EXTENSIONS[extension]
+
+
+def _json_default(value: Any):
+    """JSON encoding for the Python types psycopg2 returns"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, memoryview):
+        return value.tobytes().hex()
+    return str(value)
+
+
+def _csv_value(value: Any):
+    """CSV field for a value; json/jsonb (dict or list) is written as JSON"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+class CsvResultWriter:
+    """CSV with a header row; NULL is written as an empty field"""
+
+    def __init__(self, path: str, columns: List[str], type_codes: Sequence[int]):
+        self.f = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.f)
+        self.writer.writerow(columns)
+
+    def write_rows(self, rows: List[tuple]):
+        self.writer.writerows([_csv_value(v) for v in row] for row in rows)
+
+    def close(self):
+        self.f.close()
+
+
+class NdjsonResultWriter:
+    """One JSON object per row"""
+
+    def __init__(self, path: str, columns: List[str], type_codes: Sequence[int]):
+        self.f = open(path, "w", encoding="utf-8")
+        self.columns = columns
+
+    def write_rows(self, rows: List[tuple]):
+        self.f.writelines(
+            json.dumps(dict(zip(self.columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+    def close(self):
+        self.f.close()
+
+
+class ParquetResultWriter:
+    """
+    Parquet file written one row group at a time (requires pyarrow)
+    Column types come from the PostgreSQL result types; numeric is stored as
+    float64 and types without a direct mapping as strings.
+    """
+
+    def __init__(self, path: str, columns: List[str], type_codes: Sequence[int]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow")
+
+        self.pa = pa
+        arrow_types = {
+            "bool": pa.bool_(),
+            "int64": pa.int64(),
+            "float64": pa.float64(),
+            "date": pa.date32(),
+            "timestamp": pa.timestamp("us"),
+            "timestamptz": pa.timestamp("us", tz="UTC"),
+        }
+        self.kinds = [_PG_TYPE_KINDS.get(code, "string") for code in type_codes]
+        self.schema = pa.schema([
+            (name, arrow_types.get(kind, pa.string()))
+            for name, kind in zip(columns, self.kinds)
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.batches = []
+        self.buffered_rows = 0
+
+    def _convert(self, kind: str, value: Any):
+        if value is None:
+            return None
+        if kind == "float64":
+            return float(value)
+        if kind == "json":
+            return json.dumps(value, default=_json_default, ensure_ascii=False)
+        if kind == "string" and not isinstance(value, str):
+            return _json_default(value)
+        return value
+
+    def _flush(self):
+        if not self.batches:
+            return
+        self.writer.write_table(self.pa.Table.from_batches(self.batches, schema=self.schema))
+        self.batches = []
+        self.buffered_rows = 0
+
+    def write_rows(self, rows: List[tuple]):
+        # Converted to Arrow right away; only compact columnar data is buffered
+        columns = list(zip(*rows))
+        arrays = [
+            self.pa.array([self._convert(kind, v) for v in values], type=field.type)
+            for kind, values, field in zip(self.kinds, columns, self.schema)
+        ]
+        self.batches.append(self.pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.buffered_rows += len(rows)
+        if self.buffered_rows >= PARQUET_ROW_GROUP_ROWS:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+WRITERS = {
+    "csv": CsvResultWriter,
+    "ndjson": NdjsonResultWriter,
+    "parquet": ParquetResultWriter,
+}
+
+
+def open_result_writer(path: str, fmt: str, columns: List[str], type_codes: Sequence[int]):
+    """Create the writer for an export format"""
+    return WRITERS[fmt](path, columns, type_codes)
@@ -0,0 +1,118 @@
+"""
+Multi-target execution for Supabase SQL Runner
+Runs one SQL file against several connection profiles at the same time, so
+a rollout takes as long as the slowest target instead of the sum of all
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from rich.table import Table
+
+from config import SupabaseConfig
+from executor import SQLExecutor, StatementResult, console
+
+
+@dataclass
+class TargetOutcome:
+    """Result of a file run against one target"""
+    target: str
+    config: SupabaseConfig
+    results: List[StatementResult] = field(default_factory=list)
+    wall_time: float = 0.0
+    error: Optional[str] = None  # connection failure
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for r in self.results if r.result.success)
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for r in self.results if not r.result.success)
+
+    @property
+    def success(self) -> bool:
+        return self.error is None and self.failed == 0
+
+    @property
+    def first_error(self) -> Optional[str]:
+        if self.error:
+            return self.error
+        for r in self.results:
+            if not r.result.success:
+                return f"line {r.line_number}: {(r.result.error or '').strip().splitlines()[0]}"
+        return None
+
+
+def run_targets(configs: List[SupabaseConfig], sql_file: str, stop_on_error: bool = True,
+                batch_size: int = 1, resume: bool = False,
+                retry_policy=None) -> List[TargetOutcome]:
+    """
+    Execute sql_file against every target concurrently, one connection each
+    Statements are run quietly (only failures are printed, tagged with the
+    target); each target keeps its own checkpoint for --resume.
+    """
+    def apply(config: SupabaseConfig) -> TargetOutcome:
+        outcome = TargetOutcome(target=config.target, config=config)
+        start = time.time()
+        try:
+            with SQLExecutor(config, check_version=False, retry_policy=retry_policy) as executor:
+                outcome.results = executor.execute_file(
+                    sql_file, stop_on_error=stop_on_error, output="quiet",
+                    batch_size=batch_size, checkpoint=True, resume=resume,
+                )
+        except Exception as e:
+            outcome.error = f"Connection failed: {e}"
+        outcome.wall_time = time.time() - start
+        return outcome
+
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=len(configs)) as threads:
+        for config in configs:
+            console.print(f"▶️  [bold]{config.target}[/bold] ({config.database_host})")
+        running = {threads.submit(apply, config): config.target for config in configs}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                target = running.pop(future)
+                outcome = future.result()
+                outcomes[target] = outcome
+                style = "green" if outcome.success else "red"
+                console.print(f"[{style}]{'✅' if outcome.success else '❌'} {target}[/{style}] "
+                              f"({outcome.wall_time:.3f}s)")
+
+    return [outcomes[config.target] for config in configs]
+
+
+def display_target_summary(outcomes: List[TargetOutcome], wall_time: float):
+    """Per-target result table and fan-out vs sequential timing"""
+    table = Table(title="🎯 Targets", show_header=True, header_style="bold")
+    table.add_column("Target", style="cyan")
+    table.add_column("Host", style="dim")
+    table.add_column("Status")
+    table.add_column("OK", justify="right")
+    table.add_column("Failed", justify="right")
+    table.add_column("Time", justify="right")
+    table.add_column("Error", overflow="fold")
+
+    slowest = max(outcomes, key=lambda o: o.wall_time)
+    for outcome in outcomes:
+        status = "[green]✅ OK[/green]" if outcome.success else "[red]❌ FAILED[/red]"
+        time_text = f"{outcome.wall_time:.3f}s"
+        if outcome is slowest and len(outcomes) > 1:
+            time_text = f"[bold]{time_text}[/bold]"
+        table.add_row(
+            outcome.target, outcome.config.database_host or "", status,
+            str(outcome.succeeded), str(outcome.failed), time_text,
+            outcome.first_error or "",
+        )
+    console.print()
+    console.print(table)
+
+    sequential = sum(o.wall_time for o in outcomes)
+    console.print(f"\n⏱️  [bold]Timing:[/bold]")
+    console.print(f"   Wall time: {wall_time:.3f}s (slowest target: {slowest.target}, {slowest.wall_time:.3f}s)")
+    console.print(f"   Sequential equivalent: {sequential:.3f}s")
+    if wall_time > 0:
+        console.print(f"   Speedup: {sequential / wall_time:.2f}x")
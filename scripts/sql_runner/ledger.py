@@ -0,0 +1,171 @@
+"""
+Migration ledger for Supabase SQL Runner
+Tracks applied migration files (with a content checksum) in the database so
+run_all can skip files that were already applied
+"""
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from executor import SQLExecutor, StatementResult
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Kept out of the public schema so the ledger is not exposed through PostgREST
+LEDGER_SCHEMA = "sql_runner"
+LEDGER_TABLE = f"{LEDGER_SCHEMA}.schema_migrations"
+
+# Sent as one simple-query message in autocommit mode, so loading the ledger
+# (and creating it on first use) costs a single round trip.
+LOAD_LEDGER_SQL = f"""
+CREATE SCHEMA IF NOT EXISTS {LEDGER_SCHEMA};
+CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+    filename TEXT PRIMARY KEY,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    execution_ms INTEGER
+);
+SELECT filename, checksum FROM {LEDGER_TABLE};
+"""
+
+RECORD_MIGRATION_SQL = f"""
+INSERT INTO {LEDGER_TABLE} (filename, checksum, execution_ms)
+VALUES (%s, %s, %s)
+ON CONFLICT (filename) DO UPDATE
+SET checksum = EXCLUDED.checksum,
+    applied_at = NOW(),
+    execution_ms = EXCLUDED.execution_ms
+"""
+
+
+@dataclass
+class MigrationFile:
+    """A migration file on disk"""
+    name: str
+    path: str
+    checksum: str
+
+
+@dataclass
+class MigrationOutcome:
+    """Result of processing one migration file during a run"""
+    migration: MigrationFile
+    status: str  # "applied", "skipped", "changed" or "failed"
+    wall_time: float = 0.0
+    results: Optional[List[StatementResult]] = None
+    error: Optional[str] = None
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of the file contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def migration_name(path: str) -> str:
+    """Ledger key for a file: its path relative to the project root"""
+    full_path = os.path.abspath(path)
+    if full_path.startswith(PROJECT_ROOT + os.sep):
+        return Path(os.path.relpath(full_path, PROJECT_ROOT)).as_posix()
+    return Path(full_path).as_posix()
+
+
+def discover_migrations(migrations_dir: str) -> List[MigrationFile]:
+    """Find all SQL files in a directory, sorted by filename"""
+    sql_files = sorted(Path(migrations_dir).glob("*.sql"), key=lambda x: x.name)
+    return [
+        MigrationFile(
+            name=migration_name(str(sql_file)),
+            path=str(sql_file),
+            checksum=file_checksum(str(sql_file)),
+        )
+        for sql_file in sql_files
+    ]
+
+
+class MigrationLedger:
+    """Reads and writes the schema_migrations ledger over an executor's connection"""
+
+    def __init__(self, executor: SQLExecutor):
+        self.executor = executor
+        self.applied: Dict[str, str] = {}
+
+    def load(self) -> Dict[str, str]:
+        """Create the ledger if needed and load filename -> checksum"""
+        conn = self.executor.connection
+        previous_autocommit = conn.autocommit
+        conn.autocommit = True
+        try:
+            with self.executor.get_cursor() as cur:
+                cur.execute(LOAD_LEDGER_SQL)
+                self.applied = dict(cur.fetchall())
+        finally:
+            conn.autocommit = previous_autocommit
+        return self.applied
+
+    def status(self, migration: MigrationFile) -> str:
+        """Return "pending", "applied" or "changed" for a migration"""
+        checksum = self.applied.get(migration.name)
+        if checksum is None:
+            return "pending"
+        return "applied" if checksum == migration.checksum else "changed"
+
+    def record(self, migration: MigrationFile, wall_time: float,
+               executor: Optional[SQLExecutor] = None):
+        """Mark a migration as applied, using the connection that applied it"""
+        executor = executor or self.executor
+        with executor.get_cursor() as cur:
+            cur.execute(RECORD_MIGRATION_SQL,
+                        (migration.name, migration.checksum, int(wall_time * 1000)))
+        executor.connection.commit()
+        self.applied[migration.name] = migration.checksum
+
+
+class MigrationRunner:
+    """Applies pending migrations over a single executor connection"""
+
+    def __init__(self, executor: SQLExecutor):
+        self.executor = executor
+        self.ledger = MigrationLedger(executor)
+
+    def plan(self, migrations: List[MigrationFile]) -> List[MigrationOutcome]:
+        """Load the ledger and classify every migration"""
+        self.ledger.load()
+        outcomes = []
+        for migration in migrations:
+            status = self.ledger.status(migration)
+            outcomes.append(MigrationOutcome(
+                migration=migration,
+                status="skipped" if status == "applied" else status,
+            ))
+        return outcomes
+
+    def apply(self, migration: MigrationFile, executor: Optional[SQLExecutor] = None,
+              quiet: bool = False) -> MigrationOutcome:
+        """Execute one migration file and record it in the ledger on success"""
+        executor = executor or self.executor
+        start_time = time.time()
+        try:
+            results = executor.execute_file(migration.path, stop_on_error=True, quiet=quiet)
+        except Exception as e:
+            return MigrationOutcome(migration=migration, status="failed",
+                                    wall_time=time.time() - start_time, error=str(e))
+        wall_time = time.time() - start_time
+
+        if not results or not all(r.result.success for r in results):
+            failed = next((r for r in results if not r.result.success), None)
+            return MigrationOutcome(
+                migration=migration, status="failed", wall_time=wall_time,
+                results=results,
+                error=failed.result.error if failed else "No statements executed",
+            )
+
+        self.ledger.record(migration, wall_time, executor=executor)
+        return MigrationOutcome(migration=migration, status="applied",
+                                wall_time=wall_time, results=results)
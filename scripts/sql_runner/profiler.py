@@ -0,0 +1,263 @@
+"""
+Query profiling for Supabase SQL Runner
+Runs statements under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON), keeps the
+plans in a local SQLite file keyed by a normalized statement fingerprint and
+flags plan changes and buffer-read regressions against the previous run
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+PLAN_STORE_PATH = os.environ.get(
+    "SQL_RUNNER_PLAN_STORE",
+    os.path.join(os.path.expanduser("~"), ".cache", "sisinfops", "sql_runner_plans.sqlite"),
+)
+
+# Statements EXPLAIN accepts; ANALYZE executes them, so DML still takes effect
+EXPLAINABLE_QUERY_TYPES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# A run reading this many times more blocks than the previous one (and at
+# least READ_REGRESSION_MIN_BLOCKS more) is flagged
+READ_REGRESSION_RATIO = 1.5
+READ_REGRESSION_MIN_BLOCKS = 100
+
+EXPLAIN_PREFIX = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+
+_NORMALIZE = re.compile(
+    r"""
+      (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<literal>
+          [eE]'(?:[^'\\]|\\.|'')*'
+        | '(?:[^']|'')*'
+        | \$(?P<tag>(?:[^\W\d]\w*)?)\$.*?\$(?P=tag)\$
+        | (?<![\w$])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?
+      )
+    | (?P<space>\s+)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    query TEXT NOT NULL,
+    plan_hash TEXT NOT NULL,
+    execution_ms REAL,
+    planning_ms REAL,
+    shared_hit INTEGER,
+    shared_read INTEGER,
+    temp_read INTEGER,
+    temp_written INTEGER,
+    actual_rows INTEGER,
+    plan_json TEXT NOT NULL,
+    captured_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plans_fingerprint ON plans (scope, fingerprint, captured_at);
+"""
+
+
+def normalize_statement(sql: str) -> str:
+    """Statement text with comments removed, literals as ? and whitespace collapsed"""
+    def replace(match):
+        if match.group("literal") is not None:
+            return "?"
+        return " "
+
+    normalized = _NORMALIZE.sub(replace, sql).strip().rstrip(";").strip().lower()
+    # IN (1, 2, 3) and VALUES (...) lists of any length share a fingerprint
+    return _VALUE_LIST.sub("(?)", normalized)
+
+
+def fingerprint(sql: str) -> str:
+    """Stable key for a statement regardless of literal values and formatting"""
+    return hashlib.sha1(normalize_statement(sql).encode("utf-8")).hexdigest()[:16]
+
+
+def plan_shape(node: Dict[str, Any]) -> list:
+    """Plan tree without costs, timings and row counts"""
+    return [
+        node.get("Node Type"),
+        node.get("Relation Name"),
+        node.get("Index Name"),
+        node.get("Join Type"),
+        node.get("Strategy"),
+        [plan_shape(child) for child in node.get("Plans", [])],
+    ]
+
+
+@dataclass
+class PlanCapture:
+    """One profiled execution, compared with the previous one of the same statement"""
+    fingerprint: str
+    query: str
+    plan_hash: str
+    execution_ms: float
+    planning_ms: float
+    shared_hit: int
+    shared_read: int
+    temp_read: int
+    temp_written: int
+    actual_rows: int
+    previous: Optional[dict] = None
+    flags: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_explain(cls, sql: str, explain: list) -> "PlanCapture":
+        """Build from the EXPLAIN (FORMAT JSON) output of a statement"""
+        root = explain[0]
+        plan = root["Plan"]
+        # Modify nodes report 0 rows without RETURNING; the input node has the real count
+        rows_node = plan["Plans"][0] if plan.get("Node Type") == "ModifyTable" and plan.get("Plans") else plan
+        return cls(
+            fingerprint=fingerprint(sql),
+            query=normalize_statement(sql),
+            plan_hash=hashlib.sha1(json.dumps(plan_shape(plan)).encode("utf-8")).hexdigest()[:16],
+            execution_ms=root.get("Execution Time", 0.0),
+            planning_ms=root.get("Planning Time", 0.0),
+            shared_hit=plan.get("Shared Hit Blocks", 0),
+            shared_read=plan.get("Shared Read Blocks", 0),
+            temp_read=plan.get("Temp Read Blocks", 0),
+            temp_written=plan.get("Temp Written Blocks", 0),
+            actual_rows=rows_node.get("Actual Rows", 0),
+        )
+
+    def compare(self, previous: Optional[dict]):
+        """Flag a plan change or a buffer-read regression against the previous run"""
+        self.previous = previous
+        if previous is None:
+            return
+        if previous["plan_hash"] != self.plan_hash:
+            self.flags.append("plan changed")
+        blocks = self.shared_hit + self.shared_read
+        previous_blocks = (previous["shared_hit"] or 0) + (previous["shared_read"] or 0)
+        if (blocks >= previous_blocks * READ_REGRESSION_RATIO
+                and blocks - previous_blocks >= READ_REGRESSION_MIN_BLOCKS):
+            self.flags.append(f"buffers {previous_blocks} -> {blocks}")
+        if self.temp_written and not previous["temp_written"]:
+            self.flags.append("spills to disk")
+
+
+class PlanStore:
+    """SQLite history of captured plans, one row per profiled execution"""
+
+    def __init__(self, path: Optional[str] = None, scope: str = ""):
+        self.path = path or PLAN_STORE_PATH
+        self.scope = scope  # project ref, plans of different databases are not compared
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(STORE_SCHEMA)
+
+    def previous(self, key: str) -> Optional[dict]:
+        """Latest capture of a fingerprint"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM plans WHERE scope = ? AND fingerprint = ? "
+                "ORDER BY captured_at DESC LIMIT 1",
+                (self.scope, key),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def add(self, capture: PlanCapture, explain: list):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO plans (scope, fingerprint, query, plan_hash, execution_ms, planning_ms, "
+                "shared_hit, shared_read, temp_read, temp_written, actual_rows, plan_json, captured_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.scope, capture.fingerprint, capture.query, capture.plan_hash,
+                 capture.execution_ms, capture.planning_ms, capture.shared_hit, capture.shared_read,
+                 capture.temp_read, capture.temp_written, capture.actual_rows,
+                 json.dumps(explain), time.time()),
+            )
+
+    def history(self, limit: int = 20) -> List[dict]:
+        """Most recently profiled statements with their run count and latest figures"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT p.*, counts.runs, counts.plans FROM plans p JOIN ("
+                "  SELECT fingerprint, MAX(captured_at) AS latest, COUNT(*) AS runs, "
+                "         COUNT(DISTINCT plan_hash) AS plans "
+                "  FROM plans WHERE scope = ? GROUP BY fingerprint"
+                ") counts ON counts.fingerprint = p.fingerprint AND counts.latest = p.captured_at "
+                "WHERE p.scope = ? ORDER BY p.captured_at DESC LIMIT ?",
+                (self.scope, self.scope, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self._db.close()
+
+
+class Profiler:
+    """Decides which statements to profile and records their plans"""
+
+    def __init__(self, store: PlanStore, match: Optional[str] = None):
+        self.store = store
+        self.match = re.compile(match, re.IGNORECASE) if match else None
+        self.captures: List[PlanCapture] = []
+
+    def wants(self, sql: str, query_type: str) -> bool:
+        """Profile explainable statements, limited to those matching --profile-match"""
+        if query_type not in EXPLAINABLE_QUERY_TYPES:
+            return False
+        return self.match is None or bool(self.match.search(sql))
+
+    def explain(self, sql: str) -> str:
+        """Statement wrapped in EXPLAIN ANALYZE"""
+        return EXPLAIN_PREFIX + sql
+
+    def record(self, sql: str, explain: list) -> PlanCapture:
+        capture = PlanCapture.from_explain(sql, explain)
+        capture.compare(self.store.previous(capture.fingerprint))
+        self.store.add(capture, explain)
+        self.captures.append(capture)
+        return capture
+
+
+def _change(now: float, before: Optional[float], fmt: str = "{:.1f}") -> str:
+    if before is None:
+        return fmt.format(now)
+    return f"{fmt.format(before)} → {fmt.format(now)}"
+
+
+def display_captures(captures: List[PlanCapture], console):
+    """Table of the statements profiled in this run, against their previous run"""
+    from rich.table import Table
+
+    table = Table(title="🔬 Profiled statements", show_header=True, header_style="bold")
+    table.add_column("Statement", style="cyan", overflow="fold")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("Buffers", justify="right")
+    table.add_column("Rows", justify="right")
+    table.add_column("Plan")
+    for capture in captures:
+        previous = capture.previous
+        if previous is None:
+            plan = "[dim]new[/dim]"
+        else:
+            plan = "[yellow]changed[/yellow]" if "plan changed" in capture.flags else "same"
+        flags = [f for f in capture.flags if f != "plan changed"]
+        blocks = capture.shared_hit + capture.shared_read
+        table.add_row(
+            capture.query[:80] + ("..." if len(capture.query) > 80 else ""),
+            _change(capture.execution_ms, previous["execution_ms"] if previous else None),
+            _change(blocks, (previous["shared_hit"] + previous["shared_read"]) if previous else None, "{:,}")
+            + (f" [red]⚠️ {', '.join(flags)}[/red]" if flags else ""),
+            f"{capture.actual_rows:,}",
+            plan,
+        )
+    console.print()
+    console.print(table)
+    flagged = sum(1 for c in captures if c.flags)
+    if flagged:
+        console.print(f"[yellow]⚠️  {flagged} statement(s) changed plan or read more buffers than last run[/yellow]")
@@ -0,0 +1,128 @@
+"""
+Retry and timeout policy for Supabase SQL Runner
+Decides which failures are transient enough to run a statement again, how
+long to back off, and which statement_timeout / lock_timeout a session uses
+"""
+import random
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from splitter import has_writes, strip_leading_comments
+
+# The server rolled the transaction back, nothing of the statement is left
+ROLLED_BACK_SQLSTATES = {
+    "40001": "serialization failure",
+    "40P01": "deadlock",
+    "55P03": "lock timeout",
+}
+
+# The session is gone (failover, restart, pooler recycling the connection)
+CONNECTION_SQLSTATES = {
+    "57P01": "server shutdown",
+    "57P02": "server crash",
+    "57P03": "server starting up",
+}
+
+# Statements that cannot run inside a transaction block; a failure may leave
+# them half done (e.g. an INVALID index), so they are never retried
+_NON_TRANSACTIONAL = re.compile(
+    r"""^\s*(?:
+          (?:create|drop)\s+(?:unique\s+)?index\s+concurrently
+        | reindex\b.*\bconcurrently
+        | vacuum | cluster
+        | (?:create|drop)\s+(?:database|tablespace)
+        | alter\s+system
+    )\b""",
+    re.IGNORECASE | re.VERBOSE | re.DOTALL,
+)
+
+# DDL that gives the same result when run twice
+_IDEMPOTENT_DDL = re.compile(
+    r"\bif\s+(?:not\s+)?exists\b|^\s*create\s+or\s+replace\b",
+    re.IGNORECASE,
+)
+_READ_ONLY = re.compile(r"^(?:select|show|values|table|with)\b", re.IGNORECASE)
+
+_TIMEOUT = re.compile(r"^\s*\d+(?:\.\d+)?\s*(?:ms|s|min|h)?\s*$", re.IGNORECASE)
+
+def parse_timeout(value: Optional[str]) -> Optional[str]:
+    """
+    Validate a timeout for SET statement_timeout / lock_timeout
+    Plain numbers are milliseconds; '30s', '5min', '500ms' are kept as is.
+    """
+    if value is None or value == "":
+        return None
+    if not _TIMEOUT.match(value):
+        raise ValueError(f"invalid timeout '{value}' (use e.g. 500ms, 30s, 5min)")
+    return value.strip().replace(" ", "")
+
+
+def is_non_transactional(sql: str) -> bool:
+    return bool(_NON_TRANSACTIONAL.match(strip_leading_comments(sql)))
+
+
+def is_idempotent(sql: str) -> bool:
+    """Running the statement twice leaves the database as running it once"""
+    body = strip_leading_comments(sql)
+    if _READ_ONLY.match(body):
+        return not has_writes(body)
+    return bool(_IDEMPOTENT_DDL.search(body))
+
+
+def is_connection_error(error: Exception) -> bool:
+    """The connection broke (SSL drop, reset, server restart) rather than the statement failing"""
+    import psycopg2
+
+    code = getattr(error, "pgcode", None)
+    if code:
+        return code.startswith("08") or code in CONNECTION_SQLSTATES
+    return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Per-run retry and timeout settings
+    Transient failures are retried up to `retries` times with exponential
+    backoff (base_delay * 2^n, capped at max_delay, with jitter so parallel
+    workers do not retry in lockstep).
+    """
+    retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    statement_timeout: Optional[str] = None
+    lock_timeout: Optional[str] = None
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)"""
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return backoff * random.uniform(0.5, 1.0)
+
+    def retry_reason(self, error: Exception, sql: str, committing: bool = False) -> Optional[str]:
+        """
+        Why the failed statement may be run again, or None
+        Errors after which the server rolled back are retried for every
+        transactional statement. A lost connection is retried too, except
+        while committing: then it is unknown whether the commit went through,
+        so only idempotent statements (reads, IF [NOT] EXISTS / OR REPLACE
+        DDL) are retried.
+        """
+        if is_non_transactional(sql):
+            return None
+        code = getattr(error, "pgcode", None)
+        if code in ROLLED_BACK_SQLSTATES:
+            return ROLLED_BACK_SQLSTATES[code]
+        if is_connection_error(error):
+            if committing and not is_idempotent(sql):
+                return None
+            return CONNECTION_SQLSTATES.get(code, "connection lost")
+        return None
+
+    def session_settings(self) -> dict:
+        settings = {}
+        if self.statement_timeout:
+            settings["statement_timeout"] = self.statement_timeout
+        if self.lock_timeout:
+            settings["lock_timeout"] = self.lock_timeout
+        return settings
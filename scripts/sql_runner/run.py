@@ -5,21 +5,63 @@ Execute SQL files against Supabase PostgreSQL database with detailed error repor
 """
 import os
 import sys
-from pathlib import Path
 
 import click
-from rich.console import Console
 
-from config import get_config
-from executor import SQLExecutor, execute_sql_file
+from config import get_config, load_env_config
 
-console = Console()
+# Heavy modules (executor -> psycopg2, rich renderables) are imported inside
+# the subcommands that need them, so --help and listing commands start fast.
+
+
+class _LazyConsole:
+    """rich Console created on first use"""
+    _console = None
+    
+    def __getattr__(self, name):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return getattr(_LazyConsole._console, name)
+
+
+console = _LazyConsole()
+
+
+def retry_options(command):
+    """--retries / --statement-timeout / --lock-timeout, shared by run and run-all"""
+    command = click.option('--lock-timeout', metavar='DURATION',
+                           help='Give up waiting for a lock after this long (e.g. 5s); retried')(command)
+    command = click.option('--statement-timeout', metavar='DURATION',
+                           help='Cancel statements running longer than this (e.g. 30s, 5min)')(command)
+    command = click.option('--retries', type=click.IntRange(min=0), default=3, show_default=True,
+                           help='Retry deadlocks, serialization failures, lock timeouts and '
+                                'dropped connections up to N times')(command)
+    return command
+
+
+def build_retry_policy(retries, statement_timeout, lock_timeout):
+    """RetryPolicy from the retry options, exits on an invalid timeout"""
+    from retry import RetryPolicy, parse_timeout
+    
+    try:
+        return RetryPolicy(retries=retries,
+                           statement_timeout=parse_timeout(statement_timeout),
+                           lock_timeout=parse_timeout(lock_timeout))
+    except ValueError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        sys.exit(1)
 
 
 @click.group()
-def cli():
+@click.option('--mode', type=click.Choice(['direct', 'session', 'transaction']),
+              help='Connect directly (port 5432) or through the session / transaction pooler '
+                   '(overrides SQL_RUNNER_CONNECTION_MODE)')
+def cli(mode):
     """Supabase SQL Runner - Execute SQL files against Supabase database"""
-    pass
+    if mode:
+        # Read by config.load_env_config for every target
+        os.environ["SQL_RUNNER_CONNECTION_MODE"] = mode
 
 
 @cli.command()
@@ -27,15 +69,58 @@ def cli():
 @click.option('--stop-on-error/--no-stop-on-error', default=True,
               help='Stop execution when an error occurs')
 @click.option('--verbose', '-v', is_flag=True, help='Verbose output')
-def run(sql_file, stop_on_error, verbose):
+@click.option('--quiet', '-q', 'output', flag_value='quiet',
+              help='Only print failing statements')
+@click.option('--progress', 'output', flag_value='progress',
+              help='Show one progress bar instead of per-statement output')
+@click.option('--jsonl', type=click.File('w'),
+              help="Write one JSON record per statement to this file ('-' for stdout)")
+@click.option('--batch', 'batch_size', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Send up to N consecutive INSERT/UPDATE/DELETE statements per round trip')
+@click.option('--resume', is_flag=True,
+              help='Skip the statements committed by the previous run of this file')
+@click.option('--targets', '-t',
+              help="Comma-separated connection profiles to run against concurrently "
+                   "('default' is .env.local, NAME is .env.NAME)")
+@click.option('--profile', is_flag=True,
+              help='Run SELECT/INSERT/UPDATE/DELETE under EXPLAIN ANALYZE and keep their plans')
+@click.option('--profile-match', metavar='REGEX',
+              help='Only profile statements matching this pattern (implies --profile)')
+@retry_options
+def run(sql_file, stop_on_error, verbose, output, jsonl, batch_size, resume, targets,
+        profile, profile_match, retries, statement_timeout, lock_timeout):
     """Execute a SQL file against Supabase database"""
     if not os.path.exists(sql_file):
         console.print(f"[red]❌ File not found: {sql_file}[/red]")
         sys.exit(1)
     
+    retry_policy = build_retry_policy(retries, statement_timeout, lock_timeout)
+    
+    if jsonl is not None and jsonl.name == '<stdout>':
+        # jsonl already holds the real stdout; send every other print (config
+        # loading, rich output) to stderr so the JSON stream stays clean
+        sys.stdout = sys.stderr
+        output = output or 'quiet'
+    
+    if batch_size > 1 and not output:
+        # Batches are not rendered statement by statement
+        output = 'progress'
+    
+    profile = profile or bool(profile_match)
+    if targets:
+        if jsonl is not None or profile:
+            console.print("[red]❌ --jsonl and --profile cannot be combined with --targets[/red]")
+            sys.exit(1)
+        names = list(dict.fromkeys(t.strip() for t in targets.split(',') if t.strip()))
+        run_on_targets(sql_file, names, stop_on_error, batch_size, resume, retry_policy)
+        return
+    
     console.print(f"[bold green]🚀 Supabase SQL Runner[/bold green]")
     console.print(f"   File: [cyan]{sql_file}[/cyan]")
     console.print(f"   Stop on error: {'Yes' if stop_on_error else 'No'}")
+    if resume:
+        console.print("   Resume: Yes")
+    _print_retry_policy(retry_policy)
     console.print()
     
     # Load configuration
@@ -46,9 +131,24 @@ def run(sql_file, stop_on_error, verbose):
         sys.exit(1)
     
     # Execute the SQL file
+    from executor import SQLExecutor
+    
+    profiler = None
+    if profile:
+        from profiler import PlanStore, Profiler
+        profiler = Profiler(PlanStore(scope=config.project_ref), match=profile_match)
+    
     try:
-        with SQLExecutor(config) as executor:
-            results = executor.execute_file(sql_file, stop_on_error=stop_on_error)
+        with SQLExecutor(config, profiler=profiler, retry_policy=retry_policy) as executor:
+            results = executor.execute_file(sql_file, stop_on_error=stop_on_error,
+                                            output=output or 'verbose', jsonl=jsonl,
+                                            batch_size=batch_size, checkpoint=True,
+                                            resume=resume)
+            
+            if profiler is not None:
+                from profiler import display_captures
+                display_captures(profiler.captures, console)
+                console.print(f"[dim]   Plans stored in {profiler.store.path}[/dim]")
             
             # Determine exit code
             all_success = all(r.result.success for r in results)
@@ -64,6 +164,48 @@ def run(sql_file, stop_on_error, verbose):
         sys.exit(1)
 
 
+def _print_retry_policy(policy):
+    timeouts = [f"{name}={value}" for name, value in policy.session_settings().items()]
+    console.print(f"   Retries: {policy.retries}" + (f", {', '.join(timeouts)}" if timeouts else ""))
+
+
+def run_on_targets(sql_file, names, stop_on_error, batch_size, resume, retry_policy=None):
+    """run --targets: execute the file against every profile concurrently"""
+    import time
+    
+    console.print(f"[bold green]🚀 Supabase SQL Runner[/bold green]")
+    console.print(f"   File: [cyan]{sql_file}[/cyan]")
+    console.print(f"   Targets: {', '.join(names)}")
+    console.print(f"   Stop on error: {'Yes' if stop_on_error else 'No'}")
+    if resume:
+        console.print("   Resume: Yes")
+    if retry_policy is not None:
+        _print_retry_policy(retry_policy)
+    console.print()
+    
+    configs = []
+    for name in names:
+        config = get_config(target=name)
+        if not config:
+            console.print(f"[red]❌ Failed to load configuration for target '{name}'[/red]")
+            sys.exit(1)
+        configs.append(config)
+    console.print()
+    
+    from fanout import display_target_summary, run_targets
+    
+    start = time.time()
+    outcomes = run_targets(configs, sql_file, stop_on_error=stop_on_error,
+                           batch_size=batch_size, resume=resume, retry_policy=retry_policy)
+    display_target_summary(outcomes, time.time() - start)
+    
+    failed = [o.target for o in outcomes if not o.success]
+    if failed:
+        console.print(f"\n[bold yellow]⚠️  Failed on: {', '.join(failed)}[/bold yellow]")
+        sys.exit(1)
+    console.print("\n[bold green]✅ All targets executed successfully![/bold green]")
+
+
 @cli.command()
 def test():
     """Test database connection"""
@@ -74,6 +216,8 @@ def test():
         console.print("[red]❌ Failed to load configuration[/red]")
         sys.exit(1)
     
+    from executor import SQLExecutor
+    
     try:
         with SQLExecutor(config) as executor:
             # Connection is established in __init__
@@ -93,16 +237,40 @@ def test():
 
 
 @cli.command()
-@click.argument('sql', required=False)
-def query(sql):
-    """Execute a single SQL query"""
+@click.argument('sql', nargs=-1)
+@click.option('--out', '-o', 'out_paths', type=click.Path(dir_okay=False), multiple=True,
+              help='Stream the result rows to a file (.csv, .ndjson/.jsonl or .parquet); '
+                   'repeat once per query')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson', 'parquet']),
+              help='Export format (default: from the --out extension)')
+@click.option('--itersize', type=click.IntRange(min=1), default=2000, show_default=True,
+              help='Rows fetched per round trip from the server-side cursor')
+@click.option('--backend', type=click.Choice(['sync', 'async']), default='sync', show_default=True,
+              help='sync: psycopg2, one query at a time; async: asyncpg pool, '
+                   'queries run concurrently in read-only transactions')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Pooled connections for --backend async')
+def query(sql, out_paths, fmt, itersize, backend, jobs):
+    """Execute one or more SQL queries
+    
+    Plain reads (SELECT, VALUES, TABLE, read-only WITH) are streamed through
+    a server-side cursor, so large results are never held in memory. Other
+    statements exported with --out (INSERT ... RETURNING, SHOW, EXPLAIN) are
+    fetched in chunks from a client-side cursor.
+    """
     if not sql:
         console.print("[yellow]⚠️  No SQL provided. Please provide a SQL query.[/yellow]")
         console.print("   Example: python run.py query 'SELECT NOW();'")
         return
     
+    if out_paths and len(out_paths) != len(sql):
+        console.print(f"[red]❌ Got {len(sql)} query(s) but {len(out_paths)} --out file(s); "
+                      f"give one --out per query or none[/red]")
+        sys.exit(1)
+    
     console.print(f"[bold green]🔍 Executing SQL Query[/bold green]")
-    console.print(f"   Query: [cyan]{sql[:100]}...[/cyan]" if len(sql) > 100 else f"   Query: [cyan]{sql}[/cyan]")
+    for text in sql:
+        console.print(f"   Query: [cyan]{text[:100]}...[/cyan]" if len(text) > 100 else f"   Query: [cyan]{text}[/cyan]")
     console.print()
     
     config = get_config()
@@ -110,30 +278,55 @@ def query(sql):
         console.print("[red]❌ Failed to load configuration[/red]")
         sys.exit(1)
     
+    outs = list(out_paths) or [None] * len(sql)
     try:
-        with SQLExecutor(config) as executor:
-            result = executor.execute_sql(sql)
+        if backend == 'async':
+            import asyncio
+            from async_executor import AsyncSQLExecutor
             
-            if result.success:
-                console.print(f"[green]✅ Query executed successfully[/green]")
-                console.print(f"   {result.message}")
-                if result.execution_time:
-                    console.print(f"   Execution time: {result.execution_time:.3f}s")
-            else:
-                console.print(f"[red]❌ Query failed: {result.error}[/red]")
-                sys.exit(1)
-                
+            async def run_queries():
+                async with AsyncSQLExecutor(config, pool_size=min(jobs, len(sql))) as executor:
+                    return await executor.execute_queries(sql, outs, fmt=fmt, itersize=itersize)
+            
+            results = [r.result for r in asyncio.run(run_queries())]
+        else:
+            from executor import SQLExecutor, can_declare_cursor
+            
+            results = []
+            with SQLExecutor(config) as executor:
+                for text, out_path in zip(sql, outs):
+                    if out_path or can_declare_cursor(text):
+                        results.append(executor.stream_query(text, out_path=out_path, fmt=fmt, itersize=itersize))
+                    else:
+                        results.append(executor.execute_sql(text))
     except Exception as e:
         console.print(f"[red]❌ Execution failed: {e}[/red]")
         sys.exit(1)
+    
+    failed = 0
+    for i, result in enumerate(results, 1):
+        prefix = f"[{i}/{len(results)}] " if len(results) > 1 else ""
+        if result.success:
+            console.print(f"[green]✅ {prefix}Query executed successfully[/green]")
+            console.print(f"   {result.message}")
+            if result.execution_time:
+                console.print(f"   Execution time: {result.execution_time:.3f}s")
+        else:
+            failed += 1
+            console.print(f"[red]❌ {prefix}Query failed: {result.error}[/red]")
+    if failed:
+        sys.exit(1)
 
 
 @cli.command()
-def config():
+@click.option('--refresh', is_flag=True,
+              help='Ignore the cached connection info and resolve it again')
+@click.option('--target', '-t', help="Connection profile to show (default: .env.local)")
+def config(refresh, target):
     """Show current configuration"""
     console.print("[bold green]⚙️  Current Configuration[/bold green]")
     
-    config = get_config()
+    config = get_config(refresh=refresh, target=target)
     if not config:
         console.print("[red]❌ Failed to load configuration[/red]")
         sys.exit(1)
@@ -144,15 +337,35 @@ def config():
     table.add_column("Key", style="bold cyan")
     table.add_column("Value", style="white")
     
+    if target:
+        table.add_row("Target", target)
     table.add_row("Project Reference", config.project_ref)
     table.add_row("Supabase URL", config.supabase_url)
     table.add_row("Database Host", config.database_host or "[yellow]Not configured[/yellow]")
-    table.add_row("Database Port", str(config.database_port))
+    table.add_row("Connection Mode", config.connection_mode)
+    if not config.dsn:
+        try:
+            host, port, user = config.endpoint()
+            if host != config.database_host:
+                table.add_row("Pooler Host", host)
+            table.add_row("Database Port", str(port))
+            table.add_row("Database User", user)
+        except ValueError as e:
+            table.add_row("Database Port", f"[yellow]{e}[/yellow]")
     table.add_row("Database Name", config.database_name)
-    table.add_row("Database User", f"{config.database_user}.{config.project_ref}")
     table.add_row("Region", config.region or "[yellow]Unknown[/yellow]")
+    if config.source == "cache":
+        from datetime import datetime
+        cached_at = datetime.fromtimestamp(config.cached_at).strftime('%Y-%m-%d %H:%M')
+        table.add_row("Source", f"cache ({cached_at}, use --refresh to update)")
+    else:
+        table.add_row("Source", config.source or "[yellow]Unknown[/yellow]")
     
-    if config.database_host and config.database_password:
+    if config.dsn:
+        from urllib.parse import urlparse
+        password = urlparse(config.dsn).password
+        table.add_row("Connection String", config.dsn.replace(password, "***") if password else config.dsn)
+    elif config.database_host and config.database_password:
         conn_str = config.get_connection_string()
         if conn_str:
             # Hide password in display
@@ -163,6 +376,8 @@ def config():
     
     # Test connection
     console.print("\n[bold]🔧 Testing connection...[/bold]")
+    from executor import SQLExecutor
+    
     try:
         with SQLExecutor(config) as executor:
             console.print("[green]✅ Connection successful![/green]")
@@ -179,6 +394,8 @@ def migrations(migration_dir):
     console.print(f"   Directory: [cyan]{migration_dir}[/cyan]")
     console.print()
     
+    from pathlib import Path
+    
     # Find all SQL files in the migration directory
     migration_path = Path(migration_dir)
     sql_files = list(migration_path.glob('*.sql'))
@@ -212,73 +429,311 @@ def migrations(migration_dir):
     console.print(table)
     console.print(f"\nTotal: [bold]{len(sql_files)}[/bold] migration files")
     
-    # Check if we can execute them
-    config = get_config()
-    if config:
+    # Check if we can execute them (reads .env.local only, no connection lookup)
+    if load_env_config():
         console.print("\n[bold]💡 Tip:[/bold] Run a migration with:")
         console.print(f"   python run.py run {migration_dir}/20260136_fix_security_definer_views.sql")
 
 
 @cli.command()
-@click.argument('migration_dir', type=click.Path(exists=True), 
-                default='supabase/migrations')
-def run_all(migrations_dir):
-    """Run all migrations in order (use with caution!)"""
+@click.option('--timing', is_flag=True, help='Show the time of every statement (\\timing)')
+@click.option('--page-rows', type=click.IntRange(min=0),
+              help='Rows per page, 0 for no paging (default: terminal height)')
+@click.option('--target', '-t', help="Connection profile (default: .env.local)")
+def shell(timing, page_rows, target):
+    """Interactive SQL shell over one persistent connection"""
+    config = get_config(target=target)
+    if not config:
+        console.print("[red]❌ Failed to load configuration[/red]")
+        sys.exit(1)
+    
+    from executor import SQLExecutor
+    from shell import SQLShell
+    
+    try:
+        with SQLExecutor(config) as executor:
+            SQLShell(executor, timing=timing, page_rows=page_rows).run()
+    except Exception as e:
+        console.print(f"[red]❌ Shell failed: {e}[/red]")
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--limit', '-n', type=click.IntRange(min=1), default=20, show_default=True,
+              help='Statements to show')
+@click.option('--target', '-t', help="Connection profile (default: .env.local)")
+def plans(limit, target):
+    """Show statements profiled with run --profile"""
+    console.print("[bold green]🔬 Profiled Statements[/bold green]")
+    
+    # Only the project ref is needed to pick the plan history
+    config = load_env_config(target=target)
+    if not config:
+        sys.exit(1)
+    
+    from datetime import datetime
+    from rich.table import Table
+    from profiler import PlanStore
+    
+    store = PlanStore(scope=config.project_ref)
+    rows = store.history(limit)
+    store.close()
+    console.print(f"   Store: [cyan]{store.path}[/cyan]")
+    if not rows:
+        console.print("[yellow]⚠️  Nothing profiled yet, use 'run --profile'[/yellow]")
+        return
+    
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Fingerprint", style="dim")
+    table.add_column("Statement", style="cyan", overflow="fold")
+    table.add_column("Runs", justify="right")
+    table.add_column("Plans", justify="right")
+    table.add_column("Last time (ms)", justify="right")
+    table.add_column("Last buffers", justify="right")
+    table.add_column("Last run")
+    for row in rows:
+        table.add_row(
+            row["fingerprint"],
+            row["query"][:80] + ("..." if len(row["query"]) > 80 else ""),
+            str(row["runs"]),
+            f"[yellow]{row['plans']}[/yellow]" if row["plans"] > 1 else str(row["plans"]),
+            f"{row['execution_ms']:.1f}",
+            f"{row['shared_hit'] + row['shared_read']:,}",
+            datetime.fromtimestamp(row["captured_at"]).strftime('%Y-%m-%d %H:%M'),
+        )
+    console.print(table)
+
+
+@cli.command()
+@click.argument('sql_files', nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option('--command', '-c', 'shell_command',
+              help='Shell command to run as the workload (e.g. a test suite hitting the API)')
+@click.option('--repeat', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Run the SQL files this many times')
+@click.option('--sort', type=click.Choice(['total', 'calls', 'mean', 'rows']), default='total',
+              show_default=True, help='Order of the top statements')
+@click.option('--top', '-n', type=click.IntRange(min=1), default=10, show_default=True,
+              help='Statements to show')
+@click.option('--match', metavar='REGEX', help='Only report statements matching this pattern')
+@click.option('--json', 'json_out', type=click.File('w'), help="Write the report as JSON ('-' for stdout)")
+def stats(sql_files, shell_command, repeat, sort, top, match, json_out):
+    """Report the hot statements of a workload from pg_stat_statements
+
+    Snapshots pg_stat_statements, runs SQL_FILES and/or --command (or waits
+    for Enter when neither is given, e.g. while clicking through the
+    dashboard) and reports what the database executed in between.
+    """
+    import json
+    import subprocess
+
+    if json_out is not None and json_out.name == '<stdout>':
+        sys.stdout = sys.stderr
+
+    config = get_config()
+    if not config:
+        console.print("[red]❌ Failed to load Supabase configuration[/red]")
+        sys.exit(1)
+
+    from executor import SQLExecutor
+    from stats import (StatsUnavailable, diff_snapshots, display_latency, display_statements,
+                       group_timings, report, stats_relation, take_snapshot)
+
+    workload_ok = True
+    results = []
+    try:
+        with SQLExecutor(config, check_version=False) as executor:
+            with executor.get_cursor() as cur:
+                relation = stats_relation(cur)
+                before = take_snapshot(cur, relation)
+            console.print(f"📸 Snapshot of [cyan]{relation}[/cyan]: {len(before):,} statement(s)")
+
+            for _ in range(repeat):
+                for sql_file in sql_files:
+                    file_results = executor.execute_file(sql_file, output='quiet')
+                    results.extend(file_results)
+                    if not all(r.result.success for r in file_results):
+                        workload_ok = False
+            if sql_files:
+                console.print(f"▶️  Ran {len(sql_files)} file(s) x{repeat}: {len(results):,} statement(s)")
+
+            if shell_command:
+                console.print(f"▶️  [bold]{shell_command}[/bold]")
+                returncode = subprocess.run(shell_command, shell=True).returncode
+                if returncode != 0:
+                    workload_ok = False
+                    console.print(f"[yellow]⚠️  Command exited with {returncode}[/yellow]")
+            elif not sql_files:
+                click.pause("⏸️  Run the workload now, then press any key to take the second snapshot...")
+
+            with executor.get_cursor() as cur:
+                after = take_snapshot(cur, relation)
+    except StatsUnavailable as e:
+        console.print(f"[red]❌ {e}[/red]")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[red]❌ Stats failed: {e}[/red]")
+        sys.exit(1)
+
+    changes = diff_snapshots(before, after, match=match)
+    groups = group_timings(results, match=match)
+    display_statements(changes, sort, top, console)
+    if groups:
+        display_latency(groups, top, console)
+    console.print("[dim]   pg_stat_statements covers every session of the database, "
+                  "not only this workload[/dim]")
+
+    if json_out is not None:
+        json.dump(report(changes, groups), json_out, indent=2)
+        json_out.write("\n")
+
+    if not workload_ok:
+        console.print("\n[bold yellow]⚠️  The workload had failures[/bold yellow]")
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument('migrations_dirs', nargs=-1, type=click.Path(exists=True, file_okay=False))
+@click.option('--yes', '-y', is_flag=True, help='Do not ask for confirmation')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Apply independent migrations concurrently over up to N connections')
+@retry_options
+def run_all(migrations_dirs, yes, jobs, retries, statement_timeout, lock_timeout):
+    """Run all pending migrations in order (use with caution!)
+    
+    Directories are applied in the order given, files within a directory by
+    filename. Defaults to supabase/migrations.
+    """
+    from ledger import LEDGER_TABLE, MigrationRunner, discover_migrations
+    
+    migrations_dirs = migrations_dirs or ('supabase/migrations',)
+    retry_policy = build_retry_policy(retries, statement_timeout, lock_timeout)
+    
     console.print(f"[bold yellow]⚠️  WARNING: Running all migrations[/bold yellow]")
-    console.print(f"   Directory: [cyan]{migrations_dir}[/cyan]")
+    for migrations_dir in migrations_dirs:
+        console.print(f"   Directory: [cyan]{migrations_dir}[/cyan]")
+    console.print(f"   Ledger: [cyan]{LEDGER_TABLE}[/cyan]")
+    console.print(f"   Jobs: {jobs}")
+    _print_retry_policy(retry_policy)
     console.print()
-    console.print("[yellow]This will execute ALL SQL files in the migration directory.")
-    console.print("Make sure you have backups and know what you're doing![/yellow]")
     
-    if not click.confirm("\nDo you want to continue?"):
-        console.print("[red]❌ Operation cancelled[/red]")
+    migrations = []
+    for migrations_dir in migrations_dirs:
+        if not os.path.isdir(migrations_dir):
+            console.print(f"[red]❌ Directory not found: {migrations_dir}[/red]")
+            sys.exit(1)
+        migrations.extend(discover_migrations(migrations_dir))
+    if not migrations:
+        console.print("[yellow]⚠️  No SQL migration files found[/yellow]")
         return
     
-    migration_path = Path(migrations_dir)
-    sql_files = list(migration_path.glob('*.sql'))
-    sql_files.sort(key=lambda x: x.name)
-    
     config = get_config()
     if not config:
         console.print("[red]❌ Failed to load configuration[/red]")
         sys.exit(1)
     
-    all_success = True
-    failed_files = []
+    from executor import SQLExecutor
     
-    for sql_file in sql_files:
-        console.print(f"\n{'='*60}")
-        console.print(f"[bold]Executing:[/bold] {sql_file.name}")
+    try:
+        with SQLExecutor(config, check_version=False, retry_policy=retry_policy) as executor:
+            runner = MigrationRunner(executor)
+            outcomes = runner.plan(migrations)
+            pending = [o for o in outcomes if o.status == "pending"]
         
-        try:
-            with SQLExecutor(config) as executor:
-                results = executor.execute_file(str(sql_file), stop_on_error=True)
-                
-                file_success = all(r.result.success for r in results)
-                if not file_success:
-                    all_success = False
-                    failed_files.append(sql_file.name)
+            for outcome in outcomes:
+                if outcome.status == "changed":
+                    console.print(f"[yellow]⚠️  {outcome.migration.name} changed since it was applied, "
+                                  f"skipping[/yellow]")
+        
+            if not pending:
+                console.print("[green]✅ Database is up to date, nothing to apply[/green]")
+            else:
+                console.print(f"[bold]{len(pending)}[/bold] pending migration(s):")
+                for outcome in pending:
+                    console.print(f"   - {outcome.migration.name}")
+                console.print()
+                console.print("[yellow]This will execute the pending SQL files listed above.")
+                console.print("Make sure you have backups and know what you're doing![/yellow]")
+            
+                if not yes and not click.confirm("\nDo you want to continue?"):
+                    console.print("[red]❌ Operation cancelled[/red]")
+                    return
+            
+                if jobs > 1:
+                    from scheduler import run_scheduled
                     
-        except Exception as e:
-            console.print(f"[red]❌ Failed to execute {sql_file.name}: {e}[/red]")
-            all_success = False
-            failed_files.append(sql_file.name)
+                    applied = run_scheduled(runner, config, [o.migration for o in pending], jobs)
+                    by_name = {o.migration.name: o for o in applied}
+                    outcomes = [by_name.get(o.migration.name, o) for o in outcomes]
+                else:
+                    for i, outcome in enumerate(outcomes):
+                        if outcome.status != "pending":
+                            continue
+                        console.print(f"\n{'='*60}")
+                        console.print(f"[bold]Executing:[/bold] {outcome.migration.name}")
+                        outcomes[i] = runner.apply(outcome.migration)
+                        if outcomes[i].status == "failed":
+                            console.print(f"[red]❌ Failed to execute {outcome.migration.name}: "
+                                          f"{outcomes[i].error}[/red]")
+                            break
+    except Exception as e:
+        console.print(f"[red]❌ Migration run failed: {e}[/red]")
+        sys.exit(1)
+    
+    _display_migration_summary(outcomes)
+    
+    if any(o.status == "failed" for o in outcomes):
+        sys.exit(1)
+    sys.exit(0)
+
+
+def _display_migration_summary(outcomes):
+    """Display per-file status and wall time of a migration run"""
+    from rich.table import Table
     
-    # Summary
     console.print(f"\n{'='*60}")
     console.print("[bold]📊 Migration Summary[/bold]")
-    console.print(f"   Total files: {len(sql_files)}")
-    console.print(f"   Successful: {len(sql_files) - len(failed_files)}")
-    console.print(f"   Failed: {len(failed_files)}")
     
-    if failed_files:
+    styles = {
+        "applied": "green",
+        "skipped": "dim",
+        "changed": "yellow",
+        "failed": "red",
+        "pending": "dim",
+    }
+    
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("File", style="cyan")
+    table.add_column("Status")
+    table.add_column("Wall Time", justify="right")
+    
+    for outcome in outcomes:
+        style = styles[outcome.status]
+        status = "not run" if outcome.status == "pending" else outcome.status
+        wall_time = f"{outcome.wall_time:.3f}s" if outcome.status in ("applied", "failed") else "-"
+        table.add_row(outcome.migration.name, f"[{style}]{status}[/{style}]", wall_time)
+    
+    console.print(table)
+    
+    counts = {}
+    for outcome in outcomes:
+        counts[outcome.status] = counts.get(outcome.status, 0) + 1
+    total_time = sum(o.wall_time for o in outcomes)
+    
+    console.print(f"   Total files: {len(outcomes)}")
+    console.print(f"   Applied: {counts.get('applied', 0)}")
+    console.print(f"   Skipped (already applied): {counts.get('skipped', 0)}")
+    if counts.get('changed'):
+        console.print(f"   Changed since applied: {counts['changed']}")
+    console.print(f"   Failed: {counts.get('failed', 0)}")
+    console.print(f"   Total wall time: {total_time:.3f}s")
+    
+    if counts.get('failed'):
         console.print(f"\n[red]❌ Failed migrations:[/red]")
-        for f in failed_files:
-            console.print(f"   - {f}")
-        sys.exit(1)
+        for outcome in outcomes:
+            if outcome.status == "failed":
+                console.print(f"   - {outcome.migration.name}")
     else:
-        console.print("\n[bold green]✅ All migrations executed successfully![/bold green]")
-        sys.exit(0)
+        console.print("\n[bold green]✅ All migrations are applied![/bold green]")
 
 
 if __name__ == "__main__":
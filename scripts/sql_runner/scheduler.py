@@ -0,0 +1,332 @@
+"""
+Dependency-aware migration scheduler for Supabase SQL Runner
+Extracts the relations each migration file touches, builds a DAG between
+files that conflict and applies independent files concurrently
+"""
+import queue
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from config import SupabaseConfig
+from executor import SQLExecutor, console
+from ledger import MigrationFile, MigrationOutcome, MigrationRunner
+from splitter import iter_file_statements
+
+_IDENT = r'(?:"[^"]+"|[A-Za-z_][\w$]*)'
+_NAME = rf"({_IDENT}(?:\s*\.\s*{_IDENT})*)"
+_NAME_LIST = rf"({_IDENT}(?:\s*\.\s*{_IDENT})*(?:\s*,\s*{_IDENT}(?:\s*\.\s*{_IDENT})*)*)"
+_OBJECT = r"(?:TABLE|(?:MATERIALIZED\s+)?VIEW|SEQUENCE|TYPE|DOMAIN|FUNCTION|PROCEDURE)"
+
+# Statements whose target relation is (re)defined or modified. Applied to the
+# whole statement, including function and DO bodies.
+_WRITE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    rf"\bCREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:GLOBAL|LOCAL)\s+)?(?:TEMP(?:ORARY)?\s+|UNLOGGED\s+)?"
+    rf"{_OBJECT}\s+(?:IF\s+NOT\s+EXISTS\s+)?{_NAME}",
+    rf"\bALTER\s+{_OBJECT}\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?{_NAME}",
+    rf"\bDROP\s+{_OBJECT}\s+(?:IF\s+EXISTS\s+)?{_NAME_LIST}",
+    rf"\bINSERT\s+INTO\s+{_NAME}",
+    rf"\bUPDATE\s+(?:ONLY\s+)?{_NAME}\s+(?:AS\s+)?(?:{_IDENT}\s+)?SET\b",
+    rf"\bDELETE\s+FROM\s+(?:ONLY\s+)?{_NAME}",
+    rf"\bTRUNCATE\s+(?:TABLE\s+)?(?:ONLY\s+)?{_NAME_LIST}",
+    rf"\bREFRESH\s+MATERIALIZED\s+VIEW\s+(?:CONCURRENTLY\s+)?{_NAME}",
+    rf"\b(?:CREATE|DROP|ALTER)\s+(?:UNIQUE\s+)?(?:POLICY|(?:CONSTRAINT\s+)?TRIGGER|INDEX|RULE)\b[^;]*?\bON\s+(?:ONLY\s+)?{_NAME}",
+    rf"\bCOMMENT\s+ON\s+{_OBJECT}\s+{_NAME}",
+    rf"\b(?:GRANT|REVOKE)\b[^;]*?\bON\s+(?:{_OBJECT}\s+)?{_NAME_LIST}(?:\s*\([^)]*\))?\s+(?:TO|FROM)\b",
+    rf"\bCREATE\s+SCHEMA\s+(?:IF\s+NOT\s+EXISTS\s+)?{_NAME}",
+)]
+_SCHEMA_PRIVILEGES = re.compile(
+    rf"\b(?:GRANT|REVOKE)\b[^;]*?\bON\s+SCHEMA\s+{_NAME_LIST}\s+(?:TO|FROM)\b", re.IGNORECASE)
+_COMMENT_ON_COLUMN = re.compile(rf"\bCOMMENT\s+ON\s+COLUMN\s+{_NAME}", re.IGNORECASE)
+_CREATE_FUNCTION = re.compile(
+    rf"\bCREATE\s+(?:OR\s+REPLACE\s+)?(?:FUNCTION|PROCEDURE)\s+{_NAME}", re.IGNORECASE)
+_CREATE_EXTENSION = re.compile(
+    rf"\bCREATE\s+EXTENSION\s+(?:IF\s+NOT\s+EXISTS\s+)?({_IDENT})", re.IGNORECASE)
+
+# Constructs whose effects cannot be read from the text
+_AMBIGUOUS_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"\bEXECUTE\s+(?!FUNCTION\b|PROCEDURE\b|ON\b)",   # dynamic SQL
+    r"\b(?:DROP|TRUNCATE)\b[^;]*?\bCASCADE\b",
+    r"\bON\s+ALL\s+(?:TABLES|SEQUENCES|FUNCTIONS|ROUTINES)\b",
+    r"\bALTER\s+DEFAULT\s+PRIVILEGES\b",
+    r"^\s*(?:SET|RESET)\s+(?:SESSION\s+|LOCAL\s+)?(?:ROLE|SESSION\s+AUTHORIZATION|search_path)\b",
+)]
+_KNOWN_COMMANDS = {
+    "CREATE", "ALTER", "DROP", "INSERT", "UPDATE", "DELETE", "SELECT", "WITH",
+    "GRANT", "REVOKE", "COMMENT", "BEGIN", "COMMIT", "END", "START", "DO",
+    "TRUNCATE", "REFRESH", "ANALYZE", "NOTIFY", "VALUES", "SET",
+}
+_DDL_DML_COMMANDS = {
+    "CREATE", "ALTER", "DROP", "INSERT", "UPDATE", "DELETE", "TRUNCATE",
+    "COMMENT", "GRANT", "REVOKE", "REFRESH",
+}
+
+# Functions provided by extensions the migrations rely on
+EXTENSION_FUNCTIONS = {
+    "uuid-ossp": {"uuid_generate_v1", "uuid_generate_v1mc", "uuid_generate_v3",
+                  "uuid_generate_v4", "uuid_generate_v5", "uuid_nil"},
+    "pgcrypto": {"crypt", "gen_salt", "digest", "hmac", "pgp_sym_encrypt",
+                 "pgp_sym_decrypt"},
+}
+
+_NOISE = re.compile(r"--[^\n]*|/\*.*?\*/|[eE]'(?:[^'\\]|\\.|'')*'|'(?:[^']|'')*'", re.DOTALL)
+_TOKENS = re.compile(_IDENT)
+_FIRST_WORD = re.compile(r"\s*([A-Za-z]+)")
+_CATALOG_SCHEMAS = {"pg_catalog", "information_schema"}
+
+
+@dataclass
+class MigrationDependencies:
+    """Relations a migration file touches"""
+    migration: MigrationFile
+    writes: Set[str] = field(default_factory=set)
+    tokens: Set[str] = field(default_factory=set)
+    functions: Dict[str, Set[str]] = field(default_factory=dict)
+    ambiguous: Optional[str] = None
+
+
+def _unquote(ident: str) -> str:
+    return ident[1:-1] if ident.startswith('"') else ident.lower()
+
+
+def _normalize(name: str) -> str:
+    """Reduce a possibly qualified, possibly quoted name to its bare object name"""
+    parts = _TOKENS.findall(name)
+    if len(parts) > 1 and _unquote(parts[0]) in _CATALOG_SCHEMAS:
+        return ""
+    return _unquote(parts[-1])
+
+
+def _split_names(names: str, prefix: str = "") -> List[str]:
+    normalized = (_normalize(part) for part in re.split(r"\s*,\s*", names))
+    return [prefix + n for n in normalized if n]
+
+
+def _statement_writes(text: str) -> Set[str]:
+    writes = set()
+    for pattern in _WRITE_PATTERNS:
+        for match in pattern.finditer(text):
+            writes.update(_split_names(match.group(1)))
+    for match in _SCHEMA_PRIVILEGES.finditer(text):
+        # Concurrent GRANTs on one schema collide, but they must not order
+        # every file that merely mentions the schema
+        writes.update(_split_names(match.group(1), prefix="schema:"))
+    for match in _COMMENT_ON_COLUMN.finditer(text):
+        parts = _TOKENS.findall(match.group(1))
+        if len(parts) >= 2:
+            writes.add(_unquote(parts[-2]))
+    for match in _CREATE_EXTENSION.finditer(text):
+        writes.add("extension:" + match.group(1).strip('"').lower())
+    return writes
+
+
+def analyze_migration(migration: MigrationFile) -> MigrationDependencies:
+    """Extract written relations, referenced identifiers and ambiguity of a file"""
+    deps = MigrationDependencies(migration=migration)
+    try:
+        statements = [stmt for stmt, _ in iter_file_statements(migration.path)]
+    except (OSError, UnicodeDecodeError) as e:
+        deps.ambiguous = f"unreadable: {e}"
+        return deps
+
+    for statement in statements:
+        text = _NOISE.sub(" ", statement)
+        first = _FIRST_WORD.match(text)
+        command = first.group(1).upper() if first else ""
+
+        writes = _statement_writes(text)
+        deps.writes.update(writes)
+        deps.tokens.update(_unquote(t) for t in _TOKENS.findall(text))
+
+        function = _CREATE_FUNCTION.search(text)
+        if function:
+            name = _normalize(function.group(1))
+            deps.functions[name] = writes - {name}
+
+        if deps.ambiguous:
+            continue
+        for pattern in _AMBIGUOUS_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                deps.ambiguous = f"contains {' '.join(match.group().split())[:60]}"
+                break
+        else:
+            if command and command not in _KNOWN_COMMANDS:
+                deps.ambiguous = f"unsupported statement {command}"
+            elif command in _DDL_DML_COMMANDS and not writes:
+                deps.ambiguous = f"unrecognized {command} target"
+
+    for extension, functions in EXTENSION_FUNCTIONS.items():
+        if deps.tokens & functions:
+            deps.tokens.add("extension:" + extension)
+    return deps
+
+
+class MigrationGraph:
+    """DAG of pending migrations; edges follow filename order between conflicting files"""
+
+    def __init__(self, dependencies: List[MigrationDependencies],
+                 installed_extensions: Optional[Set[str]] = None):
+        self.nodes = dependencies
+        # CREATE EXTENSION IF NOT EXISTS only races when the extension is missing
+        self.ignored = {"extension:" + name for name in (installed_extensions or ())}
+        self.parents: Dict[int, Set[int]] = {i: set() for i in range(len(dependencies))}
+        self.children: Dict[int, Set[int]] = {i: set() for i in range(len(dependencies))}
+        self._build()
+
+    def _build(self):
+        # Calls into functions defined by any pending file inherit the writes
+        # of the function body
+        functions: Dict[str, Set[str]] = {}
+        for deps in self.nodes:
+            for name, writes in deps.functions.items():
+                functions.setdefault(name, set()).update(writes)
+        effective_writes = []
+        for deps in self.nodes:
+            writes = deps.writes - self.ignored
+            for name in deps.tokens & functions.keys():
+                writes.update(functions[name])
+            effective_writes.append(writes)
+
+        for j, later in enumerate(self.nodes):
+            for i in range(j):
+                earlier = self.nodes[i]
+                if (earlier.ambiguous or later.ambiguous
+                        or effective_writes[i] & (effective_writes[j] | later.tokens)
+                        or effective_writes[j] & earlier.tokens):
+                    self.parents[j].add(i)
+                    self.children[i].add(j)
+
+    @property
+    def ambiguous(self) -> List[MigrationDependencies]:
+        return [deps for deps in self.nodes if deps.ambiguous]
+
+    def waves(self) -> List[List[int]]:
+        """Group nodes by longest path depth (what runs together with unlimited jobs)"""
+        depth: Dict[int, int] = {}
+        for j in range(len(self.nodes)):
+            depth[j] = max((depth[i] + 1 for i in self.parents[j]), default=0)
+        waves: List[List[int]] = []
+        for j, d in depth.items():
+            while len(waves) <= d:
+                waves.append([])
+            waves[d].append(j)
+        return waves
+
+
+class ExecutorPool:
+    """Bounded pool of SQLExecutor connections, opened lazily"""
+
+    def __init__(self, config: SupabaseConfig, size: int,
+                 initial: Optional[SQLExecutor] = None, retry_policy=None):
+        self.config = config
+        self.size = size
+        self.retry_policy = retry_policy
+        self._idle: "queue.Queue[SQLExecutor]" = queue.Queue()
+        self._all: List[SQLExecutor] = []
+        self._lock = threading.Lock()
+        self._opened = 0
+        if initial is not None:
+            self._opened = 1
+            self._all.append(initial)
+            self._idle.put(initial)
+
+    def acquire(self) -> SQLExecutor:
+        with self._lock:
+            create = self._idle.empty() and self._opened < self.size
+            if create:
+                self._opened += 1
+        if not create:
+            return self._idle.get()
+
+        try:
+            executor = SQLExecutor(self.config, check_version=False, retry_policy=self.retry_policy)
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+        with self._lock:
+            self._all.append(executor)
+        return executor
+
+    def release(self, executor: SQLExecutor):
+        self._idle.put(executor)
+
+    def close(self, keep: Optional[SQLExecutor] = None):
+        for executor in self._all:
+            if executor is not keep:
+                executor.close()
+
+
+def run_scheduled(runner: MigrationRunner, config: SupabaseConfig,
+                  migrations: List[MigrationFile], jobs: int) -> List[MigrationOutcome]:
+    """
+    Apply migrations respecting the dependency graph with up to ``jobs``
+    concurrent connections. Ready migrations are started in filename order;
+    after a failure no new migrations are started.
+    """
+    with runner.executor.get_cursor() as cur:
+        cur.execute("SELECT extname FROM pg_extension")
+        installed_extensions = {row[0] for row in cur.fetchall()}
+    runner.executor.connection.rollback()
+
+    graph = MigrationGraph([analyze_migration(m) for m in migrations], installed_extensions)
+    for deps in graph.ambiguous:
+        console.print(f"[dim]   serial barrier: {deps.migration.name} ({deps.ambiguous})[/dim]")
+    console.print(f"📐 Dependency graph: [bold]{len(migrations)}[/bold] file(s) in "
+                  f"[bold]{len(graph.waves())}[/bold] wave(s), jobs={jobs}")
+
+    pool = ExecutorPool(config, jobs, initial=runner.executor,
+                        retry_policy=runner.executor.retry_policy)
+    outcomes: Dict[int, MigrationOutcome] = {}
+    remaining = {j: set(parents) for j, parents in graph.parents.items()}
+    ready = sorted(j for j, parents in remaining.items() if not parents)
+    failed = False
+
+    def apply(index: int) -> MigrationOutcome:
+        try:
+            executor = pool.acquire()
+        except Exception as e:
+            return MigrationOutcome(migration=migrations[index], status="failed",
+                                    error=f"Connection failed: {e}")
+        try:
+            console.print(f"▶️  [bold]Executing:[/bold] {migrations[index].name}")
+            return runner.apply(migrations[index], executor=executor, quiet=True)
+        finally:
+            pool.release(executor)
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as threads:
+            running = {}
+            while ready or running:
+                while ready and not failed and len(running) < jobs:
+                    index = ready.pop(0)
+                    running[threads.submit(apply, index)] = index
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    outcome = future.result()
+                    outcomes[index] = outcome
+                    style = "green" if outcome.status == "applied" else "red"
+                    console.print(f"[{style}]{'✅' if outcome.status == 'applied' else '❌'} "
+                                  f"{outcome.migration.name}[/{style}] "
+                                  f"({outcome.wall_time:.3f}s)")
+                    if outcome.status != "applied":
+                        failed = True
+                        continue
+                    for child in graph.children[index]:
+                        remaining[child].discard(index)
+                        if not remaining[child]:
+                            ready.append(child)
+                    ready.sort()
+    finally:
+        pool.close(keep=runner.executor)
+
+    return [
+        outcomes.get(i, MigrationOutcome(migration=m, status="pending"))
+        for i, m in enumerate(migrations)
+    ]
@@ -0,0 +1,401 @@
+"""
+Interactive shell for Supabase SQL Runner
+Keeps one connection open between statements, with readline history,
+table/column completion from a cached catalog, multi-line input split by
+splitter.py and large results fetched and shown a page at a time
+"""
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psycopg2
+import psycopg2.extras
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR
+from rich.table import Table
+from rich.text import Text
+
+from executor import SQLExecutor, can_declare_cursor, console, get_query_type
+from splitter import split_complete
+
+try:
+    import readline
+except ImportError:  # not on Windows; the shell works without history and completion
+    readline = None
+
+HISTORY_PATH = os.environ.get(
+    "SQL_RUNNER_HISTORY",
+    os.path.join(os.path.expanduser("~"), ".cache", "sisinfops", "sql_runner_history"),
+)
+HISTORY_LENGTH = 2000
+
+CURSOR_NAME = "sql_runner_shell"
+_DECLARE = f"DECLARE {CURSOR_NAME} NO SCROLL CURSOR FOR "
+
+# The catalog is reloaded after statements that may change it
+_CATALOG_CHANGES = ("CREATE", "ALTER", "DROP")
+
+CATALOG_QUERY = """
+SELECT n.nspname, c.relname, c.relkind, a.attname, format_type(a.atttypid, a.atttypmod)
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+  AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+  AND n.nspname NOT LIKE 'pg\\_%'
+ORDER BY n.nspname, c.relname, a.attnum
+"""
+
+SQL_KEYWORDS = (
+    "SELECT", "FROM", "WHERE", "GROUP BY", "ORDER BY", "HAVING", "LIMIT", "OFFSET", "JOIN",
+    "LEFT JOIN", "INNER JOIN", "ON", "AND", "OR", "NOT", "NULL", "IS", "IN", "EXISTS",
+    "DISTINCT", "COUNT", "INSERT INTO", "VALUES", "UPDATE", "SET", "DELETE FROM", "RETURNING",
+    "WITH", "AS", "CASE", "WHEN", "THEN", "ELSE", "END", "BEGIN", "COMMIT", "ROLLBACK",
+    "EXPLAIN", "ANALYZE", "CREATE", "ALTER", "DROP", "TABLE", "INDEX", "VIEW",
+)
+_TABLE_CONTEXT = {"FROM", "JOIN", "UPDATE", "INTO", "TABLE", "\\D"}
+
+HELP = """\
+  \\q                quit (also Ctrl-D)
+  \\timing [on|off]  show the time of every statement
+  \\dt [pattern]     list tables and views
+  \\d NAME           describe a table or view
+  \\pager [N|off]    rows per page, or no paging
+  \\refresh          reload the table/column catalog
+  \\?                this help
+Statements run when terminated by ';'. Ctrl-C clears the input or cancels a running query."""
+
+
+class Catalog:
+    """Tables, views and their columns, cached for completion and \\d"""
+
+    def __init__(self):
+        self.relations: Dict[str, List[Tuple[str, str]]] = {}  # "schema.name" -> [(column, type)]
+        self.kinds: Dict[str, str] = {}
+
+    def load(self, cur):
+        relations: Dict[str, List[Tuple[str, str]]] = {}
+        kinds = {}
+        cur.execute(CATALOG_QUERY)
+        for schema, name, kind, column, type_name in cur.fetchall():
+            key = f"{schema}.{name}"
+            columns = relations.setdefault(key, [])
+            kinds[key] = kind
+            if column is not None:
+                columns.append((column, type_name))
+        self.relations, self.kinds = relations, kinds
+
+    def find(self, name: str) -> Optional[str]:
+        """Qualified key of a table name (unqualified names are looked up in public first)"""
+        if name in self.relations:
+            return name
+        if f"public.{name}" in self.relations:
+            return f"public.{name}"
+        return next((key for key in self.relations if key.split(".", 1)[1] == name), None)
+
+    def table_names(self) -> List[str]:
+        """Tables as they are usually written: public unqualified, the rest with their schema"""
+        return [key[len("public."):] if key.startswith("public.") else key for key in self.relations]
+
+    def complete(self, text: str, previous: str) -> List[str]:
+        """Candidates for the word being typed, given the word before it"""
+        if "." in text:
+            prefix, _, partial = text.rpartition(".")
+            key = self.find(prefix)
+            if key is not None:
+                return [f"{prefix}.{column}" for column, _ in self.relations[key]
+                        if column.startswith(partial)]
+            return [name for name in self.relations if name.startswith(text)]
+        tables = [name for name in self.table_names() if name.startswith(text)]
+        if previous.upper() in _TABLE_CONTEXT:
+            return tables
+        columns = sorted({column for columns in self.relations.values()
+                          for column, _ in columns if column.startswith(text)})
+        keywords = [k for k in SQL_KEYWORDS if k.startswith(text.upper())]
+        if text.islower():
+            keywords = [k.lower() for k in keywords]
+        return keywords + tables + columns
+
+
+class SQLShell:
+    """Read-eval-print loop over one SQLExecutor connection, in autocommit like psql"""
+
+    def __init__(self, executor: SQLExecutor, timing: bool = False,
+                 page_rows: Optional[int] = None):
+        self.executor = executor
+        self.timing = timing
+        self.page_rows = page_rows  # None: terminal height, 0: no paging
+        self.interactive = sys.stdin.isatty()
+        self.catalog = Catalog()
+        self._candidates: List[str] = []
+        # Lets Ctrl-C cancel a running query instead of waiting for it
+        psycopg2.extensions.set_wait_callback(psycopg2.extras.wait_select)
+
+    @property
+    def connection(self):
+        conn = self.executor.connection
+        if conn is None or conn.closed:
+            self.executor._connect()
+            conn = self.executor.connection
+        if not conn.autocommit:
+            conn.autocommit = True
+        return conn
+
+    def run(self):
+        self._load_catalog()
+        self._setup_readline()
+        console.print("[dim]Type \\? for help, \\q to quit[/dim]")
+        buffer = ""
+        history_mark = self._history_length()
+        try:
+            while True:
+                try:
+                    line = input(self._prompt(continuation=bool(buffer.strip())))
+                except KeyboardInterrupt:
+                    console.print()
+                    buffer = ""
+                    continue
+                except EOFError:
+                    console.print()
+                    break
+
+                if not buffer.strip() and line.strip().startswith("\\"):
+                    if not self.meta(line.strip()):
+                        break
+                    history_mark = self._history_length()
+                    continue
+                if not buffer.strip() and line.strip().lower() in ("quit", "exit"):
+                    break
+
+                buffer += line + "\n"
+                statements, buffer = split_complete(buffer)
+                if statements:
+                    self._squash_history(history_mark, statements)
+                for statement, _ in statements:
+                    self.execute(statement)
+                if not buffer.strip():
+                    buffer = ""
+                    history_mark = self._history_length()
+        finally:
+            self._save_history()
+
+    def _prompt(self, continuation: bool) -> str:
+        if not self.interactive:
+            return ""
+        status = self.connection.info.transaction_status
+        mark = "!" if status == TRANSACTION_STATUS_INERROR else "*" if status != TRANSACTION_STATUS_IDLE else ""
+        name = self.executor.config.database_name
+        return f"{name}{mark}{'-' if continuation else '='}> "
+
+    def execute(self, sql: str):
+        """Run one statement and show its rows or command status"""
+        conn = self.connection
+        start = time.perf_counter()
+        # Plain reads go through a server-side cursor so only the page on screen is fetched
+        paged = can_declare_cursor(sql)
+        try:
+            if paged:
+                self._execute_paged(conn, sql)
+            else:
+                with conn.cursor() as cur:
+                    cur.execute(sql)
+                    if cur.description:
+                        self._show_rows(lambda n: (cur.fetchmany(n), cur.description))
+                    else:
+                        console.print(cur.statusmessage)
+        except KeyboardInterrupt:
+            console.print("[yellow]Cancelled[/yellow]")
+        except psycopg2.Error as e:
+            # The server's own LINE context would show the DECLARE wrapper
+            console.print(Text.assemble(("ERROR ", "bold red"), e.diag.message_primary or str(e).strip()))
+            for label, text in (("DETAIL", e.diag.message_detail), ("HINT", e.diag.message_hint)):
+                if text:
+                    console.print(Text(f"{label}: {text}", style="dim"))
+            position = getattr(e.diag, "statement_position", None)
+            if position:
+                offset = len(_DECLARE) if paged else 0
+                self.executor._display_error_context(sql, int(position) - offset, 1)
+        if self.timing:
+            console.print(f"[dim]Time: {(time.perf_counter() - start) * 1000:.3f} ms[/dim]")
+        if (get_query_type(sql) in _CATALOG_CHANGES
+                and conn.info.transaction_status == TRANSACTION_STATUS_IDLE):
+            self._load_catalog(quiet=True)
+
+    def _execute_paged(self, conn, sql: str):
+        """DECLARE a cursor for the query and FETCH a page at a time"""
+        own_transaction = conn.info.transaction_status == TRANSACTION_STATUS_IDLE
+        with conn.cursor() as cur:
+            if own_transaction:
+                cur.execute("BEGIN")
+            try:
+                cur.execute(_DECLARE + sql.strip().rstrip(";"))
+
+                def fetch(n):
+                    cur.execute(f"FETCH FORWARD {n} FROM {CURSOR_NAME}")
+                    return cur.fetchall(), cur.description
+
+                self._show_rows(fetch)
+                cur.execute(f"CLOSE {CURSOR_NAME}")
+            except BaseException:
+                if own_transaction and not conn.closed:
+                    cur.execute("ROLLBACK")
+                raise
+            if own_transaction:
+                cur.execute("COMMIT")
+
+    def _show_rows(self, fetch: Callable[[int], Tuple[list, tuple]]):
+        """Render rows page by page, asking before each further page"""
+        page_rows = self.page_rows
+        if page_rows is None:
+            page_rows = max(10, console.height - 8) if self.interactive else 1000
+        fetch_rows = page_rows or 1000
+        total = 0
+        while True:
+            rows, description = fetch(fetch_rows)
+            if rows or total == 0:
+                self._render(description, rows)
+            total += len(rows)
+            if len(rows) < fetch_rows:
+                break
+            if page_rows and self.interactive and not self._more(total):
+                break
+        console.print(f"[dim]({total:,} row{'' if total == 1 else 's'})[/dim]")
+
+    def _render(self, description, rows):
+        table = Table(show_header=True, header_style="bold cyan")
+        for column in description:
+            table.add_column(column.name)
+        for row in rows:
+            table.add_row(*(Text("NULL", style="dim") if value is None else Text(str(value))
+                            for value in row))
+        console.print(table)
+
+    def _more(self, shown: int) -> bool:
+        try:
+            answer = input(f"-- {shown:,} rows shown, Enter for more, q to stop -- ")
+        except (EOFError, KeyboardInterrupt):
+            console.print()
+            return False
+        if answer and readline is not None:
+            # Pager answers are not statements
+            readline.remove_history_item(readline.get_current_history_length() - 1)
+        return answer.strip().lower() not in ("q", "quit")
+
+    def meta(self, line: str) -> bool:
+        """Handle a backslash command; False quits the shell"""
+        command, _, argument = line.partition(" ")
+        argument = argument.strip()
+        if command in ("\\q", "\\quit"):
+            return False
+        if command == "\\timing":
+            self.timing = {"on": True, "off": False}.get(argument.lower(), not self.timing)
+            console.print(f"Timing is {'on' if self.timing else 'off'}.")
+        elif command == "\\pager":
+            if argument.lower() == "off":
+                self.page_rows = 0
+            elif argument.isdigit():
+                self.page_rows = int(argument)
+            else:
+                self.page_rows = None
+            console.print(f"Paging: {'off' if self.page_rows == 0 else self.page_rows or 'terminal height'}")
+        elif command == "\\refresh":
+            self._load_catalog()
+        elif command == "\\dt":
+            self._list_tables(argument)
+        elif command == "\\d":
+            if argument:
+                self._describe(argument)
+            else:
+                self._list_tables("")
+        elif command in ("\\?", "\\h", "\\help"):
+            console.print(HELP, markup=False)
+        else:
+            console.print(f"[red]Unknown command {command}, \\? for help[/red]")
+        return True
+
+    def _list_tables(self, pattern: str):
+        regex = re.compile(pattern.replace("*", ".*"), re.IGNORECASE) if pattern else None
+        kinds = {"r": "table", "p": "table", "v": "view", "m": "materialized view", "f": "foreign table"}
+        table = Table(show_header=True, header_style="bold")
+        table.add_column("Name", style="cyan")
+        table.add_column("Type")
+        table.add_column("Columns", justify="right")
+        for key, columns in self.catalog.relations.items():
+            if regex is None or regex.search(key):
+                table.add_row(key, kinds.get(self.catalog.kinds[key], ""), str(len(columns)))
+        console.print(table)
+
+    def _describe(self, name: str):
+        key = self.catalog.find(name)
+        if key is None:
+            console.print(f"[red]Did not find any relation named \"{name}\" (\\refresh after changes)[/red]")
+            return
+        table = Table(title=key, show_header=True, header_style="bold")
+        table.add_column("Column", style="cyan")
+        table.add_column("Type")
+        for column, type_name in self.catalog.relations[key]:
+            table.add_row(column, type_name)
+        console.print(table)
+
+    def _load_catalog(self, quiet: bool = False):
+        conn = self.connection
+        if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            console.print("[yellow]Finish the open transaction before reloading the catalog[/yellow]")
+            return
+        start = time.perf_counter()
+        try:
+            with conn.cursor() as cur:
+                self.catalog.load(cur)
+        except psycopg2.Error as e:
+            console.print(f"[yellow]⚠️  Could not load the catalog for completion: {e}[/yellow]")
+            return
+        if not quiet:
+            console.print(f"[dim]📚 Catalog: {len(self.catalog.relations)} tables/views "
+                          f"({(time.perf_counter() - start) * 1000:.0f} ms)[/dim]")
+
+    def _setup_readline(self):
+        if readline is None or not self.interactive:
+            return
+        try:
+            readline.read_history_file(HISTORY_PATH)
+        except OSError:
+            pass
+        readline.set_history_length(HISTORY_LENGTH)
+        readline.set_completer_delims(" \t\n(),;=<>'\"")
+        readline.set_completer(self._complete)
+        if "libedit" in (readline.__doc__ or ""):
+            readline.parse_and_bind("bind ^I rl_complete")
+        else:
+            readline.parse_and_bind("tab: complete")
+
+    def _complete(self, text: str, state: int) -> Optional[str]:
+        if state == 0:
+            before = readline.get_line_buffer()[:readline.get_begidx()].split()
+            self._candidates = self.catalog.complete(text, before[-1] if before else "")
+        return self._candidates[state] if state < len(self._candidates) else None
+
+    def _history_length(self) -> int:
+        if readline is None or not self.interactive:
+            return 0
+        return readline.get_current_history_length()
+
+    def _squash_history(self, mark: int, statements: List[Tuple[str, int]]):
+        """Keep a multi-line statement as one history entry instead of one per line"""
+        if readline is None or not self.interactive:
+            return
+        if readline.get_current_history_length() - mark <= 1:
+            return
+        for position in range(readline.get_current_history_length() - 1, mark - 1, -1):
+            readline.remove_history_item(position)
+        for statement, _ in statements:
+            readline.add_history(" ".join(statement.split()))
+
+    def _save_history(self):
+        if readline is None or not self.interactive:
+            return
+        try:
+            os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+            readline.write_history_file(HISTORY_PATH)
+        except OSError:
+            pass
@@ -0,0 +1,308 @@
+"""
+Incremental SQL statement splitter for Supabase SQL Runner
+Reads SQL from a file object in chunks and yields statements lazily,
+following the PostgreSQL lexer rules for quoting and comments
+"""
+import io
+import re
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+_TAG = r"(?:[^\W\d]\w*)?"
+
+# Everything that cannot end a statement or open a multi-line construct:
+# plain text, line comments, complete standard strings and quoted identifiers
+# (a doubled quote reads as two adjacent literals) and dollar signs that do
+# not start a dollar quote. Leading whitespace and comments are matched
+# outside the "text" group so the caller can tell whether the statement has
+# real content yet.
+_PLAIN = re.compile(
+    r"""
+    \s*(?:--[^\n]*\s*)*
+    (?P<text>
+        [^;'"\-/$]*
+        (?:
+            (?: (?<![eE])'[^']*'
+              | "[^"]*"
+              | --[^\n]*
+              | -
+              | /(?!\*)
+              | \$(?<=[\w$]\$)
+              | \$(?!""" + _TAG + r"""\$)
+            )
+            [^;'"\-/$]*
+        )*
+    )
+    """,
+    re.VERBOSE,
+)
+# Tokens the plain scan stops at, matched at the stop position.
+_TOKEN = re.compile(
+    r"""
+      (?P<block_comment>/\*)
+    | (?P<estring>(?<=[eE])(?<![\w$][eE])')
+    | (?P<dollar>\$""" + _TAG + r"""\$)
+    | (?P<quote>['"])
+    """,
+    re.VERBOSE,
+)
+# Start of a comment, literal or quoted identifier inside one statement
+_LITERAL_START = re.compile(
+    r"""
+      (?P<line_comment>--)
+    | (?P<block_comment>/\*)
+    | (?P<estring>(?<![\w$])[eE]')
+    | (?P<dollar>(?<![\w$])\$""" + _TAG + r"""\$)
+    | (?P<quote>['"])
+    """,
+    re.VERBOSE,
+)
+_NON_SPACE = re.compile(r"\S")
+# Statements from the splitter keep their leading comments
+_LEADING_COMMENTS = re.compile(r"^(?:\s+|--[^\n]*|/\*.*?\*/)*", re.DOTALL)
+# Row-modifying keywords: INSERT/UPDATE/DELETE/MERGE, also inside a WITH,
+# and SELECT ... INTO
+_WRITES = re.compile(r"\b(?:insert|update|delete|merge|into)\b", re.IGNORECASE)
+_BLOCK_STOP = re.compile(r"/\*|\*/")
+_ESCAPE_STOP = re.compile(r"[\\']")
+
+# Scanner states
+_NORMAL = 0
+_QUOTED = 1       # '...' or "..." (standard conforming, doubled quote escapes)
+_ESCAPED = 2      # E'...' (backslash escapes)
+_DOLLAR = 3       # $tag$...$tag$
+_BLOCK = 4        # /* ... */, nestable
+
+
+def iter_statements(stream: TextIO,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    tail: Optional[List[str]] = None) -> Iterator[Tuple[str, int]]:
+    """
+    Lazily split SQL read from ``stream`` into statements
+    Yields (statement, line_number) tuples where line_number is the 1-based
+    line of the first character of the statement (leading comments included).
+    Statements made only of comments and whitespace are dropped. When ``tail``
+    is a list, an unterminated last statement (or open comment) is appended
+    to it instead of being yielded.
+    """
+    buf = ""
+    eof = False
+    pos = 0             # scan position in buf
+    start = 0           # start of the current statement in buf
+    line = 1            # line number of buf[line_pos]
+    line_pos = 0
+    significant = False
+    state = _NORMAL
+    quote = ""          # closing quote char (_QUOTED) or dollar tag (_DOLLAR)
+    depth = 0           # block comment nesting level
+    plain_match = _PLAIN.match
+    token_match = _TOKEN.match
+
+    while True:
+        if eof:
+            limit = len(buf)
+        else:
+            # No token spans a newline, so everything up to the last newline
+            # can be scanned without knowing what the next chunk holds.
+            limit = buf.rfind("\n", pos) + 1
+            if limit <= pos:
+                chunk = stream.read(max(chunk_size, len(buf) - start))
+                if not chunk:
+                    eof = True
+                    continue
+                line += buf.count("\n", line_pos, start)
+                buf = buf[start:] + chunk
+                pos -= start
+                start = line_pos = 0
+                continue
+
+        while pos < limit:
+            if state == _NORMAL:
+                m = plain_match(buf, pos, limit)
+                pos = m.end()
+                if pos > m.start(1):
+                    significant = True
+                if pos >= limit:
+                    break
+
+                if buf[pos] == ";":
+                    pos += 1
+                    if significant:
+                        first = _NON_SPACE.search(buf, start, pos).start()
+                        line += buf.count("\n", line_pos, first)
+                        line_pos = first
+                        yield buf[first:pos], line
+                    start = pos
+                    significant = False
+                    continue
+
+                m = token_match(buf, pos, limit)
+                if m is None:
+                    # Not expected; treat the character as plain text.
+                    significant = True
+                    pos += 1
+                    continue
+
+                kind = m.lastgroup
+                pos = m.end()
+                if kind == "block_comment":
+                    state, depth = _BLOCK, 1
+                else:
+                    significant = True
+                    if kind == "estring":
+                        state = _ESCAPED
+                    else:
+                        state, quote = (_DOLLAR if kind == "dollar" else _QUOTED), m.group()
+
+            elif state == _QUOTED:
+                i = buf.find(quote, pos, limit)
+                if i < 0:
+                    pos = limit
+                elif buf.startswith(quote, i + 1, limit):
+                    pos = i + 2
+                else:
+                    pos = i + 1
+                    state = _NORMAL
+
+            elif state == _ESCAPED:
+                m = _ESCAPE_STOP.search(buf, pos, limit)
+                if m is None:
+                    pos = limit
+                elif m.group() == "\\":
+                    pos = min(m.end() + 1, limit)
+                elif buf.startswith("'", m.end(), limit):
+                    pos = m.end() + 1
+                else:
+                    pos = m.end()
+                    state = _NORMAL
+
+            elif state == _DOLLAR:
+                i = buf.find(quote, pos, limit)
+                if i < 0:
+                    pos = limit
+                else:
+                    pos = i + len(quote)
+                    state = _NORMAL
+
+            else:  # _BLOCK
+                m = _BLOCK_STOP.search(buf, pos, limit)
+                if m is None:
+                    pos = limit
+                else:
+                    pos = m.end()
+                    depth += 1 if m.group() == "/*" else -1
+                    if depth == 0:
+                        state = _NORMAL
+
+        if eof:
+            break
+
+    if tail is not None:
+        if significant or state != _NORMAL:
+            tail.append(buf[start:])
+        return
+
+    # Trailing statement without a terminating semicolon. An unterminated
+    # literal or comment is passed through so the server reports it.
+    if significant or state not in (_NORMAL, _BLOCK):
+        tail = buf[start:].rstrip()
+        found = _NON_SPACE.search(tail)
+        if found:
+            line += buf.count("\n", line_pos, start + found.start())
+            yield tail[found.start():], line
+
+
+def mask_literals(sql: str) -> str:
+    """
+    The statement with comments, string literals and quoted identifiers each
+    replaced by a space, so keywords can be matched in what is left
+    An unterminated literal or comment masks the rest of the statement.
+    """
+    parts = []
+    pos = 0
+    end = len(sql)
+    while pos < end:
+        m = _LITERAL_START.search(sql, pos)
+        if m is None:
+            parts.append(sql[pos:])
+            break
+        parts.append(sql[pos:m.start()])
+        parts.append(" ")
+        kind = m.lastgroup
+        pos = m.end()
+        if kind == "line_comment":
+            i = sql.find("\n", pos)
+            pos = end if i < 0 else i
+        elif kind == "block_comment":
+            depth = 1
+            while depth and pos < end:
+                stop = _BLOCK_STOP.search(sql, pos)
+                if stop is None:
+                    pos = end
+                    break
+                pos = stop.end()
+                depth += 1 if stop.group() == "/*" else -1
+        elif kind == "estring":
+            while pos < end:
+                stop = _ESCAPE_STOP.search(sql, pos)
+                if stop is None:
+                    pos = end
+                elif stop.group() == "\\":
+                    pos = stop.end() + 1
+                elif sql.startswith("'", stop.end()):
+                    pos = stop.end() + 1
+                else:
+                    pos = stop.end()
+                    break
+        elif kind == "dollar":
+            i = sql.find(m.group(), pos)
+            pos = end if i < 0 else i + len(m.group())
+        else:
+            quote = m.group()
+            while pos < end:
+                i = sql.find(quote, pos)
+                if i < 0:
+                    pos = end
+                elif sql.startswith(quote, i + 1):
+                    pos = i + 2
+                else:
+                    pos = i + 1
+                    break
+    return "".join(parts)
+
+
+def strip_leading_comments(sql: str) -> str:
+    """The statement from its first keyword on"""
+    return _LEADING_COMMENTS.sub("", sql, count=1)
+
+
+def has_writes(sql: str) -> bool:
+    """The statement modifies rows; literals and comments are not looked at"""
+    return bool(_WRITES.search(mask_literals(sql)))
+
+
+def split_statements(content: str) -> List[Tuple[str, int]]:
+    """
+    Split an in-memory SQL string into (statement, line_number) tuples
+    """
+    return list(iter_statements(io.StringIO(content)))
+
+
+def split_complete(content: str) -> Tuple[List[Tuple[str, int]], str]:
+    """
+    Terminated statements of an in-memory SQL string and the unterminated rest
+    Used for line-by-line input, where the rest waits for the next line.
+    """
+    tail: List[str] = []
+    statements = list(iter_statements(io.StringIO(content), tail=tail))
+    return statements, tail[0] if tail else ""
+
+
+def iter_file_statements(file_path: str, encoding: str = "utf-8",
+                         chunk_size: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+    """
+    Lazily split a SQL file into (statement, line_number) tuples
+    """
+    with open(file_path, "r", encoding=encoding) as f:
+        yield from iter_statements(f, chunk_size or DEFAULT_CHUNK_SIZE)
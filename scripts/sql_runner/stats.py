@@ -0,0 +1,244 @@
+"""
+Workload statistics for Supabase SQL Runner
+Snapshots pg_stat_statements before and after a workload and reports the
+difference, plus latency percentiles of the runner's own statement timings
+grouped by statement fingerprint
+"""
+import math
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from profiler import fingerprint, normalize_statement
+
+SORT_KEYS = {
+    "total": lambda s: s.total_ms,
+    "calls": lambda s: s.calls,
+    "mean": lambda s: s.mean_ms,
+    "rows": lambda s: s.rows,
+}
+
+# Upper bounds (ms) of the latency histogram buckets, the last one is open
+HISTOGRAM_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+_SPARK = " ▁▂▃▄▅▆▇█"
+
+# The snapshot queries show up in pg_stat_statements themselves
+_OWN_QUERY = re.compile(r"pg_stat_statements", re.IGNORECASE)
+
+
+class StatsUnavailable(Exception):
+    """pg_stat_statements is not installed or not readable"""
+
+
+@dataclass
+class StatementStats:
+    """pg_stat_statements counters of one statement (summed over roles)"""
+    queryid: int
+    query: str
+    calls: int
+    total_ms: float
+    rows: int
+    shared_hit: int
+    shared_read: int
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def minus(self, before: "StatementStats") -> "StatementStats":
+        return StatementStats(
+            queryid=self.queryid,
+            query=self.query,
+            calls=self.calls - before.calls,
+            total_ms=self.total_ms - before.total_ms,
+            rows=self.rows - before.rows,
+            shared_hit=self.shared_hit - before.shared_hit,
+            shared_read=self.shared_read - before.shared_read,
+        )
+
+
+def stats_relation(cur) -> str:
+    """Qualified name of the pg_stat_statements view (Supabase keeps it in 'extensions')"""
+    cur.execute(
+        "SELECT n.nspname FROM pg_extension e JOIN pg_namespace n ON n.oid = e.extnamespace "
+        "WHERE e.extname = 'pg_stat_statements'"
+    )
+    row = cur.fetchone()
+    if row is None:
+        raise StatsUnavailable("pg_stat_statements is not installed "
+                               "(CREATE EXTENSION pg_stat_statements)")
+    return f'"{row[0]}".pg_stat_statements'
+
+
+def take_snapshot(cur, relation: str) -> Dict[int, StatementStats]:
+    """Counters of every statement of the current database, by queryid"""
+    cur.execute(f"SELECT * FROM {relation} LIMIT 0")
+    columns = {d[0] for d in cur.description}
+    # PostgreSQL 13 split total_time into planning and execution time
+    total = "total_exec_time" if "total_exec_time" in columns else "total_time"
+    cur.execute(
+        f"SELECT queryid, min(query), sum(calls), sum({total}), sum(rows), "
+        f"       sum(shared_blks_hit), sum(shared_blks_read) "
+        f"FROM {relation} "
+        f"WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+        f"  AND queryid IS NOT NULL "
+        f"GROUP BY queryid"
+    )
+    snapshot = {}
+    for queryid, query, calls, total_ms, rows, hit, read in cur.fetchall():
+        snapshot[queryid] = StatementStats(
+            queryid=queryid, query=query or "", calls=int(calls), total_ms=float(total_ms),
+            rows=int(rows), shared_hit=int(hit), shared_read=int(read),
+        )
+    # Leave no transaction open between the snapshots
+    cur.connection.rollback()
+    return snapshot
+
+
+def diff_snapshots(before: Dict[int, StatementStats], after: Dict[int, StatementStats],
+                   match: Optional[str] = None) -> List[StatementStats]:
+    """
+    Statements executed between two snapshots, with the counters they gained
+    An entry with fewer calls than before was evicted or reset in between, so
+    all of its current counters are counted.
+    """
+    pattern = re.compile(match, re.IGNORECASE) if match else None
+    changes = []
+    for queryid, now in after.items():
+        if _OWN_QUERY.search(now.query):
+            continue
+        if pattern is not None and not pattern.search(now.query):
+            continue
+        previous = before.get(queryid)
+        delta = now.minus(previous) if previous is not None and now.calls >= previous.calls else now
+        if delta.calls > 0:
+            changes.append(delta)
+    return changes
+
+
+def top_statements(changes: List[StatementStats], sort: str = "total",
+                   limit: int = 10) -> List[StatementStats]:
+    return sorted(changes, key=SORT_KEYS[sort], reverse=True)[:limit]
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Linearly interpolated percentile (p in 0..100) of unsorted values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class LatencyGroup:
+    """Runner-side timings of every execution of one statement fingerprint"""
+    fingerprint: str
+    query: str
+    timings_ms: List[float] = field(default_factory=list)
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.timings_ms, 50)
+
+    @property
+    def p95(self) -> float:
+        return percentile(self.timings_ms, 95)
+
+    def histogram(self) -> List[int]:
+        """Execution count per HISTOGRAM_BUCKETS_MS bucket"""
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for ms in self.timings_ms:
+            index = next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if ms < bound),
+                         len(HISTOGRAM_BUCKETS_MS))
+            counts[index] += 1
+        return counts
+
+
+def group_timings(results, match: Optional[str] = None) -> List[LatencyGroup]:
+    """Successful statement results grouped by fingerprint, slowest p95 first"""
+    pattern = re.compile(match, re.IGNORECASE) if match else None
+    groups: Dict[str, LatencyGroup] = {}
+    for r in results:
+        if not r.result.success:
+            continue
+        if pattern is not None and not pattern.search(r.statement):
+            continue
+        key = fingerprint(r.statement)
+        if key not in groups:
+            groups[key] = LatencyGroup(fingerprint=key, query=normalize_statement(r.statement))
+        groups[key].timings_ms.append(r.result.execution_time * 1000)
+    return sorted(groups.values(), key=lambda g: g.p95, reverse=True)
+
+
+def sparkline(counts: List[int]) -> str:
+    peak = max(counts) or 1
+    return "".join(_SPARK[math.ceil(c / peak * (len(_SPARK) - 1))] for c in counts)
+
+
+def report(changes: List[StatementStats], groups: List[LatencyGroup]) -> dict:
+    """JSON-serialisable form of a stats run, for --json"""
+    return {
+        "statements": [dict(asdict(s), mean_ms=s.mean_ms) for s in changes],
+        "latency": [
+            {"fingerprint": g.fingerprint, "query": g.query, "count": len(g.timings_ms),
+             "p50_ms": g.p50, "p95_ms": g.p95, "max_ms": max(g.timings_ms),
+             "histogram": dict(zip([f"<{b}" for b in HISTOGRAM_BUCKETS_MS]
+                                   + [f">={HISTOGRAM_BUCKETS_MS[-1]}"], g.histogram()))}
+            for g in groups
+        ],
+    }
+
+
+def _short(query: str, width: int = 80) -> str:
+    query = " ".join(query.split())
+    return query[:width] + ("..." if len(query) > width else "")
+
+
+def display_statements(changes: List[StatementStats], sort: str, limit: int, console):
+    """Top statements of the workload according to pg_stat_statements"""
+    from rich.table import Table
+
+    top = top_statements(changes, sort, limit)
+    table = Table(title=f"🔥 Top statements by {sort} (pg_stat_statements)",
+                  show_header=True, header_style="bold")
+    table.add_column("Statement", style="cyan", overflow="fold")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total (ms)", justify="right")
+    table.add_column("Mean (ms)", justify="right")
+    table.add_column("Rows", justify="right")
+    table.add_column("Buffers", justify="right")
+    for s in top:
+        table.add_row(
+            _short(s.query), f"{s.calls:,}", f"{s.total_ms:,.1f}", f"{s.mean_ms:,.2f}",
+            f"{s.rows:,}", f"{s.shared_hit + s.shared_read:,}",
+        )
+    console.print()
+    console.print(table)
+    total = sum(s.total_ms for s in changes)
+    console.print(f"   {len(changes)} statement(s), {sum(s.calls for s in changes):,} call(s), "
+                  f"{total:,.1f} ms server time in total")
+
+
+def display_latency(groups: List[LatencyGroup], limit: int, console):
+    """p50/p95 and histogram of the runner's own timings per fingerprint"""
+    from rich.table import Table
+
+    table = Table(title="⏱️  Statement latency (runner timings)", show_header=True, header_style="bold",
+                  caption=f"histogram buckets: <{HISTOGRAM_BUCKETS_MS[0]} ms … "
+                          f"≥{HISTOGRAM_BUCKETS_MS[-1]:,} ms")
+    table.add_column("Statement", style="cyan", overflow="fold")
+    table.add_column("Runs", justify="right")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p95 (ms)", justify="right")
+    table.add_column("Max (ms)", justify="right")
+    table.add_column("Histogram", no_wrap=True)
+    for g in groups[:limit]:
+        table.add_row(
+            _short(g.query), f"{len(g.timings_ms):,}", f"{g.p50:,.2f}", f"{g.p95:,.2f}",
+            f"{max(g.timings_ms):,.2f}", f"[green]{sparkline(g.histogram())}[/green]",
+        )
+    console.print()
+    console.print(table)
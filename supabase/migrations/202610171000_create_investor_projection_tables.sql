@@ -0,0 +1,107 @@
+-- MIGRATION: INVESTOR PROJECTION TABLES
+-- Date: 2026-10-17 10:00 AM
+-- Description: Precomputed year-by-year projection (sequestration, cashflow) and NPV/IRR per carbon project
+-- Filled by scripts/python/update/update_investor_projections.py, read by the investor dashboard
+
+BEGIN;
+
+-- ====================================================================
+-- PART 1: YEARLY PROJECTION (one row per project per year)
+-- ====================================================================
+
+CREATE TABLE IF NOT EXISTS investor_projection_yearly (
+    carbon_project_id UUID NOT NULL REFERENCES carbon_projects(id) ON DELETE CASCADE,
+    year_index INTEGER NOT NULL,              -- 0 = start year (initial investment)
+    calendar_year INTEGER NOT NULL,
+    sequestration_ton DECIMAL(15,2) NOT NULL DEFAULT 0,
+    revenue DECIMAL(20,2) NOT NULL DEFAULT 0,
+    cost DECIMAL(20,2) NOT NULL DEFAULT 0,
+    cashflow DECIMAL(20,2) NOT NULL DEFAULT 0,
+    cumulative_cashflow DECIMAL(20,2) NOT NULL DEFAULT 0,
+    discounted_cashflow DECIMAL(20,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (carbon_project_id, year_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_investor_projection_yearly_calendar_year
+ON investor_projection_yearly (calendar_year);
+
+-- ====================================================================
+-- PART 2: PROJECTION SUMMARY (one row per project)
+-- ====================================================================
+
+CREATE TABLE IF NOT EXISTS investor_projection_summary (
+    carbon_project_id UUID PRIMARY KEY REFERENCES carbon_projects(id) ON DELETE CASCADE,
+    start_year INTEGER NOT NULL,
+    period_years INTEGER NOT NULL,
+    total_sequestration_ton DECIMAL(15,2) NOT NULL DEFAULT 0,
+    total_revenue DECIMAL(20,2) NOT NULL DEFAULT 0,
+    total_cost DECIMAL(20,2) NOT NULL DEFAULT 0,
+    npv DECIMAL(20,2) NOT NULL DEFAULT 0,
+    irr_percentage DECIMAL(10,2),             -- NULL when cashflow never changes sign
+    payback_years INTEGER,                    -- NULL when not repaid within the period
+    discount_rate DECIMAL(6,4) NOT NULL,
+    carbon_price DECIMAL(15,2) NOT NULL,
+    assumptions JSONB NOT NULL DEFAULT '{}',
+    calculated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- ====================================================================
+-- PART 3: VIEW FOR INVESTOR DASHBOARD
+-- ====================================================================
+
+CREATE OR REPLACE VIEW v_investor_projection AS
+SELECT
+    cp.id,
+    cp.project_code as kode_project,
+    cp.project_name as nama_project,
+    cp.status,
+    COALESCE(cp.investment_amount, 0) as investment_amount,
+    COALESCE(cp.roi_percentage, 0) as roi_percentage,
+    s.start_year,
+    s.period_years,
+    s.total_sequestration_ton,
+    s.total_revenue,
+    s.total_cost,
+    s.npv,
+    s.irr_percentage,
+    s.payback_years,
+    s.discount_rate,
+    s.carbon_price,
+    s.calculated_at
+FROM carbon_projects cp
+JOIN investor_projection_summary s ON s.carbon_project_id = cp.id
+WHERE cp.status NOT IN ('archived', 'cancelled');
+
+-- ====================================================================
+-- PART 4: GRANT PERMISSIONS
+-- ====================================================================
+
+GRANT SELECT ON investor_projection_yearly TO anon, authenticated;
+GRANT SELECT ON investor_projection_summary TO anon, authenticated;
+GRANT SELECT ON v_investor_projection TO anon, authenticated;
+GRANT ALL ON investor_projection_yearly TO service_role;
+GRANT ALL ON investor_projection_summary TO service_role;
+
+-- ====================================================================
+-- PART 5: ENABLE RLS AND CREATE POLICIES
+-- ====================================================================
+
+-- Enable RLS
+ALTER TABLE investor_projection_yearly ENABLE ROW LEVEL SECURITY;
+ALTER TABLE investor_projection_summary ENABLE ROW LEVEL SECURITY;
+
+-- Drop existing policies if they exist
+DROP POLICY IF EXISTS "Public read access for investor_projection_yearly" ON investor_projection_yearly;
+DROP POLICY IF EXISTS "Public read access for investor_projection_summary" ON investor_projection_summary;
+
+-- Create RLS policies
+-- Read-only for the dashboard; writes come from update_investor_projections.py
+-- with the service role, which bypasses RLS
+
+CREATE POLICY "Public read access for investor_projection_yearly" ON investor_projection_yearly
+    FOR SELECT TO anon, authenticated USING (true);
+
+CREATE POLICY "Public read access for investor_projection_summary" ON investor_projection_summary
+    FOR SELECT TO anon, authenticated USING (true);
+
+COMMIT;
@@ -0,0 +1,79 @@
+-- MIGRATION: INVESTOR SCENARIO RESULTS (MONTE CARLO)
+-- Date: 2026-10-17 11:00 AM
+-- Description: P10/P50/P90 bands per carbon project from the Monte Carlo financial model
+-- Filled by scripts/python/update/update_investor_scenarios.py, read by the investor dashboard
+
+BEGIN;
+
+-- ====================================================================
+-- PART 1: PERCENTILE BANDS (one row per project per metric)
+-- ====================================================================
+
+CREATE TABLE IF NOT EXISTS investor_scenario_results (
+    carbon_project_id UUID NOT NULL REFERENCES carbon_projects(id) ON DELETE CASCADE,
+    metric VARCHAR(50) NOT NULL CHECK (metric IN ('npv', 'irr_percentage', 'total_revenue', 'total_sequestration_ton')),
+    p10 DECIMAL(20,2),                        -- NULL when the metric is undefined in every scenario
+    p50 DECIMAL(20,2),
+    p90 DECIMAL(20,2),
+    mean DECIMAL(20,2),
+    prob_negative DECIMAL(5,4),               -- share of scenarios below zero
+    simulations INTEGER NOT NULL,
+    seed BIGINT NOT NULL,
+    distributions JSONB NOT NULL DEFAULT '{}',
+    calculated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (carbon_project_id, metric)
+);
+
+-- ====================================================================
+-- PART 2: VIEW FOR INVESTOR DASHBOARD (one row per project)
+-- ====================================================================
+
+CREATE OR REPLACE VIEW v_investor_scenario_bands AS
+SELECT
+    cp.id,
+    cp.project_code as kode_project,
+    cp.project_name as nama_project,
+    cp.status,
+    MAX(r.p10) FILTER (WHERE r.metric = 'npv') as npv_p10,
+    MAX(r.p50) FILTER (WHERE r.metric = 'npv') as npv_p50,
+    MAX(r.p90) FILTER (WHERE r.metric = 'npv') as npv_p90,
+    MAX(r.prob_negative) FILTER (WHERE r.metric = 'npv') as npv_prob_negative,
+    MAX(r.p10) FILTER (WHERE r.metric = 'irr_percentage') as irr_p10,
+    MAX(r.p50) FILTER (WHERE r.metric = 'irr_percentage') as irr_p50,
+    MAX(r.p90) FILTER (WHERE r.metric = 'irr_percentage') as irr_p90,
+    MAX(r.p10) FILTER (WHERE r.metric = 'total_sequestration_ton') as sequestration_p10,
+    MAX(r.p50) FILTER (WHERE r.metric = 'total_sequestration_ton') as sequestration_p50,
+    MAX(r.p90) FILTER (WHERE r.metric = 'total_sequestration_ton') as sequestration_p90,
+    MAX(r.simulations) as simulations,
+    MAX(r.calculated_at) as calculated_at
+FROM carbon_projects cp
+JOIN investor_scenario_results r ON r.carbon_project_id = cp.id
+WHERE cp.status NOT IN ('archived', 'cancelled')
+GROUP BY cp.id, cp.project_code, cp.project_name, cp.status;
+
+-- ====================================================================
+-- PART 3: GRANT PERMISSIONS
+-- ====================================================================
+
+GRANT SELECT ON investor_scenario_results TO anon, authenticated;
+GRANT SELECT ON v_investor_scenario_bands TO anon, authenticated;
+GRANT ALL ON investor_scenario_results TO service_role;
+
+-- ====================================================================
+-- PART 4: ENABLE RLS AND CREATE POLICIES
+-- ====================================================================
+
+-- Enable RLS
+ALTER TABLE investor_scenario_results ENABLE ROW LEVEL SECURITY;
+
+-- Drop existing policies if they exist
+DROP POLICY IF EXISTS "Public read access for investor_scenario_results" ON investor_scenario_results;
+
+-- Create RLS policies
+-- Read-only for the dashboard; writes come from update_investor_scenarios.py
+-- with the service role, which bypasses RLS
+
+CREATE POLICY "Public read access for investor_scenario_results" ON investor_scenario_results
+    FOR SELECT TO anon, authenticated USING (true);
+
+COMMIT;